@@ -0,0 +1,76 @@
+"""
+Energy drift of the fixed-step integrators on the undamped double pendulum.
+
+Run from the ``Double Pendulum Model`` folder:
+    python -m benchmarks.energy_drift --duration 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+from double_pendulum_model.physics.double_pendulum import (
+    DoublePendulumDynamics,
+    DoublePendulumParameters,
+    DoublePendulumState,
+)
+
+CASES = (
+    ("rk4", 0.01),
+    ("rk4", 0.05),
+    ("rk4", 0.1),
+    ("midpoint", 0.05),
+    ("midpoint", 0.1),
+    ("midpoint4", 0.05),
+    ("midpoint4", 0.1),
+)
+
+
+def run(duration: float, initial_state: DoublePendulumState) -> None:
+    parameters = DoublePendulumParameters.default()
+    parameters.damping_shoulder = 0.0
+    parameters.damping_wrist = 0.0
+    dynamics = DoublePendulumDynamics(parameters)
+    initial_energy = dynamics.total_energy(initial_state)
+
+    print(f"Initial energy: {initial_energy:.6f} J, horizon: {duration:g} s")
+    print(
+        f"{'method':>10} {'dt (s)':>7} {'wall (s)':>9} "
+        f"{'max |dE| first 10%':>19} {'max |dE| last 10%':>18}"
+    )
+    for method, dt in CASES:
+        n_steps = int(round(duration / dt))
+        start = time.perf_counter()
+        trajectory = dynamics.simulate(initial_state, 0.0, dt, n_steps, method=method)
+        elapsed = time.perf_counter() - start
+        errors = np.abs(
+            [
+                dynamics.total_energy(DoublePendulumState(*row)) - initial_energy
+                for row in trajectory
+            ]
+        )
+        window = max(1, n_steps // 10)
+        print(
+            f"{method:>10} {dt:>7.3f} {elapsed:>9.3f} "
+            f"{errors[:window].max():>19.3e} {errors[-window:].max():>18.3e}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=300.0, help="seconds")
+    parser.add_argument("--theta1", type=float, default=0.8, help="radians")
+    parser.add_argument("--theta2", type=float, default=0.3, help="radians")
+    args = parser.parse_args()
+    run(
+        args.duration,
+        DoublePendulumState(
+            theta1=args.theta1, theta2=args.theta2, omega1=0.0, omega2=0.0
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Evaluation speed of forcing expressions with and without the AST optimizer.
+
+Run from the ``Double Pendulum Model`` folder:
+    python -m benchmarks.expression_eval --calls 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from double_pendulum_model.physics.double_pendulum import EXPRESSION_VARIABLES
+from double_pendulum_model.safe_eval import SafeEvaluator
+
+EXPRESSIONS = (
+    "0.0",
+    "2*pi*0.5*sin(2*pi*t) + 3*sin(2*pi*t)**2",
+    "5*exp(-0.5*t)*cos(2*pi*1.5*t) - 0.8*omega1",
+    "-20*(theta1 - pi/4) - 2*omega1 + 0.1*sin(theta1 - pi/4)**2",
+    "sqrt(2)*sin(theta2)*cos(theta2) + sin(theta2)*cos(theta2)**2",
+)
+ARGUMENTS = (0.37, 0.8, -0.3, 1.2, -0.4)
+
+
+def run(calls: int) -> None:
+    variants = (
+        ("verbatim", SafeEvaluator(set(EXPRESSION_VARIABLES), optimize=False)),
+        ("optimized", SafeEvaluator(set(EXPRESSION_VARIABLES))),
+        (
+            "fast powers",
+            SafeEvaluator(set(EXPRESSION_VARIABLES), fast_powers=True),
+        ),
+    )
+    print(f"ns per call over {calls} calls of the positional compiled function")
+    print(f"{'expression':<58}" + "".join(f"{name:>12}" for name, _ in variants))
+    for expression in EXPRESSIONS:
+        timings = []
+        for _, evaluator in variants:
+            function = evaluator.compile_function(expression, EXPRESSION_VARIABLES)
+            elapsed = min(
+                timeit.repeat(lambda f=function: f(*ARGUMENTS), number=calls, repeat=3)
+            )
+            timings.append(1e9 * elapsed / calls)
+        print(f"{expression:<58}" + "".join(f"{value:>12.1f}" for value in timings))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+    run(args.calls)
+
+
+if __name__ == "__main__":
+    main()
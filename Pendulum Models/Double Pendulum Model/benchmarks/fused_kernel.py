@@ -0,0 +1,67 @@
+"""
+Step throughput of the reference RK4 integrator versus the fused kernel.
+
+Run from the ``Double Pendulum Model`` folder:
+    python -m benchmarks.fused_kernel --steps 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+from double_pendulum_model.physics.double_pendulum import (
+    DoublePendulumDynamics,
+    DoublePendulumState,
+    compile_forcing_functions,
+)
+
+FORCING = (
+    ("unforced", "0", "0"),
+    ("time-only", "5*exp(-0.5*t)*cos(2*pi*1.5*t)", "0.5*sin(3*t)"),
+    (
+        "feedback",
+        "-20*(theta1 - pi/4) - 2*omega1 + 0.1*sin(theta1)",
+        "-8*theta2 - omega2 + 0.2*sin(theta1 + theta2)",
+    ),
+)
+STATE0 = DoublePendulumState(theta1=0.8, theta2=-0.3, omega1=0.0, omega2=0.5)
+TIME_STEP = 0.001
+
+
+def run(steps: int) -> None:
+    print(f"steps per second over {steps} steps (best of 3)")
+    print(f"{'forcing':<12}{'rk4':>12}{'rk4_fused':>12}{'speedup':>10}")
+    for name, shoulder, wrist in FORCING:
+        dynamics = DoublePendulumDynamics(
+            forcing_functions=compile_forcing_functions(shoulder, wrist)
+        )
+        rates = []
+        results = []
+        for method in ("rk4", "rk4_fused"):
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                trajectory = dynamics.simulate(
+                    STATE0, 0.0, TIME_STEP, steps, method=method
+                )
+                best = min(best, time.perf_counter() - start)
+            rates.append(steps / best)
+            results.append(trajectory)
+        drift = np.max(np.abs(results[0] - results[1]))
+        print(
+            f"{name:<12}{rates[0]:>12.0f}{rates[1]:>12.0f}"
+            f"{rates[1] / rates[0]:>9.1f}x  max |difference| {drift:.1e}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=20_000)
+    args = parser.parse_args()
+    run(args.steps)
+
+
+if __name__ == "__main__":
+    main()
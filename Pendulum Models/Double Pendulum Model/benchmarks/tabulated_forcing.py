@@ -0,0 +1,88 @@
+"""
+Lookup cost of tabulated torque profiles with one million samples.
+
+Per-call lookups use index arithmetic (uniform grid) or the monotonic cursor
+(non-uniform grid); ``np.interp`` on a scalar, which binary-searches the whole
+table on every call, is shown for reference.
+
+Run from the ``Double Pendulum Model`` folder:
+    python -m benchmarks.tabulated_forcing --samples 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import typing
+
+import numpy as np
+from double_pendulum_model.physics.double_pendulum import (
+    DoublePendulumDynamics,
+    DoublePendulumState,
+)
+from double_pendulum_model.physics.tabulated_forcing import TabulatedForcing
+
+DURATION_S = 100.0
+CALLS = 200_000
+SIMULATE_STEPS = 20_000
+STATE0 = DoublePendulumState(theta1=0.8, theta2=-0.3, omega1=0.0, omega2=0.5)
+
+
+def _profiles(samples: int) -> dict[str, TabulatedForcing]:
+    rng = np.random.default_rng(0)
+    uniform = np.linspace(0.0, DURATION_S, samples)
+    irregular = np.cumsum(rng.uniform(0.5, 1.5, samples))
+    irregular *= DURATION_S / irregular[-1]
+    return {
+        "uniform": TabulatedForcing(uniform, 10.0 * np.sin(uniform)),
+        "non-uniform": TabulatedForcing(irregular, 10.0 * np.sin(irregular)),
+    }
+
+
+def _best_of_three(function: typing.Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(samples: int) -> None:
+    # Sequential times at the recording rate, as a stepping integrator asks
+    queries = np.linspace(0.0, DURATION_S * CALLS / samples, CALLS).tolist()
+    query_array = np.random.default_rng(1).uniform(0.0, DURATION_S, samples)
+    print(f"{samples} samples per profile, {CALLS} sequential scalar calls")
+    print(
+        f"{'grid':<13}{'call ns':>10}{'np.interp ns':>14}"
+        f"{'sample Mpts/s':>15}{'rk4 steps/s':>13}"
+    )
+    for name, table in _profiles(samples).items():
+        call = _best_of_three(lambda table=table: [table(t, STATE0) for t in queries])
+        reference = _best_of_three(
+            lambda table=table: [
+                np.interp(t, table.times, table.torques) for t in queries[:2000]
+            ]
+        )
+        sample = _best_of_three(lambda table=table: table.sample(query_array))
+        dynamics = DoublePendulumDynamics(forcing_functions=(table, table))
+        simulate = _best_of_three(
+            lambda dynamics=dynamics: dynamics.simulate(
+                STATE0, 0.0, 0.001, SIMULATE_STEPS
+            )
+        )
+        print(
+            f"{name:<13}{1e9 * call / CALLS:>10.0f}{1e9 * reference / 2000:>14.0f}"
+            f"{samples / sample / 1e6:>15.1f}{SIMULATE_STEPS / simulate:>13.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.samples)
+
+
+if __name__ == "__main__":
+    main()
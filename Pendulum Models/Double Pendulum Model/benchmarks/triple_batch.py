@@ -0,0 +1,75 @@
+"""
+Triple pendulum RK4 throughput: per-state scalar steps versus ``step_batch``.
+
+Each batch row carries its own parameters, as in a Monte Carlo sweep over
+segment masses.
+
+Run from the ``Double Pendulum Model`` folder:
+    python -m benchmarks.triple_batch --steps 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+from double_pendulum_model.physics.triple_pendulum import (
+    TripleParameterBatch,
+    TriplePendulumDynamics,
+    TriplePendulumParameters,
+    TriplePendulumState,
+)
+
+BATCH_SIZES = (1, 10, 100, 1000)
+CONTROL = (5.0, -2.0, 1.0)
+TIME_STEP = 0.001
+
+
+def _parameter_sets(
+    count: int, rng: np.random.Generator
+) -> list[TriplePendulumParameters]:
+    parameter_sets = []
+    for _ in range(count):
+        parameters = TriplePendulumParameters.default()
+        parameters.segments[2].mass_kg = float(rng.uniform(0.3, 0.8))
+        parameter_sets.append(parameters)
+    return parameter_sets
+
+
+def run(steps: int) -> None:
+    rng = np.random.default_rng(0)
+    print(f"state-steps per second over {steps} RK4 steps")
+    print(f"{'batch':>8}{'scalar':>14}{'step_batch':>14}{'speedup':>10}")
+    for size in BATCH_SIZES:
+        states0 = np.column_stack(
+            (rng.uniform(-1.0, 1.0, (size, 3)), rng.normal(0.0, 1.0, (size, 3)))
+        )
+        parameter_sets = _parameter_sets(size, rng)
+
+        start = time.perf_counter()
+        for row, parameters in enumerate(parameter_sets):
+            dynamics = TriplePendulumDynamics(parameters)
+            state = TriplePendulumState(*states0[row])
+            for _ in range(steps):
+                state = dynamics.step(0.0, state, TIME_STEP, CONTROL)
+        scalar = size * steps / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batch = TripleParameterBatch.from_parameters(parameter_sets)
+        TriplePendulumDynamics().simulate_batch(
+            states0, 0.0, TIME_STEP, steps, CONTROL, batch
+        )
+        batched = size * steps / (time.perf_counter() - start)
+        print(f"{size:>8}{scalar:>14.0f}{batched:>14.0f}{batched / scalar:>9.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=50)
+    args = parser.parse_args()
+    run(args.steps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Triple pendulum forward dynamics: separate kernels versus the fused CSE kernel.
+
+The two-call path evaluates ``mass_matrix`` and ``bias_vector`` with the
+generated per-term kernels, as ``forward_dynamics`` did before the fused
+kernel. The middle row pairs the fused kernel with ``np.linalg.solve``; the
+last is ``forward_dynamics`` itself, which solves with the unrolled LDLᵀ
+factorization of ``spd_solve``.
+
+Run from the ``Double Pendulum Model`` folder:
+    python -m benchmarks.triple_kernel --calls 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import typing
+
+import numpy as np
+from double_pendulum_model.physics.triple_pendulum import (
+    TriplePendulumDynamics,
+    TriplePendulumState,
+)
+
+STATE = TriplePendulumState(
+    theta1=0.4, theta2=-0.7, theta3=1.1, omega1=0.3, omega2=-1.2, omega3=2.0
+)
+CONTROL = (5.0, -2.0, 1.0)
+
+
+def two_call_forward_dynamics(
+    dynamics: TriplePendulumDynamics,
+    state: TriplePendulumState,
+    control: tuple[float, float, float],
+) -> tuple[float, ...]:
+    mass = dynamics.mass_matrix(state)
+    bias = dynamics.bias_vector(state)
+    accelerations = np.linalg.solve(mass, np.array(control, dtype=float) - bias)
+    return tuple(float(a) for a in accelerations)
+
+
+def lapack_forward_dynamics(
+    dynamics: TriplePendulumDynamics,
+    state: TriplePendulumState,
+    control: tuple[float, float, float],
+) -> tuple[float, ...]:
+    mass, bias = dynamics.mass_matrix_and_bias(state)
+    accelerations = np.linalg.solve(mass, np.subtract(control, bias))
+    return tuple(float(a) for a in accelerations)
+
+
+def _best_rate(call: typing.Callable[[], object], calls: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(calls):
+            call()
+        best = min(best, time.perf_counter() - start)
+    return calls / best
+
+
+def run(calls: int) -> None:
+    dynamics = TriplePendulumDynamics()
+    reference = two_call_forward_dynamics(dynamics, STATE, CONTROL)
+    fused = dynamics.forward_dynamics(STATE, CONTROL)
+    difference = max(abs(a - b) for a, b in zip(reference, fused, strict=True))
+
+    print(f"forward dynamics calls per second over {calls} calls (best of 3)")
+    two_call = _best_rate(
+        lambda: two_call_forward_dynamics(dynamics, STATE, CONTROL), calls
+    )
+    lapack = _best_rate(
+        lambda: lapack_forward_dynamics(dynamics, STATE, CONTROL), calls
+    )
+    one_call = _best_rate(lambda: dynamics.forward_dynamics(STATE, CONTROL), calls)
+    print(f"{'two kernel calls':<28}{two_call:>12.0f}")
+    print(f"{'fused kernel, LAPACK':<28}{lapack:>12.0f}{lapack / two_call:>9.1f}x")
+    print(f"{'fused kernel, LDLT':<28}{one_call:>12.0f}{one_call / two_call:>9.1f}x")
+    print(f"max |difference| {difference:.1e}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+    run(args.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,9 @@ from .physics.double_pendulum import (
     DoublePendulumState,
     ExpressionFunction,
     compile_forcing_functions,
+    states_to_array,
 )
+from .physics.tabulated_forcing import TabulatedForcing
 
 __all__ = [
     "DEFAULT_ARM_CENTER_OF_MASS_RATIO",
@@ -35,5 +37,7 @@ __all__ = [
     "DoublePendulumParameters",
     "DoublePendulumState",
     "ExpressionFunction",
+    "TabulatedForcing",
     "compile_forcing_functions",
+    "states_to_array",
 ]
@@ -0,0 +1,128 @@
+"""
+Piecewise built-in functions available to SafeEvaluator expressions.
+
+Torque patterns such as "ramp up, hold, release" are written with these
+instead of nested arithmetic:
+
+- ``ramp(t, t0, t1)``: 0 before ``t0``, rising linearly to 1 at ``t1``.
+- ``pulse(t, t0, t1)``: 1 for ``t0 <= t < t1``, otherwise 0.
+- ``smoothstep(t, t0, t1)``: like ``ramp`` with the cubic ``3x**2 - 2x**3``
+  profile, so the rise starts and ends with zero slope.
+- ``clip(x, lower, upper)``: ``x`` limited to ``[lower, upper]``.
+- ``interp(x, knots, values)``: piecewise-linear interpolation through literal
+  lists, holding the end values outside ``knots``.
+
+Each function has a scalar form for :func:`compile_function` and a NumPy form
+for :func:`compile_vectorized` that performs the same floating-point
+operations, so both agree exactly. ``t1 <= t0`` turns a ramp into a step at
+``t0``. The validator rewrites ``interp`` tables into constant tuples, so calls
+never build lists; the NumPy form converts each table to arrays only once.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import math
+from collections.abc import Callable, Sequence
+
+import numpy as np
+
+INTERP_CACHE_SIZE = 128  # Literal tables kept as arrays by the NumPy interp
+
+# Functions whose listed argument positions must be literal number lists
+TABLE_ARGUMENTS = {"interp": (1, 2)}
+
+ArrayLike = float | np.ndarray
+
+
+def ramp(t: float, t0: float, t1: float) -> float:
+    if t <= t0:
+        return 0.0
+    if t >= t1:
+        return 1.0
+    return (t - t0) / (t1 - t0)
+
+
+def pulse(t: float, t0: float, t1: float) -> float:
+    return 1.0 if t0 <= t < t1 else 0.0
+
+
+def smoothstep(t: float, t0: float, t1: float) -> float:
+    x = ramp(t, t0, t1)
+    return x * x * (3.0 - 2.0 * x)
+
+
+def clip(x: float, lower: float, upper: float) -> float:
+    return min(max(x, lower), upper)
+
+
+def interp(x: float, knots: Sequence[float], values: Sequence[float]) -> float:
+    if math.isnan(x):
+        return math.nan
+    if x <= knots[0]:
+        return values[0]
+    if x >= knots[-1]:
+        return values[-1]
+    i = bisect.bisect_right(knots, x) - 1
+    x0 = knots[i]
+    y0 = values[i]
+    slope = (values[i + 1] - y0) / (knots[i + 1] - x0)
+    return slope * (x - x0) + y0
+
+
+def ramp_array(t: ArrayLike, t0: ArrayLike, t1: ArrayLike) -> np.ndarray:
+    t = np.asarray(t, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rising = (t - t0) / np.subtract(t1, t0)
+    return np.where(t <= t0, 0.0, np.where(t >= t1, 1.0, rising))
+
+
+def pulse_array(t: ArrayLike, t0: ArrayLike, t1: ArrayLike) -> np.ndarray:
+    return np.where((t0 <= t) & (t < t1), 1.0, 0.0)
+
+
+def smoothstep_array(t: ArrayLike, t0: ArrayLike, t1: ArrayLike) -> np.ndarray:
+    x = ramp_array(t, t0, t1)
+    return x * x * (3.0 - 2.0 * x)
+
+
+def clip_array(x: ArrayLike, lower: ArrayLike, upper: ArrayLike) -> np.ndarray:
+    return np.minimum(np.maximum(x, lower), upper)
+
+
+@functools.lru_cache(maxsize=INTERP_CACHE_SIZE)
+def _table_arrays(
+    knots: tuple[float, ...], values: tuple[float, ...]
+) -> tuple[np.ndarray, np.ndarray]:
+    return np.array(knots, dtype=np.float64), np.array(values, dtype=np.float64)
+
+
+def interp_array(
+    x: ArrayLike, knots: tuple[float, ...], values: tuple[float, ...]
+) -> np.ndarray:
+    knot_array, value_array = _table_arrays(knots, values)
+    x = np.asarray(x, dtype=np.float64)
+    i = np.clip(np.searchsorted(knot_array, x, side="right") - 1, 0, len(knots) - 2)
+    x0 = knot_array[i]
+    y0 = value_array[i]
+    slope = (value_array[i + 1] - y0) / (knot_array[i + 1] - x0)
+    result = np.where(x <= knots[0], values[0], slope * (x - x0) + y0)
+    return np.where(x >= knots[-1], values[-1], result)
+
+
+SCALAR_BUILTINS: dict[str, Callable[..., float]] = {
+    "ramp": ramp,
+    "pulse": pulse,
+    "smoothstep": smoothstep,
+    "clip": clip,
+    "interp": interp,
+}
+
+VECTORIZED_BUILTINS: dict[str, Callable[..., np.ndarray]] = {
+    "ramp": ramp_array,
+    "pulse": pulse_array,
+    "smoothstep": smoothstep_array,
+    "clip": clip_array,
+    "interp": interp_array,
+}
@@ -0,0 +1,158 @@
+"""
+Bounds on the work a SafeEvaluator expression can cause.
+
+The allowlist keeps expressions from reaching the interpreter, but not from
+being expensive: Python integers have arbitrary precision, so ``9**9**9``
+computes a number with hundreds of millions of digits, and deeply nested input
+exhausts the parser's and compiler's recursion limits. :func:`check_cost`
+runs at validation time and rejects such expressions before they are compiled:
+
+- Expressions longer than :data:`MAX_EXPRESSION_LENGTH` characters, with more
+  than :data:`MAX_EXPRESSION_NODES` syntax nodes, or nested deeper than
+  :data:`MAX_EXPRESSION_DEPTH`.
+- Integer arithmetic whose result may exceed :data:`MAX_INTEGER_BITS`. Only
+  integer literals can grow like this; variables are floats, whose operations
+  take constant time and overflow to an error instead of growing.
+
+:class:`EvaluationBudget` complements the static check with a wall-clock
+allowance for batches of evaluations, such as a whole simulation run.
+"""
+
+from __future__ import annotations
+
+import ast
+import time
+
+MAX_EXPRESSION_LENGTH = 10_000  # Characters
+MAX_EXPRESSION_NODES = 2_000  # Syntax tree nodes
+# Levels of nested syntax. Flat sums count one level per term, so this admits
+# series of more than a hundred terms; the recursive AST passes (validation,
+# optimization, differentiation) still have ample stack at this depth.
+MAX_EXPRESSION_DEPTH = 150
+MAX_INTEGER_BITS = 4096  # Largest integer (literal or result) an expression may build
+
+# Allowed functions that may return one of their (possibly integer) arguments
+_PASSTHROUGH_FUNCTIONS = frozenset({"clip"})
+
+
+class EvaluationBudgetExceeded(TimeoutError):
+    """Raised when a batch of evaluations runs past its wall-clock budget."""
+
+
+class EvaluationBudget:
+    """Wall-clock allowance shared by a batch of expression evaluations.
+
+    The clock starts on construction. Long-running loops call :meth:`check`
+    between evaluations; the static limits of :func:`check_cost` bound the
+    cost of each individual evaluation.
+    """
+
+    __slots__ = ("deadline", "seconds")
+
+    def __init__(self, seconds: float) -> None:
+        if not seconds > 0.0:
+            raise ValueError(f"Evaluation budget must be positive, got {seconds}")
+        self.seconds = seconds
+        self.deadline = time.perf_counter() + seconds
+
+    def check(self) -> None:
+        """Raise :class:`EvaluationBudgetExceeded` once the budget is spent."""
+        if time.perf_counter() > self.deadline:
+            raise EvaluationBudgetExceeded(
+                f"Evaluation exceeded its budget of {self.seconds:g} s"
+            )
+
+
+def check_length(expression: str) -> None:
+    """Reject expression text too long to parse safely."""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(
+            f"Expression is too long ({len(expression)} characters, "
+            f"limit {MAX_EXPRESSION_LENGTH})"
+        )
+
+
+def _literal_int(node: ast.AST) -> int | None:
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub | ast.UAdd):
+        value = _literal_int(node.operand)
+        if value is None or isinstance(node.op, ast.UAdd):
+            return value
+        return -value
+    if isinstance(node, ast.Constant) and type(node.value) in (int, bool):
+        return int(node.value)
+    return None
+
+
+def _integer_bits(node: ast.AST, sizes: dict[ast.AST, int | None]) -> int | None:
+    """Upper bound on the bit length of an integer-valued node, else ``None``.
+
+    ``sizes`` holds the bounds of the children, which are visited first.
+    """
+    if isinstance(node, ast.Expression):
+        return sizes[node.body]
+    if isinstance(node, ast.Constant):
+        value = node.value
+        return abs(value).bit_length() if type(value) in (int, bool) else None
+    if isinstance(node, ast.UnaryOp):
+        return sizes[node.operand]
+    if isinstance(node, ast.Call):
+        if isinstance(node.func, ast.Name) and node.func.id in _PASSTHROUGH_FUNCTIONS:
+            bounds = [sizes[argument] for argument in node.args]
+            return max((bits for bits in bounds if bits is not None), default=None)
+        return None
+    if not isinstance(node, ast.BinOp):
+        # Names are floats or float constants
+        return None
+    left = sizes[node.left]
+    right = sizes[node.right]
+    if left is None or right is None or isinstance(node.op, ast.Div):
+        return None
+    if isinstance(node.op, ast.Add | ast.Sub):
+        return max(left, right) + 1
+    if isinstance(node.op, ast.Mult):
+        return left + right
+    if isinstance(node.op, ast.Mod):
+        return right
+    if isinstance(node.op, ast.Pow):
+        if left <= 1:
+            return left  # 0, 1 and -1 stay small
+        exponent = _literal_int(node.right)
+        if exponent is not None:
+            return None if exponent < 0 else left * exponent
+        # Any exponent below 2**right; negative exponents give floats
+        if right > MAX_INTEGER_BITS.bit_length():
+            return MAX_INTEGER_BITS + 1
+        return left * 2**right
+    return None
+
+
+def check_cost(tree: ast.AST) -> None:
+    """Reject a validated tree whose size, depth or integer growth is excessive."""
+    depths = {tree: 1}
+    order: list[ast.AST] = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        if len(order) > MAX_EXPRESSION_NODES:
+            raise ValueError(
+                f"Expression is too large (more than {MAX_EXPRESSION_NODES} nodes)"
+            )
+        depth = depths[node]
+        if depth > MAX_EXPRESSION_DEPTH:
+            raise ValueError(
+                f"Expression is nested too deeply (limit {MAX_EXPRESSION_DEPTH})"
+            )
+        for child in ast.iter_child_nodes(node):
+            depths[child] = depth + 1
+            stack.append(child)
+
+    sizes: dict[ast.AST, int | None] = {}
+    for node in reversed(order):
+        bits = _integer_bits(node, sizes)
+        if bits is not None and bits > MAX_INTEGER_BITS:
+            raise ValueError(
+                f"'{ast.unparse(node)[:40]}' may produce an integer of more than "
+                f"{MAX_INTEGER_BITS} bits; use a float literal (e.g. 9.0) instead"
+            )
+        sizes[node] = bits
@@ -0,0 +1,236 @@
+"""
+Optimization pass for validated SafeEvaluator expressions.
+
+The pass runs between validation and compilation and never changes the value
+an expression evaluates to:
+
+- Constant folding evaluates subtrees whose operands are all numeric constants
+  (including ``pi``/``tau`` and math calls on constants) once, at compile time.
+  Subtrees that would raise, warn, overflow to a non-finite value, or build an
+  enormous integer are left for evaluation, so runtime behaviour is unchanged.
+- Common subexpression elimination evaluates each repeated call or operation
+  once, binding the first occurrence (in evaluation order) with ``:=`` and
+  reading the name afterwards.
+- Power strength reduction (opt-in) rewrites ``x**2``, ``x**3`` and ``x**4`` as
+  multiplications. C ``pow`` is not correctly rounded on every platform, so the
+  product can differ from ``**`` in the last bit; it is off unless requested.
+"""
+
+from __future__ import annotations
+
+import ast
+import copy
+import itertools
+import math
+import operator
+import typing
+import warnings
+from collections import Counter
+from collections.abc import Callable, Mapping
+
+CSE_PREFIX = "__cse"
+POWER_PREFIX = "__pow"
+MAX_FOLDED_INT_BITS = 4096  # Larger integer results are left to runtime
+FAST_POWER_EXPONENTS = (2, 3, 4)
+
+_BINARY_OPERATORS: dict[
+    type[ast.operator], Callable[[typing.Any, typing.Any], typing.Any]
+] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPERATORS: dict[type[ast.unaryop], Callable[[typing.Any], typing.Any]] = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+def _is_number(value: object) -> bool:
+    return type(value) in (int, float, bool)
+
+
+def _numeric_constant(node: ast.AST) -> bool:
+    return isinstance(node, ast.Constant) and _is_number(node.value)
+
+
+def _int_too_large(value: object) -> bool:
+    return isinstance(value, int) and abs(value).bit_length() > MAX_FOLDED_INT_BITS
+
+
+class _ConstantFolder(ast.NodeTransformer):
+    """Replace constant numeric subtrees with their value."""
+
+    def __init__(self, names: Mapping[str, typing.Any]) -> None:
+        self.names = names
+
+    def _fold(self, node: ast.AST, compute: Callable[[], typing.Any]) -> ast.AST:
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                value = compute()
+        except (ArithmeticError, ValueError, TypeError, Warning):
+            return node
+        if isinstance(value, float) or type(value).__module__ == "numpy":
+            try:
+                value = float(value)
+            except TypeError:
+                return node
+            if not math.isfinite(value):
+                return node
+        elif not _is_number(value) or _int_too_large(value):
+            return node
+        return ast.copy_location(ast.Constant(value=value), node)
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        value = self.names.get(node.id)
+        if _is_number(value):
+            return ast.copy_location(ast.Constant(value=value), node)
+        return node
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        self.generic_visit(node)
+        function = _UNARY_OPERATORS.get(type(node.op))
+        if function is None or not _numeric_constant(node.operand):
+            return node
+        operand = typing.cast("ast.Constant", node.operand).value
+        return self._fold(node, lambda: function(operand))
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        function = _BINARY_OPERATORS.get(type(node.op))
+        if (
+            function is None
+            or not _numeric_constant(node.left)
+            or not _numeric_constant(node.right)
+        ):
+            return node
+        left = typing.cast("ast.Constant", node.left).value
+        right = typing.cast("ast.Constant", node.right).value
+        if (
+            isinstance(node.op, ast.Pow)
+            and isinstance(left, int)
+            and isinstance(right, int)
+            and right > 0
+            and abs(left).bit_length() * right > MAX_FOLDED_INT_BITS
+        ):
+            return node
+        return self._fold(node, lambda: function(left, right))
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        self.generic_visit(node)
+        if (
+            not isinstance(node.func, ast.Name)
+            or node.keywords
+            or not all(_numeric_constant(argument) for argument in node.args)
+        ):
+            return node
+        function = self.names.get(node.func.id)
+        if not callable(function):
+            return node
+        arguments = [typing.cast("ast.Constant", arg).value for arg in node.args]
+        return self._fold(node, lambda: function(*arguments))
+
+
+class _SubexpressionReplacer(ast.NodeTransformer):
+    """Bind the first occurrence of ``key`` to ``name`` and reuse it after."""
+
+    def __init__(self, key: str, name: str) -> None:
+        self.key = key
+        self.name = name
+        self.bound = False
+
+    def visit(self, node: ast.AST) -> ast.AST:
+        if isinstance(node, ast.Call | ast.BinOp) and ast.dump(node) == self.key:
+            if self.bound:
+                return ast.copy_location(ast.Name(id=self.name, ctx=ast.Load()), node)
+            self.bound = True
+            target = ast.Name(id=self.name, ctx=ast.Store())
+            return ast.copy_location(ast.NamedExpr(target=target, value=node), node)
+        return super().visit(node)
+
+
+def _eliminate_common_subexpressions(tree: ast.Expression) -> ast.Expression:
+    # Every allowed node evaluates all of its children left to right, so the
+    # first pre-order occurrence of a subtree is always evaluated first.
+    names = (f"{CSE_PREFIX}{index}" for index in itertools.count())
+    while True:
+        counts = Counter(
+            ast.dump(node)
+            for node in ast.walk(tree)
+            if isinstance(node, ast.Call | ast.BinOp)
+        )
+        repeated = [key for key, count in counts.items() if count > 1]
+        if not repeated:
+            return tree
+        tree = _SubexpressionReplacer(max(repeated, key=len), next(names)).visit(tree)
+
+
+class _PowerReducer(ast.NodeTransformer):
+    """Rewrite small positive integer powers as repeated multiplication."""
+
+    def __init__(self) -> None:
+        self.names = (f"{POWER_PREFIX}{index}" for index in itertools.count())
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        if not (
+            isinstance(node.op, ast.Pow)
+            and isinstance(node.right, ast.Constant)
+            and type(node.right.value) is int
+            and node.right.value in FAST_POWER_EXPONENTS
+        ):
+            return node
+        base = node.left
+        if isinstance(base, ast.Name | ast.Constant):
+            first: ast.expr = base
+            load: ast.expr = base
+        else:
+            name = next(self.names)
+            first = ast.NamedExpr(target=ast.Name(id=name, ctx=ast.Store()), value=base)
+            load = ast.Name(id=name, ctx=ast.Load())
+        product = first
+        for _ in range(node.right.value - 1):
+            product = ast.BinOp(left=product, op=ast.Mult(), right=load)
+        return ast.copy_location(product, node)
+
+
+def _copy_tree(tree: ast.AST) -> ast.AST:
+    """Deep copy of ``tree`` without recursion.
+
+    ``copy.deepcopy`` spends several stack frames per nesting level, which
+    limited the expression depth the optimizer could accept.
+    """
+    copies = {node: copy.copy(node) for node in ast.walk(tree)}
+    for node in copies.values():
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, list):
+                value = [
+                    copies[item] if isinstance(item, ast.AST) else item
+                    for item in value
+                ]
+            elif isinstance(value, ast.AST):
+                value = copies[value]
+            setattr(node, field, value)
+    return copies[tree]
+
+
+def optimize_expression(
+    tree: ast.Expression,
+    names: Mapping[str, typing.Any],
+    fast_powers: bool = False,
+) -> ast.Expression:
+    """Return an optimized copy of a validated ``eval``-mode expression tree.
+
+    ``names`` maps the allowed math names to the values the compiled code will
+    see (``math`` functions or their NumPy equivalents), so folded calls match
+    the backend exactly.
+    """
+    optimized = _ConstantFolder(names).visit(_copy_tree(tree))
+    optimized = _eliminate_common_subexpressions(optimized)
+    if fast_powers:
+        optimized = _PowerReducer().visit(optimized)
+    return ast.fix_missing_locations(optimized)
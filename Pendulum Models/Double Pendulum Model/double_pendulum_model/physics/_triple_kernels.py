@@ -0,0 +1,138 @@
+"""
+Triple pendulum kernels generated from the symbolic Lagrangian derivation.
+
+Do not edit by hand; regenerate with
+    python -m double_pendulum_model.physics.triple_codegen
+Arguments follow ``TRIPLE_KERNEL_ARGUMENTS`` in ``triple_pendulum.py``.
+"""
+
+# fmt: off
+# ruff: noqa: E501
+
+import math
+
+import numpy
+
+DERIVATION_HASH = "ce961ced5cf534c72d709284ec5abe3f531b4048b1257e569f0a1587cd539373"
+
+
+def mass_matrix(theta1, theta2, theta3, omega1, omega2, omega3, l1, l2, l3, lc1, lc2, lc3, m1, m2, m3, I1, I2, I3, g):
+    return numpy.array([[I1 + I2 + I3 + lc1**2*m1 + m2*(l1**2 + 2*l1*lc2*numpy.cos(theta2) + lc2**2) + m3*(l1**2 + 2*l1*l2*numpy.cos(theta2) + 2*l1*lc3*numpy.cos(theta2 + theta3) + l2**2 + 2*l2*lc3*numpy.cos(theta3) + lc3**2), I2 + I3 + lc2*m2*(l1*numpy.cos(theta2) + lc2) + m3*(l1*l2*numpy.cos(theta2) + l1*lc3*numpy.cos(theta2 + theta3) + l2**2 + 2*l2*lc3*numpy.cos(theta3) + lc3**2), I3 + lc3*m3*(l1*numpy.cos(theta2 + theta3) + l2*numpy.cos(theta3) + lc3)], [I2 + I3 + lc2*m2*(l1*numpy.cos(theta2) + lc2) + m3*(l1*l2*numpy.cos(theta2) + l1*lc3*numpy.cos(theta2 + theta3) + l2**2 + 2*l2*lc3*numpy.cos(theta3) + lc3**2), I2 + I3 + lc2**2*m2 + m3*(l2**2 + 2*l2*lc3*numpy.cos(theta3) + lc3**2), I3 + lc3*m3*(l2*numpy.cos(theta3) + lc3)], [I3 + lc3*m3*(l1*numpy.cos(theta2 + theta3) + l2*numpy.cos(theta3) + lc3), I3 + lc3*m3*(l2*numpy.cos(theta3) + lc3), I3 + lc3**2*m3]])
+
+
+def bias_vector(theta1, theta2, theta3, omega1, omega2, omega3, l1, l2, l3, lc1, lc2, lc3, m1, m2, m3, I1, I2, I3, g):
+    return numpy.array([[-g*l1*m2*numpy.sin(theta1) - g*l1*m3*numpy.sin(theta1) - g*l2*m3*numpy.sin(theta1 + theta2) - g*lc1*m1*numpy.sin(theta1) - g*lc2*m2*numpy.sin(theta1 + theta2) - g*lc3*m3*numpy.sin(theta1 + theta2 + theta3) - 2*l1*l2*m3*omega1*omega2*numpy.sin(theta2) - l1*l2*m3*omega2**2*numpy.sin(theta2) - 2*l1*lc2*m2*omega1*omega2*numpy.sin(theta2) - l1*lc2*m2*omega2**2*numpy.sin(theta2) - 2*l1*lc3*m3*omega1*omega2*numpy.sin(theta2 + theta3) - 2*l1*lc3*m3*omega1*omega3*numpy.sin(theta2 + theta3) - l1*lc3*m3*omega2**2*numpy.sin(theta2 + theta3) - 2*l1*lc3*m3*omega2*omega3*numpy.sin(theta2 + theta3) - l1*lc3*m3*omega3**2*numpy.sin(theta2 + theta3) - 2*l2*lc3*m3*omega1*omega3*numpy.sin(theta3) - 2*l2*lc3*m3*omega2*omega3*numpy.sin(theta3) - l2*lc3*m3*omega3**2*numpy.sin(theta3)], [-g*l2*m3*numpy.sin(theta1 + theta2) - g*lc2*m2*numpy.sin(theta1 + theta2) - g*lc3*m3*numpy.sin(theta1 + theta2 + theta3) + l1*l2*m3*omega1**2*numpy.sin(theta2) + l1*lc2*m2*omega1**2*numpy.sin(theta2) + l1*lc3*m3*omega1**2*numpy.sin(theta2 + theta3) - 2*l2*lc3*m3*omega1*omega3*numpy.sin(theta3) - 2*l2*lc3*m3*omega2*omega3*numpy.sin(theta3) - l2*lc3*m3*omega3**2*numpy.sin(theta3)], [lc3*m3*(-g*numpy.sin(theta1 + theta2 + theta3) + l1*omega1**2*numpy.sin(theta2 + theta3) + l2*omega1**2*numpy.sin(theta3) + 2*l2*omega1*omega2*numpy.sin(theta3) + l2*omega2**2*numpy.sin(theta3))]])
+
+
+def gravity_torques(theta1, theta2, theta3, l1, l2, l3, lc1, lc2, lc3, m1, m2, m3, I1, I2, I3, g):
+    return numpy.array([[-g*l1*m2*numpy.sin(theta1) - g*l1*m3*numpy.sin(theta1) - g*l2*m3*numpy.sin(theta1 + theta2) - g*lc1*m1*numpy.sin(theta1) - g*lc2*m2*numpy.sin(theta1 + theta2) - g*lc3*m3*numpy.sin(theta1 + theta2 + theta3)], [-g*l2*m3*numpy.sin(theta1 + theta2) - g*lc2*m2*numpy.sin(theta1 + theta2) - g*lc3*m3*numpy.sin(theta1 + theta2 + theta3)], [-g*lc3*m3*numpy.sin(theta1 + theta2 + theta3)]])
+
+
+def mass_matrix_and_bias(theta1, theta2, theta3, omega1, omega2, omega3, params):
+    """Mass matrix rows and bias as float tuples; ``params`` packs the rest."""
+    l1, l2, l3, lc1, lc2, lc3, m1, m2, m3, I1, I2, I3, g = params
+    x0 = l1**2
+    x1 = lc2**2
+    x2 = l1*math.cos(theta2)
+    x3 = l2*x2
+    x4 = theta2 + theta3
+    x5 = l1*math.cos(x4)
+    x6 = lc3*x5
+    x7 = lc3**2
+    x8 = l2*math.cos(theta3)
+    x9 = l2**2 + 2*lc3*x8 + x7
+    x10 = I2 + I3
+    x11 = lc2*m2
+    x12 = m3*(x3 + x6 + x9) + x10 + x11*(lc2 + x2)
+    x13 = lc3 + x8
+    x14 = lc3*m3
+    x15 = I3 + x14*(x13 + x5)
+    x16 = I3 + x13*x14
+    x17 = g*math.sin(theta1)
+    x18 = l1*x17
+    x19 = l2*m3
+    x20 = omega2**2
+    x21 = math.sin(theta2)
+    x22 = l1*x21
+    x23 = x20*x22
+    x24 = math.sin(x4)
+    x25 = l1*x24
+    x26 = x14*x25
+    x27 = omega3**2
+    x28 = 2*omega1
+    x29 = omega2*x28
+    x30 = x22*x29
+    x31 = omega3*x26
+    x32 = 2*omega2
+    x33 = g*math.sin(theta1 + theta2)
+    x34 = g*math.sin(theta1 + x4)
+    x35 = l2*math.sin(theta3)
+    x36 = x14*x35
+    x37 = omega3*x36
+    x38 = x11*x33 + x14*x34 + x19*x33 + x27*x36 + x28*x37 + x32*x37
+    x39 = omega1**2
+    return (
+        ((I1 + lc1**2*m1 + m2*(2*lc2*x2 + x0 + x1) + m3*(x0 + 2*x3 + 2*x6 + x9) + x10, x12, x15), (x12, m2*x1 + m3*x9 + x10, x16), (x15, x16, I3 + m3*x7)),
+        (-lc1*m1*x17 - m2*x18 - m3*x18 - x11*x23 - x11*x30 - x19*x23 - x19*x30 - x20*x26 - x26*x27 - x26*x29 - x28*x31 - x31*x32 - x38, l1*l2*m3*x21*x39 + l1*lc2*m2*x21*x39 + l1*lc3*m3*x24*x39 - x38, x14*(x20*x35 + x25*x39 + x29*x35 - x34 + x35*x39)),
+    )
+
+
+def mass_matrix_and_bias_array(theta1, theta2, theta3, omega1, omega2, omega3, params):
+    """Broadcast ``mass_matrix_and_bias`` to ``(..., 3, 3)`` and ``(..., 3)``."""
+    l1, l2, l3, lc1, lc2, lc3, m1, m2, m3, I1, I2, I3, g = params
+    x0 = l1**2
+    x1 = lc2**2
+    x2 = l1*numpy.cos(theta2)
+    x3 = l2*x2
+    x4 = theta2 + theta3
+    x5 = l1*numpy.cos(x4)
+    x6 = lc3*x5
+    x7 = lc3**2
+    x8 = l2*numpy.cos(theta3)
+    x9 = l2**2 + 2*lc3*x8 + x7
+    x10 = I2 + I3
+    x11 = lc2*m2
+    x12 = m3*(x3 + x6 + x9) + x10 + x11*(lc2 + x2)
+    x13 = lc3 + x8
+    x14 = lc3*m3
+    x15 = I3 + x14*(x13 + x5)
+    x16 = I3 + x13*x14
+    x17 = g*numpy.sin(theta1)
+    x18 = l1*x17
+    x19 = l2*m3
+    x20 = omega2**2
+    x21 = numpy.sin(theta2)
+    x22 = l1*x21
+    x23 = x20*x22
+    x24 = numpy.sin(x4)
+    x25 = l1*x24
+    x26 = x14*x25
+    x27 = omega3**2
+    x28 = 2*omega1
+    x29 = omega2*x28
+    x30 = x22*x29
+    x31 = omega3*x26
+    x32 = 2*omega2
+    x33 = g*numpy.sin(theta1 + theta2)
+    x34 = g*numpy.sin(theta1 + x4)
+    x35 = l2*numpy.sin(theta3)
+    x36 = x14*x35
+    x37 = omega3*x36
+    x38 = x11*x33 + x14*x34 + x19*x33 + x27*x36 + x28*x37 + x32*x37
+    x39 = omega1**2
+    shape = numpy.broadcast_shapes(numpy.shape(theta1), numpy.shape(theta2), numpy.shape(theta3), numpy.shape(omega1), numpy.shape(omega2), numpy.shape(omega3), numpy.shape(l1), numpy.shape(l2), numpy.shape(l3), numpy.shape(lc1), numpy.shape(lc2), numpy.shape(lc3), numpy.shape(m1), numpy.shape(m2), numpy.shape(m3), numpy.shape(I1), numpy.shape(I2), numpy.shape(I3), numpy.shape(g))
+    mass = numpy.empty(shape + (3, 3))
+    bias = numpy.empty(shape + (3,))
+    mass[..., 0, 0] = I1 + lc1**2*m1 + m2*(2*lc2*x2 + x0 + x1) + m3*(x0 + 2*x3 + 2*x6 + x9) + x10
+    mass[..., 0, 1] = x12
+    mass[..., 0, 2] = x15
+    mass[..., 1, 0] = x12
+    mass[..., 1, 1] = m2*x1 + m3*x9 + x10
+    mass[..., 1, 2] = x16
+    mass[..., 2, 0] = x15
+    mass[..., 2, 1] = x16
+    mass[..., 2, 2] = I3 + m3*x7
+    bias[..., 0] = -lc1*m1*x17 - m2*x18 - m3*x18 - x11*x23 - x11*x30 - x19*x23 - x19*x30 - x20*x26 - x26*x27 - x26*x29 - x28*x31 - x31*x32 - x38
+    bias[..., 1] = l1*l2*m3*x21*x39 + l1*lc2*m2*x21*x39 + l1*lc3*m3*x24*x39 - x38
+    bias[..., 2] = x14*(x20*x35 + x25*x39 + x29*x35 - x34 + x35*x39)
+    return mass, bias
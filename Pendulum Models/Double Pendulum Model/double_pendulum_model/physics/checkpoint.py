@@ -0,0 +1,201 @@
+"""
+Binary checkpoints for resuming long pendulum simulations.
+
+A checkpoint captures everything needed to continue a run bit for bit: the
+model parameters, the forcing expressions (double pendulum) or constant control
+(triple pendulum), the current time and state, and the adaptive integrator's
+next step proposal. Files are ``.npz`` archives holding float64 arrays plus a
+JSON header; floats in the header are written with ``repr`` precision, which
+round-trips exactly. Writes go to a temporary file that is atomically renamed,
+so a preempted job never leaves a truncated checkpoint behind.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import io
+import json
+import os
+import tempfile
+import typing
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from double_pendulum_model.physics.double_pendulum import (
+    DoublePendulumDynamics,
+    DoublePendulumParameters,
+    DoublePendulumState,
+    ExpressionFunction,
+    LowerSegmentProperties,
+    SegmentProperties,
+    zero_input,
+)
+from double_pendulum_model.physics.triple_pendulum import (
+    TriplePendulumDynamics,
+    TriplePendulumParameters,
+    TriplePendulumState,
+    TripleSegmentProperties,
+)
+
+CHECKPOINT_FORMAT_VERSION = 1
+
+_DOUBLE_STATE_FIELDS = ("theta1", "theta2", "omega1", "omega2", "phi", "omega_phi")
+_TRIPLE_STATE_FIELDS = ("theta1", "theta2", "theta3", "omega1", "omega2", "omega3")
+
+
+@dataclass
+class Checkpoint:
+    """A restored simulation: rebuilt dynamics plus where the run stopped."""
+
+    dynamics: DoublePendulumDynamics | TriplePendulumDynamics
+    state: DoublePendulumState | TriplePendulumState
+    t: float
+    control: tuple[float, float, float] | None = None
+    next_step: float | None = None
+    metadata: dict[str, typing.Any] = dataclasses.field(default_factory=dict)
+
+
+def _forcing_expressions(dynamics: DoublePendulumDynamics) -> list[str | None]:
+    expressions: list[str | None] = []
+    for forcing in dynamics.forcing_functions:
+        if forcing is zero_input:
+            expressions.append(None)
+        elif isinstance(forcing, ExpressionFunction):
+            expressions.append(forcing.expression)
+        else:
+            raise ValueError(
+                "Only ExpressionFunction and default zero forcing can be "
+                f"checkpointed, got {forcing!r}"
+            )
+    return expressions
+
+
+def save_checkpoint(
+    path: str | os.PathLike[str],
+    dynamics: DoublePendulumDynamics | TriplePendulumDynamics,
+    state: DoublePendulumState | TriplePendulumState,
+    t: float,
+    control: tuple[float, float, float] | None = None,
+    next_step: float | None = None,
+    metadata: dict[str, typing.Any] | None = None,
+) -> None:
+    """Atomically write a checkpoint of ``dynamics`` at time ``t`` to ``path``.
+
+    ``control`` is required for the triple pendulum. ``next_step`` stores the
+    adaptive step proposal (``AdaptiveSolution.proposed_steps``) and
+    ``metadata`` any extra JSON-serializable run information.
+    """
+    header: dict[str, typing.Any] = {
+        "format_version": CHECKPOINT_FORMAT_VERSION,
+        "parameters": dataclasses.asdict(dynamics.parameters),
+        "metadata": metadata or {},
+    }
+    if isinstance(dynamics, DoublePendulumDynamics):
+        header["model"] = "double"
+        header["forcing_expressions"] = _forcing_expressions(dynamics)
+        fields = _DOUBLE_STATE_FIELDS
+    else:
+        if control is None:
+            raise ValueError("control is required to checkpoint a triple pendulum")
+        header["model"] = "triple"
+        fields = _TRIPLE_STATE_FIELDS
+
+    arrays = {
+        "header": np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8),
+        "state": np.array([getattr(state, name) for name in fields], dtype=np.float64),
+        "t": np.array(t, dtype=np.float64),
+        "next_step": np.array(
+            np.nan if next_step is None else next_step, dtype=np.float64
+        ),
+    }
+    if control is not None:
+        arrays["control"] = np.array(control, dtype=np.float64)
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    target = Path(path)
+    fd, temporary = tempfile.mkstemp(
+        dir=target.parent, prefix=f".{target.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(buffer.getvalue())
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, target)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temporary)
+        raise
+
+
+def _double_parameters(data: dict[str, typing.Any]) -> DoublePendulumParameters:
+    data = dict(data)
+    return DoublePendulumParameters(
+        upper_segment=SegmentProperties(**data.pop("upper_segment")),
+        lower_segment=LowerSegmentProperties(**data.pop("lower_segment")),
+        **data,
+    )
+
+
+def _triple_parameters(data: dict[str, typing.Any]) -> TriplePendulumParameters:
+    segments = tuple(TripleSegmentProperties(**segment) for segment in data["segments"])
+    return TriplePendulumParameters(
+        segments=typing.cast(
+            "tuple[TripleSegmentProperties, TripleSegmentProperties, "
+            "TripleSegmentProperties]",
+            segments,
+        ),
+        damping=typing.cast("tuple[float, float, float]", tuple(data["damping"])),
+        gravity_enabled=data["gravity_enabled"],
+        gravity_m_s2=data["gravity_m_s2"],
+    )
+
+
+def load_checkpoint(path: str | os.PathLike[str]) -> Checkpoint:
+    """Read a checkpoint written by :func:`save_checkpoint`."""
+    with np.load(path, allow_pickle=False) as archive:
+        header = json.loads(archive["header"].tobytes().decode("utf-8"))
+        values = archive["state"].tolist()
+        t = float(archive["t"])
+        next_step = float(archive["next_step"])
+        control = (
+            typing.cast(
+                "tuple[float, float, float]", tuple(archive["control"].tolist())
+            )
+            if "control" in archive.files
+            else None
+        )
+
+    if header.get("format_version") != CHECKPOINT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported checkpoint format version {header.get('format_version')}"
+        )
+    dynamics: DoublePendulumDynamics | TriplePendulumDynamics
+    state: DoublePendulumState | TriplePendulumState
+    if header["model"] == "double":
+        forcing = tuple(
+            zero_input if expression is None else ExpressionFunction(expression)
+            for expression in header["forcing_expressions"]
+        )
+        dynamics = DoublePendulumDynamics(
+            _double_parameters(header["parameters"]), forcing_functions=forcing
+        )
+        state = DoublePendulumState(*values)
+    elif header["model"] == "triple":
+        dynamics = TriplePendulumDynamics(_triple_parameters(header["parameters"]))
+        state = TriplePendulumState(*values)
+    else:
+        raise ValueError(f"Unknown checkpoint model '{header['model']}'")
+
+    return Checkpoint(
+        dynamics=dynamics,
+        state=state,
+        t=t,
+        control=control,
+        next_step=None if np.isnan(next_step) else next_step,
+        metadata=header["metadata"],
+    )
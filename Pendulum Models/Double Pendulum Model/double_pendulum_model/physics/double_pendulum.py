@@ -10,9 +10,24 @@ for educational demonstrations of chaos and control.
 from __future__ import annotations
 
 import math
-from collections.abc import Callable, Iterable
+import typing
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from dataclasses import dataclass
 
+import numpy as np
+
+from double_pendulum_model.expression_cost import EvaluationBudget
+from double_pendulum_model.physics.fused_kernel import FusedKernel, build_fused_kernel
+from double_pendulum_model.physics.integrators import (
+    AdaptiveSolution,
+    Event,
+    EventOccurrence,
+    dormand_prince,
+    has_crossed,
+    hermite_interpolant,
+    locate_events,
+)
+from double_pendulum_model.physics.versioning import Versioned
 from double_pendulum_model.safe_eval import SafeEvaluator
 
 # Physical constants with documented units and references
@@ -38,37 +53,130 @@ DEFAULT_DAMPING_WRIST = 0.25
 # Numerical tolerance for detecting singular mass matrices (dimensionless)
 MASS_MATRIX_SINGULAR_TOLERANCE = 1e-12
 
+# Fixed-point iteration limits for the implicit midpoint rule
+MIDPOINT_TOLERANCE = 1e-13  # Relative change in the midpoint unknowns
+MIDPOINT_MAX_ITERATIONS = 100
+
+# Yoshida triple-jump weights composing three midpoint steps into a 4th order
+# symplectic step (H. Yoshida, Phys. Lett. A 150, 1990)
+YOSHIDA_OUTER_WEIGHT = 1.0 / (2.0 - 2.0 ** (1.0 / 3.0))
+YOSHIDA_INNER_WEIGHT = 1.0 - 2.0 * YOSHIDA_OUTER_WEIGHT
+
+# Two-stage, L-stable, stiffly accurate SDIRK (R. Alexander, SIAM J. Numer. Anal.
+# 14, 1977) and its simplified Newton iteration limits
+SDIRK_GAMMA = 1.0 - math.sqrt(2.0) / 2.0
+SDIRK_NEWTON_TOLERANCE = 1e-12  # Relative size of the Newton update
+SDIRK_MAX_NEWTON_ITERATIONS = 20
+
+# Relative perturbation for finite-difference derivatives of forcing functions
+FORCING_DIFFERENCE_STEP = 1e-6
+
+# Fixed-step integrators accepted by DoublePendulumDynamics.simulate()
+FIXED_STEP_METHODS = {
+    "rk4": "step_into",  # Classical 4th order Runge-Kutta
+    "rk4_fused": "step_fused_into",  # RK4 through a generated expression kernel
+    "midpoint": "step_midpoint_into",  # Symplectic implicit midpoint rule
+    "midpoint4": "step_midpoint4_into",  # 4th order symplectic composition
+    "sdirk2": "step_sdirk_into",  # L-stable implicit method for stiff cases
+}
+
+# RK4 steps per precomputed table of time-only forcing samples
+FORCING_TABLE_STEPS = 4096
+
+# Column layout of the (N, 4) state arrays used by the batch API
+STATE_COLUMNS = ("theta1", "theta2", "omega1", "omega2")
+EXPRESSION_VARIABLES = ("t", *STATE_COLUMNS)  # Positional order of forcing inputs
+
+
+def zero_input(_: float, __: DoublePendulumState) -> float:
+    """Default forcing function that applies no torque."""
+    return 0.0
+
 
 class ExpressionFunction:
     """Safe evaluation of user-provided expressions.
 
     The expression can use standard math functions, state variables, and time
     (``t``). Only a curated subset of ``ast`` nodes are accepted to prevent
-    arbitrary code execution.
+    arbitrary code execution. ``time_only`` is true when the expression reads
+    no state variables, so it can be sampled ahead of time with :meth:`sample`.
     """
 
     def __init__(self, expression: str) -> None:
         """Initialize the expression function."""
         self.expression = expression
-        self.evaluator = SafeEvaluator(
-            allowed_variables={"t", "theta1", "theta2", "omega1", "omega2"}
+        self.evaluator = SafeEvaluator(allowed_variables=set(EXPRESSION_VARIABLES))
+        self.time_only = self.evaluator.referenced_variables(expression) <= {"t"}
+        self._function = self.evaluator.compile_function(
+            expression, EXPRESSION_VARIABLES
         )
-        self._code = self.evaluator.compile(expression)
+        self._vectorized: Callable[..., np.ndarray] | None = None
+        self._partials: tuple[Callable[..., float], ...] | ValueError | None = None
 
     def __call__(self, t: float, state: DoublePendulumState) -> float:
         """Evaluate the expression for the given state and time."""
-        context = {
-            "t": t,
-            "theta1": state.theta1,
-            "theta2": state.theta2,
-            "omega1": state.omega1,
-            "omega2": state.omega2,
-        }
-        return self.evaluator.evaluate_code(self._code, context)
+        return self._function(t, state.theta1, state.theta2, state.omega1, state.omega2)
+
+    def evaluate_array(
+        self,
+        t: float | np.ndarray,
+        theta1: float | np.ndarray,
+        theta2: float | np.ndarray,
+        omega1: float | np.ndarray,
+        omega2: float | np.ndarray,
+    ) -> np.ndarray:
+        """Evaluate the expression element-wise over broadcastable arrays.
+
+        Math functions map to NumPy ufuncs, so a whole trajectory or ensemble
+        is evaluated in one call. The vectorized form is compiled on first use.
+        """
+        if self._vectorized is None:
+            self._vectorized = self.evaluator.compile_vectorized(
+                self.expression, EXPRESSION_VARIABLES
+            )
+        return self._vectorized(t, theta1, theta2, omega1, omega2)
+
+    def state_gradient(
+        self, t: float, state: DoublePendulumState
+    ) -> tuple[float, float, float, float]:
+        """Exact partial derivatives with respect to :data:`STATE_COLUMNS`.
+
+        The partials are derived symbolically and compiled on first use.
+        Raises ``ValueError`` when a derivative needs functions outside the
+        allowlist (e.g. ``fabs`` or ``%``).
+        """
+        if self._partials is None:
+            try:
+                self._partials = self.evaluator.compile_partials(
+                    self.expression, EXPRESSION_VARIABLES, STATE_COLUMNS
+                )
+            except ValueError as e:
+                self._partials = e
+        if isinstance(self._partials, ValueError):
+            raise self._partials
+        arguments = (t, state.theta1, state.theta2, state.omega1, state.omega2)
+        d_theta1, d_theta2, d_omega1, d_omega2 = (
+            partial(*arguments) for partial in self._partials
+        )
+        return d_theta1, d_theta2, d_omega1, d_omega2
+
+    def sample(self, times: np.ndarray) -> np.ndarray:
+        """Evaluate a time-only expression at every entry of ``times``."""
+        if not self.time_only:
+            raise ValueError(
+                f"Expression '{self.expression}' depends on the state and cannot "
+                "be sampled from time alone"
+            )
+        return self.evaluate_array(times, 0.0, 0.0, 0.0, 0.0)
+
+
+def _is_time_only(forcing: Callable[[float, DoublePendulumState], float]) -> bool:
+    """Whether ``forcing`` declares ``time_only`` and can ``sample`` times."""
+    return bool(getattr(forcing, "time_only", False)) and hasattr(forcing, "sample")
 
 
 @dataclass
-class SegmentProperties:
+class SegmentProperties(Versioned):
     """Physical properties of a single pendulum segment."""
 
     length_m: float
@@ -86,7 +194,7 @@ class SegmentProperties:
 
 
 @dataclass
-class LowerSegmentProperties:
+class LowerSegmentProperties(Versioned):
     """Composite properties for a golf-club-like lower segment."""
 
     length_m: float
@@ -126,7 +234,7 @@ class LowerSegmentProperties:
 
 
 @dataclass
-class DoublePendulumParameters:
+class DoublePendulumParameters(Versioned):
     """Configuration for the double pendulum."""
 
     upper_segment: SegmentProperties
@@ -169,6 +277,57 @@ class DoublePendulumParameters:
             return self.gravity_m_s2
         return self.gravity_m_s2 * math.cos(self.plane_inclination_rad)
 
+    @property
+    def version(self) -> int:
+        """Change stamp covering these parameters and both segments."""
+        return max(
+            super().version, self.upper_segment.version, self.lower_segment.version
+        )
+
+
+@dataclass(frozen=True)
+class CompiledCoefficients:
+    """Configuration-dependent constants of the equations of motion.
+
+    The mass matrix, Coriolis and gravity terms only depend on the state through
+    ``cos(theta2)``, ``sin(theta2)``, ``sin(theta1)`` and ``sin(theta1 + theta2)``.
+    Everything else is folded into these coefficients once per parameter change.
+    """
+
+    m11_constant: float  # Constant part of M11 (kg·m^2)
+    m12_constant: float  # Constant part of M12 (kg·m^2)
+    m22: float  # M22, independent of the state (kg·m^2)
+    coupling: float  # m2 * l1 * lc2, scales cos/sin(theta2) terms (kg·m^2)
+    gravity_shoulder: float  # (m1 * lc1 + m2 * l1) * g (N·m)
+    gravity_wrist: float  # m2 * lc2 * g (N·m)
+    damping_shoulder: float  # (N·m·s/rad)
+    damping_wrist: float  # (N·m·s/rad)
+
+    @classmethod
+    def from_parameters(
+        cls, parameters: DoublePendulumParameters
+    ) -> CompiledCoefficients:
+        upper = parameters.upper_segment
+        lower = parameters.lower_segment
+        m1 = upper.mass_kg
+        m2 = lower.total_mass
+        l1 = upper.length_m
+        lc1 = upper.center_of_mass_distance
+        lc2 = lower.center_of_mass_distance
+        i1 = upper.inertia_about_proximal_joint
+        i2 = lower.inertia_about_proximal_joint
+        g = parameters.projected_gravity
+        return cls(
+            m11_constant=i1 + i2 + m1 * lc1**2 + m2 * (l1**2 + lc2**2),
+            m12_constant=i2 + m2 * lc2**2,
+            m22=i2 + m2 * lc2**2,
+            coupling=m2 * l1 * lc2,
+            gravity_shoulder=(m1 * lc1 + m2 * l1) * g,
+            gravity_wrist=m2 * lc2 * g,
+            damping_shoulder=parameters.damping_shoulder,
+            damping_wrist=parameters.damping_wrist,
+        )
+
 
 @dataclass
 class DoublePendulumState:
@@ -192,6 +351,20 @@ class JointTorques:
     coriolis_centripetal: tuple[float, float]
 
 
+@dataclass
+class EventSimulation:
+    """Fixed-step trajectory that may stop early at a terminal event.
+
+    ``trajectory`` rows use the :meth:`DoublePendulumDynamics.simulate` column
+    layout and ``times`` holds the matching times. If a terminal event fired,
+    the last row is the interpolated state at the event time.
+    """
+
+    times: np.ndarray
+    trajectory: np.ndarray
+    events: list[EventOccurrence]
+
+
 class DoublePendulumDynamics:
     """Control-affine driven double pendulum."""
 
@@ -203,61 +376,57 @@ class DoublePendulumDynamics:
         ) = None,
     ) -> None:
         self.parameters = parameters or DoublePendulumParameters.default()
-
-        def zero_input(_: float, __: DoublePendulumState) -> float:
-            return 0.0
-
         self.forcing_functions = forcing_functions or (zero_input, zero_input)
+        self._compiled: CompiledCoefficients | None = None
+        self._compiled_source: DoublePendulumParameters | None = None
+        self._compiled_version = -1
+        self._scratch = DoublePendulumState(0.0, 0.0, 0.0, 0.0)
+        self._fused: (
+            tuple[CompiledCoefficients, tuple[object, ...], FusedKernel | None] | None
+        ) = None
+
+    @property
+    def coefficients(self) -> CompiledCoefficients:
+        """Coefficients for the current parameters, rebuilt only after changes."""
+        p = self.parameters
+        version = p.version
+        if (
+            self._compiled is None
+            or self._compiled_source is not p
+            or self._compiled_version != version
+        ):
+            self._compiled = CompiledCoefficients.from_parameters(p)
+            self._compiled_source = p
+            self._compiled_version = version
+        return self._compiled
 
     def mass_matrix(
         self, theta2: float
     ) -> tuple[tuple[float, float], tuple[float, float]]:
-        p = self.parameters
-        m1 = p.upper_segment.mass_kg
-        m2 = p.lower_segment.total_mass
-        l1 = p.upper_segment.length_m
-        lc1 = p.upper_segment.center_of_mass_distance
-        lc2 = p.lower_segment.center_of_mass_distance
-        i1 = p.upper_segment.inertia_about_proximal_joint
-        i2 = p.lower_segment.inertia_about_proximal_joint
-        cos_theta2 = math.cos(theta2)
-
-        m11 = i1 + i2 + m1 * lc1**2 + m2 * (l1**2 + lc2**2 + 2 * l1 * lc2 * cos_theta2)
-        m12 = i2 + m2 * (lc2**2 + l1 * lc2 * cos_theta2)
-        m22 = i2 + m2 * lc2**2
-        return ((m11, m12), (m12, m22))
+        k = self.coefficients
+        coupling_cos = k.coupling * math.cos(theta2)
+        m11 = k.m11_constant + 2 * coupling_cos
+        m12 = k.m12_constant + coupling_cos
+        return ((m11, m12), (m12, k.m22))
 
     def coriolis_vector(
         self, theta2: float, omega1: float, omega2: float
     ) -> tuple[float, float]:
-        p = self.parameters
-        m2 = p.lower_segment.total_mass
-        l1 = p.upper_segment.length_m
-        lc2 = p.lower_segment.center_of_mass_distance
-        sin_theta2 = math.sin(theta2)
-        h = -m2 * l1 * lc2 * sin_theta2
+        h = -self.coefficients.coupling * math.sin(theta2)
         c1 = h * (2 * omega1 * omega2 + omega2**2)
-        c2 = h * omega1**2
+        c2 = -h * omega1**2
         return c1, c2
 
     def gravity_vector(self, theta1: float, theta2: float) -> tuple[float, float]:
-        p = self.parameters
-        m1 = p.upper_segment.mass_kg
-        m2 = p.lower_segment.total_mass
-        l1 = p.upper_segment.length_m
-        lc1 = p.upper_segment.center_of_mass_distance
-        lc2 = p.lower_segment.center_of_mass_distance
-        g = p.projected_gravity
-        g1 = (m1 * lc1 + m2 * l1) * g * math.sin(theta1) + m2 * lc2 * g * math.sin(
-            theta1 + theta2
-        )
-        g2 = m2 * lc2 * g * math.sin(theta1 + theta2)
+        k = self.coefficients
+        g2 = k.gravity_wrist * math.sin(theta1 + theta2)
+        g1 = k.gravity_shoulder * math.sin(theta1) + g2
         return g1, g2
 
     def damping_vector(self, omega1: float, omega2: float) -> tuple[float, float]:
-        p = self.parameters
-        d1 = p.damping_shoulder * omega1
-        d2 = p.damping_wrist * omega2
+        k = self.coefficients
+        d1 = k.damping_shoulder * omega1
+        d2 = k.damping_wrist * omega2
         return d1, d2
 
     def _invert_mass_matrix(
@@ -334,59 +503,1082 @@ class DoublePendulumDynamics:
             coriolis_centripetal=(c1, c2),
         )
 
+    def _accelerations(
+        self, t: float, state: DoublePendulumState
+    ) -> tuple[float, float]:
+        """Joint accelerations for ``state`` using only scalar locals."""
+        return self._torque_accelerations(
+            state,
+            self.forcing_functions[0](t, state),
+            self.forcing_functions[1](t, state),
+        )
+
+    def _stage_accelerations(
+        self,
+        t: float,
+        state: DoublePendulumState,
+        shoulder: list[float] | None,
+        wrist: list[float] | None,
+        stage: int,
+    ) -> tuple[float, float]:
+        """:meth:`_accelerations` with torques taken from stage samples if given."""
+        forcing = self.forcing_functions
+        return self._torque_accelerations(
+            state,
+            forcing[0](t, state) if shoulder is None else shoulder[stage],
+            forcing[1](t, state) if wrist is None else wrist[stage],
+        )
+
+    def _torque_accelerations(
+        self, state: DoublePendulumState, tau1: float, tau2: float
+    ) -> tuple[float, float]:
+        """Joint accelerations for ``state`` under the applied torques."""
+        k = self.coefficients
+        theta1 = state.theta1
+        theta2 = state.theta2
+        omega1 = state.omega1
+        omega2 = state.omega2
+
+        coupling_cos = k.coupling * math.cos(theta2)
+        m11 = k.m11_constant + 2 * coupling_cos
+        m12 = k.m12_constant + coupling_cos
+        m22 = k.m22
+        determinant = m11 * m22 - m12 * m12
+        if abs(determinant) <= MASS_MATRIX_SINGULAR_TOLERANCE:
+            raise ZeroDivisionError(
+                "Mass matrix determinant is too close to zero; "
+                "check pendulum parameters"
+            )
+
+        h = -k.coupling * math.sin(theta2)
+        g2 = k.gravity_wrist * math.sin(theta1 + theta2)
+        g1 = k.gravity_shoulder * math.sin(theta1) + g2
+        rhs1 = (
+            tau1
+            - h * (2 * omega1 * omega2 + omega2**2)
+            - g1
+            - k.damping_shoulder * omega1
+        )
+        rhs2 = tau2 + h * omega1**2 - g2 - k.damping_wrist * omega2
+        acc1 = (m22 / determinant) * rhs1 + (-m12 / determinant) * rhs2
+        acc2 = (-m12 / determinant) * rhs1 + (m11 / determinant) * rhs2
+        return acc1, acc2
+
     def derivatives(
         self, t: float, state: DoublePendulumState
     ) -> tuple[float, float, float, float]:
-        tau1, tau2 = self.applied_torques(t, state)
-        c1, c2 = self.coriolis_vector(state.theta2, state.omega1, state.omega2)
-        g1, g2 = self.gravity_vector(state.theta1, state.theta2)
-        d1, d2 = self.damping_vector(state.omega1, state.omega2)
-        _, inv_m = self._invert_mass_matrix(state.theta2)
-        acc1 = inv_m[0][0] * (tau1 - c1 - g1 - d1) + inv_m[0][1] * (tau2 - c2 - g2 - d2)
-        acc2 = inv_m[1][0] * (tau1 - c1 - g1 - d1) + inv_m[1][1] * (tau2 - c2 - g2 - d2)
+        acc1, acc2 = self._accelerations(t, state)
         return state.omega1, state.omega2, acc1, acc2
 
     def step(
         self, t: float, state: DoublePendulumState, dt: float
     ) -> DoublePendulumState:
-        def rk4_increment(
-            current_state: DoublePendulumState, scale: float, derivs: Iterable[float]
-        ) -> DoublePendulumState:
-            dtheta1, dtheta2, domega1, domega2 = derivs
-            # Preserve phi and omega_phi (out-of-plane motion not yet in dynamics)
-            phi = getattr(current_state, "phi", 0.0)
-            omega_phi = getattr(current_state, "omega_phi", 0.0)
-            return DoublePendulumState(
-                theta1=current_state.theta1 + scale * dtheta1,
-                theta2=current_state.theta2 + scale * dtheta2,
-                omega1=current_state.omega1 + scale * domega1,
-                omega2=current_state.omega2 + scale * domega2,
-                phi=phi,
-                omega_phi=omega_phi,
+        return self.step_into(t, state, dt, DoublePendulumState(0.0, 0.0, 0.0, 0.0))
+
+    def step_into(
+        self,
+        t: float,
+        state: DoublePendulumState,
+        dt: float,
+        out: DoublePendulumState,
+    ) -> DoublePendulumState:
+        """Advance ``state`` by one RK4 step, writing the result into ``out``.
+
+        ``out`` may be ``state`` itself for in-place updates. Intermediate
+        stages reuse a single scratch state instead of allocating new ones.
+        Out-of-plane ``phi`` and ``omega_phi`` are carried over unchanged.
+        """
+        return self._rk4_into(t, state, dt, out, None, None, 0)
+
+    def _rk4_into(
+        self,
+        t: float,
+        state: DoublePendulumState,
+        dt: float,
+        out: DoublePendulumState,
+        shoulder: list[float] | None,
+        wrist: list[float] | None,
+        stage: int,
+    ) -> DoublePendulumState:
+        """RK4 step of :meth:`step_into` with optional precomputed torques.
+
+        ``shoulder`` and ``wrist`` replace the corresponding forcing function
+        by its samples at the stage times ``t``, ``t + dt/2`` and ``t + dt``,
+        stored at indices ``stage``, ``stage + 1`` and ``stage + 2``.
+        """
+        scratch = self._scratch
+        theta1 = state.theta1
+        theta2 = state.theta2
+        omega1 = state.omega1
+        omega2 = state.omega2
+        scratch.phi = state.phi
+        scratch.omega_phi = state.omega_phi
+        half_dt = dt / 2.0
+
+        scratch.theta1 = theta1
+        scratch.theta2 = theta2
+        scratch.omega1 = omega1
+        scratch.omega2 = omega2
+        acc1_k1, acc2_k1 = self._stage_accelerations(t, scratch, shoulder, wrist, stage)
+
+        scratch.theta1 = theta1 + half_dt * omega1
+        scratch.theta2 = theta2 + half_dt * omega2
+        omega1_k2 = scratch.omega1 = omega1 + half_dt * acc1_k1
+        omega2_k2 = scratch.omega2 = omega2 + half_dt * acc2_k1
+        acc1_k2, acc2_k2 = self._stage_accelerations(
+            t + half_dt, scratch, shoulder, wrist, stage + 1
+        )
+
+        scratch.theta1 = theta1 + half_dt * omega1_k2
+        scratch.theta2 = theta2 + half_dt * omega2_k2
+        omega1_k3 = scratch.omega1 = omega1 + half_dt * acc1_k2
+        omega2_k3 = scratch.omega2 = omega2 + half_dt * acc2_k2
+        acc1_k3, acc2_k3 = self._stage_accelerations(
+            t + half_dt, scratch, shoulder, wrist, stage + 1
+        )
+
+        scratch.theta1 = theta1 + dt * omega1_k3
+        scratch.theta2 = theta2 + dt * omega2_k3
+        omega1_k4 = scratch.omega1 = omega1 + dt * acc1_k3
+        omega2_k4 = scratch.omega2 = omega2 + dt * acc2_k3
+        acc1_k4, acc2_k4 = self._stage_accelerations(
+            t + dt, scratch, shoulder, wrist, stage + 2
+        )
+
+        sixth_dt = dt / 6.0
+        out.theta1 = theta1 + sixth_dt * (
+            omega1 + 2 * omega1_k2 + 2 * omega1_k3 + omega1_k4
+        )
+        out.theta2 = theta2 + sixth_dt * (
+            omega2 + 2 * omega2_k2 + 2 * omega2_k3 + omega2_k4
+        )
+        out.omega1 = omega1 + sixth_dt * (acc1_k1 + 2 * acc1_k2 + 2 * acc1_k3 + acc1_k4)
+        out.omega2 = omega2 + sixth_dt * (acc2_k1 + 2 * acc2_k2 + 2 * acc2_k3 + acc2_k4)
+        out.phi = scratch.phi
+        out.omega_phi = scratch.omega_phi
+        return out
+
+    def fused_kernel(self) -> FusedKernel | None:
+        """Generated RK4 kernel for the current coefficients and forcing.
+
+        Available when every forcing function is an :class:`ExpressionFunction`
+        or :func:`zero_input`; returns ``None`` for other callables. Kernels are
+        shared between instances with equal coefficients and expressions.
+        """
+        k = self.coefficients
+        forcing_functions = self.forcing_functions
+        cached = self._fused
+        if cached is not None and cached[0] is k and cached[1] is forcing_functions:
+            return cached[2]
+        expressions: list[str | None] = []
+        for forcing in forcing_functions:
+            if forcing is zero_input:
+                expressions.append(None)
+            elif isinstance(forcing, ExpressionFunction):
+                expressions.append(forcing.expression)
+            else:
+                break
+        kernel = (
+            build_fused_kernel(
+                k, expressions[0], expressions[1], MASS_MATRIX_SINGULAR_TOLERANCE
             )
+            if len(expressions) == len(forcing_functions)
+            else None
+        )
+        self._fused = (k, forcing_functions, kernel)
+        return kernel
 
-        k1 = self.derivatives(t, state)
-        k2 = self.derivatives(t + dt / 2.0, rk4_increment(state, dt / 2.0, k1))
-        k3 = self.derivatives(t + dt / 2.0, rk4_increment(state, dt / 2.0, k2))
-        k4 = self.derivatives(t + dt, rk4_increment(state, dt, k3))
+    def step_fused_into(
+        self,
+        t: float,
+        state: DoublePendulumState,
+        dt: float,
+        out: DoublePendulumState,
+    ) -> DoublePendulumState:
+        """RK4 step through :meth:`fused_kernel`, bit-identical to :meth:`step_into`.
+
+        Falls back to :meth:`step_into` when no kernel can be generated.
+        """
+        kernel = self.fused_kernel()
+        if kernel is None:
+            return self.step_into(t, state, dt, out)
+        out.theta1, out.theta2, out.omega1, out.omega2 = kernel.step(
+            t, state.theta1, state.theta2, state.omega1, state.omega2, dt
+        )
+        out.phi = state.phi
+        out.omega_phi = state.omega_phi
+        return out
+
+    def _fixed_step_method(
+        self, method: str
+    ) -> Callable[
+        [float, DoublePendulumState, float, DoublePendulumState], DoublePendulumState
+    ]:
+        if method not in FIXED_STEP_METHODS:
+            raise ValueError(
+                f"Unknown integration method '{method}'; "
+                f"expected one of {', '.join(FIXED_STEP_METHODS)}"
+            )
+        return typing.cast(
+            "Callable[[float, DoublePendulumState, float, DoublePendulumState], "
+            "DoublePendulumState]",
+            getattr(self, FIXED_STEP_METHODS[method]),
+        )
 
-        new_theta1 = state.theta1 + dt / 6.0 * (k1[0] + 2 * k2[0] + 2 * k3[0] + k4[0])
-        new_theta2 = state.theta2 + dt / 6.0 * (k1[1] + 2 * k2[1] + 2 * k3[1] + k4[1])
-        new_omega1 = state.omega1 + dt / 6.0 * (k1[2] + 2 * k2[2] + 2 * k3[2] + k4[2])
-        new_omega2 = state.omega2 + dt / 6.0 * (k1[3] + 2 * k2[3] + 2 * k3[3] + k4[3])
+    def simulate_events(
+        self,
+        state0: DoublePendulumState,
+        t0: float,
+        dt: float,
+        n_steps: int,
+        events: Sequence[Event],
+        method: str = "rk4",
+    ) -> EventSimulation:
+        """Fixed-step integration with event location inside the stepping loop.
+
+        Event functions take ``(t, DoublePendulumState)``. Sign changes are
+        bracketed per step and refined on a cubic Hermite interpolant of the
+        step, so event times are not limited to multiples of ``dt``. The run
+        stops at the first terminal event.
+        """
+        step_into = self._fixed_step_method(method)
+        trajectory = np.empty((n_steps, 6), dtype=np.float64)
+        times = np.empty(n_steps, dtype=np.float64)
+        current = DoublePendulumState(
+            state0.theta1,
+            state0.theta2,
+            state0.omega1,
+            state0.omega2,
+            state0.phi,
+            state0.omega_phi,
+        )
+        previous = DoublePendulumState(0.0, 0.0, 0.0, 0.0)
+        phi, omega_phi = state0.phi, state0.omega_phi
 
-        # Preserve phi and omega_phi
-        phi = getattr(state, "phi", 0.0)
-        omega_phi = getattr(state, "omega_phi", 0.0)
+        def evaluate(event: Event, time: float, y: np.ndarray) -> float:
+            return event.function(
+                time, DoublePendulumState(*y.tolist(), phi, omega_phi)
+            )
+
+        occurrences: list[EventOccurrence] = []
+        g_values = [event.function(t0, current) for event in events]
+        t = t0
+        for i in range(n_steps):
+            previous.theta1 = current.theta1
+            previous.theta2 = current.theta2
+            previous.omega1 = current.omega1
+            previous.omega2 = current.omega2
+            step_into(t, current, dt, current)
+            t_new = t + dt
+            g_new = [event.function(t_new, current) for event in events]
+            row = (
+                current.theta1,
+                current.theta2,
+                current.omega1,
+                current.omega2,
+                current.phi,
+                current.omega_phi,
+            )
+            if any(
+                has_crossed(event, g_values[j], g_new[j])
+                for j, event in enumerate(events)
+            ):
+                interpolant = hermite_interpolant(
+                    t,
+                    np.array(
+                        (
+                            previous.theta1,
+                            previous.theta2,
+                            previous.omega1,
+                            previous.omega2,
+                        )
+                    ),
+                    np.array(self.derivatives(t, previous)),
+                    t_new,
+                    np.array(row[:4]),
+                    np.array(self.derivatives(t_new, current)),
+                )
+                found = locate_events(
+                    events, g_values, g_new, t, t_new, interpolant, evaluate
+                )
+                occurrences.extend(
+                    EventOccurrence(
+                        index=occurrence.index,
+                        t=occurrence.t,
+                        y=np.concatenate((occurrence.y, (phi, omega_phi))),
+                    )
+                    for occurrence in found
+                )
+                if found and events[found[-1].index].terminal:
+                    times[i] = occurrences[-1].t
+                    trajectory[i] = occurrences[-1].y
+                    return EventSimulation(
+                        times=times[: i + 1],
+                        trajectory=trajectory[: i + 1],
+                        events=occurrences,
+                    )
+            times[i] = t_new
+            trajectory[i] = row
+            g_values = g_new
+            t = t_new
+        return EventSimulation(times=times, trajectory=trajectory, events=occurrences)
+
+    def simulate(
+        self,
+        state0: DoublePendulumState,
+        t0: float,
+        dt: float,
+        n_steps: int,
+        out: np.ndarray | None = None,
+        method: str = "rk4",
+        time_budget: float | None = None,
+    ) -> np.ndarray:
+        """Integrate ``n_steps`` fixed steps into a preallocated trajectory array.
+
+        Row ``i`` holds the state at ``t0 + (i + 1) * dt`` with columns
+        ``(theta1, theta2, omega1, omega2, phi, omega_phi)``. Pass ``out`` to
+        reuse an existing ``(n_steps, 6)`` float64 buffer across runs.
+        ``method`` is one of :data:`FIXED_STEP_METHODS`. With ``"rk4"``,
+        time-only forcing is precomputed with NumPy, which may round
+        differently from :mod:`math` in the last bit compared with :meth:`step`.
+        With ``time_budget`` (seconds) the run raises
+        :class:`~double_pendulum_model.expression_cost.EvaluationBudgetExceeded`
+        instead of running past its wall-clock allowance.
+        """
+        step_into = self._fixed_step_method(method)
+        if out is None:
+            out = np.empty((n_steps, 6), dtype=np.float64)
+        elif out.shape != (n_steps, 6) or out.dtype != np.float64:
+            raise ValueError(
+                f"out must be a float64 array of shape ({n_steps}, 6), "
+                f"got {out.dtype} {out.shape}"
+            )
+        current = DoublePendulumState(
+            theta1=state0.theta1,
+            theta2=state0.theta2,
+            omega1=state0.omega1,
+            omega2=state0.omega2,
+            phi=state0.phi,
+            omega_phi=state0.omega_phi,
+        )
+        budget = None if time_budget is None else EvaluationBudget(time_budget)
+        self._fill_trajectory(step_into, current, t0, dt, out, budget=budget)
+        return out
+
+    def iter_blocks(
+        self,
+        state0: DoublePendulumState,
+        t0: float,
+        dt: float,
+        block_size: int = 4096,
+        n_steps: int | None = None,
+        method: str = "rk4",
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Stream a fixed-step run as ``(times, states)`` blocks.
+
+        Each block holds up to ``block_size`` rows in the :meth:`simulate`
+        column layout, so arbitrarily long runs (``n_steps=None`` streams
+        forever) need constant memory. Integration only advances when the
+        consumer requests the next block, and every block is a fresh array
+        that stays valid after the generator moves on.
+        """
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        step_into = self._fixed_step_method(method)
+        current = DoublePendulumState(
+            theta1=state0.theta1,
+            theta2=state0.theta2,
+            omega1=state0.omega1,
+            omega2=state0.omega2,
+            phi=state0.phi,
+            omega_phi=state0.omega_phi,
+        )
+        t = t0
+        remaining = n_steps
+        while remaining is None or remaining > 0:
+            rows = block_size if remaining is None else min(block_size, remaining)
+            times = np.empty(rows, dtype=np.float64)
+            states = np.empty((rows, 6), dtype=np.float64)
+            t = self._fill_trajectory(step_into, current, t, dt, states, times)
+            if remaining is not None:
+                remaining -= rows
+            yield times, states
+
+    def _fill_trajectory(
+        self,
+        step_into: Callable[
+            [float, DoublePendulumState, float, DoublePendulumState],
+            DoublePendulumState,
+        ],
+        current: DoublePendulumState,
+        t: float,
+        dt: float,
+        out: np.ndarray,
+        times: np.ndarray | None = None,
+        budget: EvaluationBudget | None = None,
+    ) -> float:
+        """Step ``current`` in place once per row of ``out``; returns the end time.
+
+        Time is accumulated step by step so that a run split into pieces (or
+        resumed from a saved time) reproduces an uninterrupted run exactly.
+        With RK4, time-only forcing is sampled in vectorized chunks of
+        :data:`FORCING_TABLE_STEPS` steps at the stage times ``t``,
+        ``t + dt/2`` and ``t + dt`` instead of being evaluated per stage.
+        """
+        sampled = step_into == self.step_into and any(
+            _is_time_only(forcing) for forcing in self.forcing_functions
+        )
+        if not sampled:
+            return self._fill_rows(step_into, current, t, dt, out, times, budget)
+
+        for start in range(0, len(out), FORCING_TABLE_STEPS):
+            stop = min(start + FORCING_TABLE_STEPS, len(out))
+            t = self._fill_rows(
+                step_into,
+                current,
+                t,
+                dt,
+                out[start:stop],
+                None if times is None else times[start:stop],
+                budget,
+                self._stage_samples(t, dt, stop - start),
+            )
+        return t
+
+    def _stage_samples(
+        self, t: float, dt: float, n_steps: int
+    ) -> tuple[list[float] | None, list[float] | None]:
+        """Time-only forcing sampled at the RK4 stage times of the next steps.
+
+        Entry ``2 * i`` holds the torque at the start of step ``i`` and entry
+        ``2 * i + 1`` at its midpoint; the end of step ``i`` is the start of
+        step ``i + 1``. Other forcing functions give ``None``.
+        """
+        half_dt = dt / 2.0
+        stage_times = np.empty(2 * n_steps + 1, dtype=np.float64)
+        for i in range(n_steps):
+            stage_times[2 * i] = t
+            stage_times[2 * i + 1] = t + half_dt
+            t += dt
+        stage_times[-1] = t
+        shoulder, wrist = (
+            (
+                forcing.sample(stage_times).tolist()  # type: ignore[attr-defined]
+                if _is_time_only(forcing)
+                else None
+            )
+            for forcing in self.forcing_functions
+        )
+        return shoulder, wrist
+
+    def _fill_rows(
+        self,
+        step_into: Callable[
+            [float, DoublePendulumState, float, DoublePendulumState],
+            DoublePendulumState,
+        ],
+        current: DoublePendulumState,
+        t: float,
+        dt: float,
+        out: np.ndarray,
+        times: np.ndarray | None,
+        budget: EvaluationBudget | None,
+        stage_samples: tuple[list[float] | None, list[float] | None] | None = None,
+    ) -> float:
+        """Step ``current`` once per row of ``out``; returns the end time.
+
+        With ``stage_samples`` (from :meth:`_stage_samples`) steps are RK4
+        steps taking torques from the samples by stage number.
+        """
+        for i in range(len(out)):
+            if budget is not None:
+                budget.check()
+            if stage_samples is None:
+                step_into(t, current, dt, current)
+            else:
+                self._rk4_into(t, current, dt, current, *stage_samples, 2 * i)
+            t += dt
+            out[i] = (
+                current.theta1,
+                current.theta2,
+                current.omega1,
+                current.omega2,
+                current.phi,
+                current.omega_phi,
+            )
+            if times is not None:
+                times[i] = t
+        return t
+
+    def total_energy(self, state: DoublePendulumState) -> float:
+        """Kinetic plus gravitational potential energy (J).
+
+        The potential is zero with both segments horizontal in the swing plane,
+        so that ``-dV/dtheta`` equals the negated :meth:`gravity_vector`.
+        """
+        k = self.coefficients
+        (m11, m12), (_, m22) = self.mass_matrix(state.theta2)
+        omega1 = state.omega1
+        omega2 = state.omega2
+        kinetic = 0.5 * (m11 * omega1**2 + 2 * m12 * omega1 * omega2 + m22 * omega2**2)
+        potential = -k.gravity_shoulder * math.cos(
+            state.theta1
+        ) - k.gravity_wrist * math.cos(state.theta1 + state.theta2)
+        return kinetic + potential
+
+    def _momentum_rates(
+        self, t: float, state: DoublePendulumState
+    ) -> tuple[float, float]:
+        """Time derivative of the canonical momenta ``p = M(theta2) @ omega``.
+
+        Equals ``-dH/dq`` plus the applied and damping torques.
+        """
+        k = self.coefficients
+        theta1 = state.theta1
+        theta2 = state.theta2
+        omega1 = state.omega1
+        omega2 = state.omega2
+        tau1 = self.forcing_functions[0](t, state)
+        tau2 = self.forcing_functions[1](t, state)
+        h = -k.coupling * math.sin(theta2)
+        g2 = k.gravity_wrist * math.sin(theta1 + theta2)
+        g1 = k.gravity_shoulder * math.sin(theta1) + g2
+        dp1 = tau1 - g1 - k.damping_shoulder * omega1
+        dp2 = tau2 + h * (omega1**2 + omega1 * omega2) - g2 - k.damping_wrist * omega2
+        return dp1, dp2
+
+    def _velocities_from_momenta(
+        self, theta2: float, p1: float, p2: float
+    ) -> tuple[float, float]:
+        k = self.coefficients
+        coupling_cos = k.coupling * math.cos(theta2)
+        m11 = k.m11_constant + 2 * coupling_cos
+        m12 = k.m12_constant + coupling_cos
+        m22 = k.m22
+        determinant = m11 * m22 - m12 * m12
+        if abs(determinant) <= MASS_MATRIX_SINGULAR_TOLERANCE:
+            raise ZeroDivisionError(
+                "Mass matrix determinant is too close to zero; "
+                "check pendulum parameters"
+            )
+        return (m22 * p1 - m12 * p2) / determinant, (m11 * p2 - m12 * p1) / determinant
+
+    def step_midpoint_into(
+        self,
+        t: float,
+        state: DoublePendulumState,
+        dt: float,
+        out: DoublePendulumState,
+    ) -> DoublePendulumState:
+        """Advance one step with the implicit midpoint rule on canonical momenta.
+
+        The rule is symplectic for the conservative system, so with zero damping
+        and time-independent forcing the energy error stays bounded instead of
+        drifting, even at steps several times larger than RK4 needs. The
+        implicit midpoint equations are solved by fixed-point iteration.
+        """
+        scratch = self._scratch
+        theta1 = state.theta1
+        theta2 = state.theta2
+        (m11, m12), (_, m22) = self.mass_matrix(theta2)
+        p1 = m11 * state.omega1 + m12 * state.omega2
+        p2 = m12 * state.omega1 + m22 * state.omega2
+        scratch.phi = state.phi
+        scratch.omega_phi = state.omega_phi
+        half_dt = dt / 2.0
+        t_mid = t + half_dt
+
+        mid_theta1, mid_theta2, mid_p1, mid_p2 = theta1, theta2, p1, p2
+        scale = 1.0 + max(abs(theta1), abs(theta2), abs(p1), abs(p2))
+        for _ in range(MIDPOINT_MAX_ITERATIONS):
+            omega1, omega2 = self._velocities_from_momenta(mid_theta2, mid_p1, mid_p2)
+            scratch.theta1 = mid_theta1
+            scratch.theta2 = mid_theta2
+            scratch.omega1 = omega1
+            scratch.omega2 = omega2
+            dp1, dp2 = self._momentum_rates(t_mid, scratch)
+            next_theta1 = theta1 + half_dt * omega1
+            next_theta2 = theta2 + half_dt * omega2
+            next_p1 = p1 + half_dt * dp1
+            next_p2 = p2 + half_dt * dp2
+            change = max(
+                abs(next_theta1 - mid_theta1),
+                abs(next_theta2 - mid_theta2),
+                abs(next_p1 - mid_p1),
+                abs(next_p2 - mid_p2),
+            )
+            mid_theta1, mid_theta2, mid_p1, mid_p2 = (
+                next_theta1,
+                next_theta2,
+                next_p1,
+                next_p2,
+            )
+            if change <= MIDPOINT_TOLERANCE * scale:
+                break
+        else:
+            raise RuntimeError(
+                f"Implicit midpoint iteration did not converge at t={t}; "
+                "reduce the time step"
+            )
 
-        return DoublePendulumState(
-            theta1=new_theta1,
-            theta2=new_theta2,
-            omega1=new_omega1,
-            omega2=new_omega2,
-            phi=phi,
-            omega_phi=omega_phi,
+        new_theta2 = 2.0 * mid_theta2 - theta2
+        omega1, omega2 = self._velocities_from_momenta(
+            new_theta2, 2.0 * mid_p1 - p1, 2.0 * mid_p2 - p2
         )
+        out.theta1 = 2.0 * mid_theta1 - theta1
+        out.theta2 = new_theta2
+        out.omega1 = omega1
+        out.omega2 = omega2
+        out.phi = scratch.phi
+        out.omega_phi = scratch.omega_phi
+        return out
+
+    def step_midpoint4_into(
+        self,
+        t: float,
+        state: DoublePendulumState,
+        dt: float,
+        out: DoublePendulumState,
+    ) -> DoublePendulumState:
+        """Fourth order symplectic step built from three midpoint sub-steps."""
+        outer = YOSHIDA_OUTER_WEIGHT * dt
+        inner = YOSHIDA_INNER_WEIGHT * dt
+        self.step_midpoint_into(t, state, outer, out)
+        self.step_midpoint_into(t + outer, out, inner, out)
+        return self.step_midpoint_into(t + outer + inner, out, outer, out)
+
+    def state_jacobian(
+        self, state: DoublePendulumState, control: tuple[float, float]
+    ) -> np.ndarray:
+        """Closed-form ``d f / d x`` of the state derivative for fixed torques.
+
+        Rows and columns follow :data:`STATE_COLUMNS`; ``control`` holds the
+        shoulder and wrist torques, treated as independent of the state.
+        """
+        k = self.coefficients
+        theta1 = state.theta1
+        theta2 = state.theta2
+        omega1 = state.omega1
+        omega2 = state.omega2
+        sin_theta2 = math.sin(theta2)
+        cos_theta2 = math.cos(theta2)
+        cos_theta12 = math.cos(theta1 + theta2)
+
+        coupling_cos = k.coupling * cos_theta2
+        m11 = k.m11_constant + 2 * coupling_cos
+        m12 = k.m12_constant + coupling_cos
+        m22 = k.m22
+        determinant = m11 * m22 - m12 * m12
+        if abs(determinant) <= MASS_MATRIX_SINGULAR_TOLERANCE:
+            raise ZeroDivisionError(
+                "Mass matrix determinant is too close to zero; "
+                "check pendulum parameters"
+            )
+        inv11 = m22 / determinant
+        inv12 = -m12 / determinant
+        inv22 = m11 / determinant
+
+        h = -k.coupling * sin_theta2
+        dh = -coupling_cos
+        g2 = k.gravity_wrist * math.sin(theta1 + theta2)
+        g1 = k.gravity_shoulder * math.sin(theta1) + g2
+        rhs1 = (
+            control[0]
+            - h * (2 * omega1 * omega2 + omega2**2)
+            - g1
+            - k.damping_shoulder * omega1
+        )
+        rhs2 = control[1] + h * omega1**2 - g2 - k.damping_wrist * omega2
+        acc1 = inv11 * rhs1 + inv12 * rhs2
+        acc2 = inv12 * rhs1 + inv22 * rhs2
+
+        # d rhs / d x and the d M / d theta2 @ acc contribution (theta2 only)
+        dg2 = k.gravity_wrist * cos_theta12
+        drhs1 = (
+            -(k.gravity_shoulder * math.cos(theta1) + dg2),
+            -dh * (2 * omega1 * omega2 + omega2**2) - dg2 - 2 * h * acc1 - h * acc2,
+            -2 * h * omega2 - k.damping_shoulder,
+            -2 * h * (omega1 + omega2),
+        )
+        drhs2 = (
+            -dg2,
+            dh * omega1**2 - dg2 - h * acc1,
+            2 * h * omega1,
+            -k.damping_wrist,
+        )
+        jacobian = np.zeros((4, 4))
+        jacobian[0, 2] = 1.0
+        jacobian[1, 3] = 1.0
+        for column in range(4):
+            jacobian[2, column] = inv11 * drhs1[column] + inv12 * drhs2[column]
+            jacobian[3, column] = inv12 * drhs1[column] + inv22 * drhs2[column]
+        return jacobian
+
+    def input_jacobian(self, state: DoublePendulumState) -> np.ndarray:
+        """``d f / d u``: the ``(4, 2)`` control matrix of :meth:`control_affine`."""
+        _, inv_m = self._invert_mass_matrix(state.theta2)
+        jacobian = np.zeros((4, 2))
+        jacobian[2:, :] = inv_m
+        return jacobian
+
+    def forcing_jacobian(self, t: float, state: DoublePendulumState) -> np.ndarray:
+        """``d tau / d x`` of the forcing functions as a ``(2, 4)`` array.
+
+        :class:`ExpressionFunction` forcing is differentiated exactly and
+        time-only forcing contributes nothing; other callables, and
+        expressions whose derivative cannot be expressed with the allowed
+        functions, fall back to central differences.
+        """
+        jacobian = np.zeros((2, 4))
+        probe: DoublePendulumState | None = None
+        for joint, forcing in enumerate(self.forcing_functions):
+            if forcing is zero_input or _is_time_only(forcing):
+                continue
+            if isinstance(forcing, ExpressionFunction):
+                try:
+                    jacobian[joint] = forcing.state_gradient(t, state)
+                    continue
+                except ValueError:
+                    pass
+            if probe is None:
+                probe = DoublePendulumState(
+                    state.theta1,
+                    state.theta2,
+                    state.omega1,
+                    state.omega2,
+                    state.phi,
+                    state.omega_phi,
+                )
+            for column, name in enumerate(STATE_COLUMNS):
+                value = getattr(state, name)
+                step = FORCING_DIFFERENCE_STEP * max(1.0, abs(value))
+                setattr(probe, name, value + step)
+                upper = forcing(t, probe)
+                setattr(probe, name, value - step)
+                lower = forcing(t, probe)
+                setattr(probe, name, value)
+                jacobian[joint, column] = (upper - lower) / (2 * step)
+        return jacobian
+
+    def closed_loop_jacobian(self, t: float, state: DoublePendulumState) -> np.ndarray:
+        """State Jacobian including the feedback through the forcing functions.
+
+        Equals :meth:`state_jacobian` at the applied torques plus
+        ``input_jacobian @ forcing_jacobian``; exact for expression forcing.
+        """
+        control = self.applied_torques(t, state)
+        jacobian = self.state_jacobian(state, control)
+        forcing_jacobian = self.forcing_jacobian(t, state)
+        if forcing_jacobian.any():
+            jacobian += self.input_jacobian(state) @ forcing_jacobian
+        return jacobian
+
+    def step_sdirk_into(
+        self,
+        t: float,
+        state: DoublePendulumState,
+        dt: float,
+        out: DoublePendulumState,
+    ) -> DoublePendulumState:
+        """Advance one step with a two-stage L-stable SDIRK method.
+
+        Suited to stiff configurations (large joint damping or strong velocity
+        feedback in the forcing expressions) where explicit RK4 is unstable at
+        the GUI time step. Each stage is solved by simplified Newton iteration
+        using the analytic Jacobian evaluated at the start of the step.
+        """
+        scratch = self._scratch
+        scratch.phi = state.phi
+        scratch.omega_phi = state.omega_phi
+        y0 = np.array((state.theta1, state.theta2, state.omega1, state.omega2))
+        gamma_dt = SDIRK_GAMMA * dt
+        iteration_matrix = np.eye(4) - gamma_dt * self.closed_loop_jacobian(t, state)
+
+        stage1, f1 = self._sdirk_stage(t + gamma_dt, y0, y0, gamma_dt, iteration_matrix)
+        base = y0 + (1.0 - SDIRK_GAMMA) * dt * f1
+        stage2, _ = self._sdirk_stage(t + dt, base, stage1, gamma_dt, iteration_matrix)
+
+        out.theta1, out.theta2, out.omega1, out.omega2 = stage2.tolist()
+        out.phi = scratch.phi
+        out.omega_phi = scratch.omega_phi
+        return out
+
+    def _sdirk_stage(
+        self,
+        t: float,
+        base: np.ndarray,
+        guess: np.ndarray,
+        gamma_dt: float,
+        iteration_matrix: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Solve ``Y = base + gamma_dt * f(t, Y)``; returns ``Y`` and ``f(t, Y)``."""
+        stage = guess.copy()
+        for _ in range(SDIRK_MAX_NEWTON_ITERATIONS):
+            derivative = self.vector_field(t, stage)
+            residual = stage - base - gamma_dt * derivative
+            update = np.linalg.solve(iteration_matrix, residual)
+            stage -= update
+            if np.max(np.abs(update)) <= SDIRK_NEWTON_TOLERANCE * (
+                1.0 + np.max(np.abs(stage))
+            ):
+                return stage, self.vector_field(t, stage)
+        raise RuntimeError(
+            f"SDIRK Newton iteration did not converge at t={t}; reduce the time step"
+        )
+
+    def vector_field(self, t: float, y: np.ndarray) -> np.ndarray:
+        """Right-hand side on a ``(theta1, theta2, omega1, omega2)`` vector."""
+        scratch = self._scratch
+        scratch.theta1, scratch.theta2, scratch.omega1, scratch.omega2 = y.tolist()
+        acc1, acc2 = self._accelerations(t, scratch)
+        return np.array((scratch.omega1, scratch.omega2, acc1, acc2))
+
+    def integrate_adaptive(
+        self,
+        state0: DoublePendulumState,
+        t0: float,
+        t_end: float,
+        rtol: float = 1e-6,
+        atol: float = 1e-9,
+        first_step: float | None = None,
+        max_step: float = math.inf,
+        events: Sequence[Event] = (),
+    ) -> AdaptiveSolution:
+        """Integrate from ``t0`` to ``t_end`` with adaptive Dormand–Prince steps.
+
+        The solution's ``y`` columns follow :data:`STATE_COLUMNS` and the
+        solution can be called to sample the trajectory at any time in range.
+        ``events`` take ``(t, DoublePendulumState)`` and are located on the
+        dense output; a terminal event ends the integration early.
+        """
+        self._scratch.phi = state0.phi
+        self._scratch.omega_phi = state0.omega_phi
+        y0 = np.array((state0.theta1, state0.theta2, state0.omega1, state0.omega2))
+        phi, omega_phi = state0.phi, state0.omega_phi
+        vector_events = [
+            Event(
+                lambda t, y, function=event.function: function(
+                    t, DoublePendulumState(*y.tolist(), phi, omega_phi)
+                ),
+                direction=event.direction,
+                terminal=event.terminal,
+            )
+            for event in events
+        ]
+        return dormand_prince(
+            self.vector_field,
+            t0,
+            y0,
+            t_end,
+            rtol=rtol,
+            atol=atol,
+            first_step=first_step,
+            max_step=max_step,
+            events=vector_events,
+        )
+
+    def mass_matrix_batch(
+        self, theta2: np.ndarray
+    ) -> tuple[tuple[np.ndarray, np.ndarray], tuple[np.ndarray, np.ndarray]]:
+        """Array form of :meth:`mass_matrix` evaluated element-wise."""
+        k = self.coefficients
+        coupling_cos = k.coupling * np.cos(theta2)
+        m11 = k.m11_constant + 2 * coupling_cos
+        m12 = k.m12_constant + coupling_cos
+        m22 = np.full_like(m11, k.m22)
+        return ((m11, m12), (m12, m22))
+
+    def coriolis_vector_batch(
+        self, theta2: np.ndarray, omega1: np.ndarray, omega2: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Array form of :meth:`coriolis_vector` evaluated element-wise."""
+        h = -self.coefficients.coupling * np.sin(theta2)
+        c1 = h * (2 * omega1 * omega2 + omega2**2)
+        c2 = -h * omega1**2
+        return c1, c2
+
+    def gravity_vector_batch(
+        self, theta1: np.ndarray, theta2: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Array form of :meth:`gravity_vector` evaluated element-wise."""
+        k = self.coefficients
+        g2 = k.gravity_wrist * np.sin(theta1 + theta2)
+        g1 = k.gravity_shoulder * np.sin(theta1) + g2
+        return g1, g2
+
+    def damping_vector_batch(
+        self, omega1: np.ndarray, omega2: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Array form of :meth:`damping_vector` evaluated element-wise."""
+        k = self.coefficients
+        return k.damping_shoulder * omega1, k.damping_wrist * omega2
+
+    def applied_torques_batch(
+        self,
+        t: float | np.ndarray,
+        states: np.ndarray,
+        time_budget: float | None = None,
+    ) -> np.ndarray:
+        """Evaluate the forcing functions for every row of an ``(N, 4)`` array.
+
+        ``t`` is a scalar or an ``(N,)`` array of per-row times, e.g. the time
+        column of a logged trajectory. Returns an ``(N, 2)`` array of shoulder
+        and wrist torques. Forcing with an ``evaluate_array`` method
+        (:class:`ExpressionFunction`, tabulated profiles) is evaluated in one
+        vectorized call; other callables are called once per row, checking
+        ``time_budget`` (seconds) as in :meth:`simulate`.
+        """
+        budget = None if time_budget is None else EvaluationBudget(time_budget)
+        torques = np.zeros((states.shape[0], 2))
+        times = np.broadcast_to(np.asarray(t, dtype=float), (states.shape[0],))
+        for joint, forcing in enumerate(self.forcing_functions):
+            if forcing is zero_input:
+                continue
+            evaluate_array = getattr(forcing, "evaluate_array", None)
+            if evaluate_array is not None:
+                torques[:, joint] = evaluate_array(times, *states.T)
+                continue
+            column = torques[:, joint]
+            for i, (time, row) in enumerate(
+                zip(times.tolist(), states.tolist(), strict=True)
+            ):
+                if budget is not None:
+                    budget.check()
+                column[i] = forcing(
+                    time,
+                    DoublePendulumState(
+                        theta1=row[0], theta2=row[1], omega1=row[2], omega2=row[3]
+                    ),
+                )
+        return torques
+
+    def derivatives_batch(self, t: float, states: np.ndarray) -> np.ndarray:
+        """Array form of :meth:`derivatives` for an ``(N, 4)`` array of states.
+
+        Columns follow :data:`STATE_COLUMNS`. The result has the same shape and
+        holds ``(omega1, omega2, alpha1, alpha2)`` for every row.
+        """
+        theta1, theta2, omega1, omega2 = states.T
+        torques = self.applied_torques_batch(t, states)
+        c1, c2 = self.coriolis_vector_batch(theta2, omega1, omega2)
+        g1, g2 = self.gravity_vector_batch(theta1, theta2)
+        d1, d2 = self.damping_vector_batch(omega1, omega2)
+        (m11, m12), (m21, m22) = self.mass_matrix_batch(theta2)
+        determinant = m11 * m22 - m12 * m21
+        if np.any(np.abs(determinant) <= MASS_MATRIX_SINGULAR_TOLERANCE):
+            raise ZeroDivisionError(
+                "Mass matrix determinant is too close to zero; "
+                "check pendulum parameters"
+            )
+        rhs1 = torques[:, 0] - c1 - g1 - d1
+        rhs2 = torques[:, 1] - c2 - g2 - d2
+        derivs = np.empty_like(states)
+        derivs[:, 0] = omega1
+        derivs[:, 1] = omega2
+        derivs[:, 2] = (m22 / determinant) * rhs1 + (-m12 / determinant) * rhs2
+        derivs[:, 3] = (-m21 / determinant) * rhs1 + (m11 / determinant) * rhs2
+        return derivs
+
+    def step_batch(self, t: float, states: np.ndarray, dt: float) -> np.ndarray:
+        """Advance an ``(N, 4)`` array of states by one RK4 step.
+
+        Every row is an independent initial condition; the result is a new
+        array with the same layout.
+        """
+        states = np.asarray(states, dtype=float)
+        k1 = self.derivatives_batch(t, states)
+        k2 = self.derivatives_batch(t + dt / 2.0, states + dt / 2.0 * k1)
+        k3 = self.derivatives_batch(t + dt / 2.0, states + dt / 2.0 * k2)
+        k4 = self.derivatives_batch(t + dt, states + dt * k3)
+        return states + dt / 6.0 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+    def state_jacobian_batch(
+        self, states: np.ndarray, controls: np.ndarray
+    ) -> np.ndarray:
+        """Array form of :meth:`state_jacobian` returning an ``(N, 4, 4)`` stack.
+
+        ``states`` is ``(N, 4)`` with :data:`STATE_COLUMNS` and ``controls`` is
+        ``(N, 2)`` (or broadcastable to it) holding shoulder and wrist torques.
+        """
+        k = self.coefficients
+        states = np.asarray(states, dtype=float)
+        controls = np.broadcast_to(np.asarray(controls, dtype=float), (len(states), 2))
+        theta1, theta2, omega1, omega2 = states.T
+        sin_theta2 = np.sin(theta2)
+        cos_theta2 = np.cos(theta2)
+        cos_theta12 = np.cos(theta1 + theta2)
+
+        coupling_cos = k.coupling * cos_theta2
+        m11 = k.m11_constant + 2 * coupling_cos
+        m12 = k.m12_constant + coupling_cos
+        m22 = k.m22
+        determinant = m11 * m22 - m12 * m12
+        if np.any(np.abs(determinant) <= MASS_MATRIX_SINGULAR_TOLERANCE):
+            raise ZeroDivisionError(
+                "Mass matrix determinant is too close to zero; "
+                "check pendulum parameters"
+            )
+        inv11 = m22 / determinant
+        inv12 = -m12 / determinant
+        inv22 = m11 / determinant
+
+        h = -k.coupling * sin_theta2
+        dh = -coupling_cos
+        g2 = k.gravity_wrist * np.sin(theta1 + theta2)
+        g1 = k.gravity_shoulder * np.sin(theta1) + g2
+        rhs1 = (
+            controls[:, 0]
+            - h * (2 * omega1 * omega2 + omega2**2)
+            - g1
+            - k.damping_shoulder * omega1
+        )
+        rhs2 = controls[:, 1] + h * omega1**2 - g2 - k.damping_wrist * omega2
+        acc1 = inv11 * rhs1 + inv12 * rhs2
+        acc2 = inv12 * rhs1 + inv22 * rhs2
+
+        dg2 = k.gravity_wrist * cos_theta12
+        drhs = np.empty((len(states), 2, 4))
+        drhs[:, 0, 0] = -(k.gravity_shoulder * np.cos(theta1) + dg2)
+        drhs[:, 0, 1] = (
+            -dh * (2 * omega1 * omega2 + omega2**2) - dg2 - 2 * h * acc1 - h * acc2
+        )
+        drhs[:, 0, 2] = -2 * h * omega2 - k.damping_shoulder
+        drhs[:, 0, 3] = -2 * h * (omega1 + omega2)
+        drhs[:, 1, 0] = -dg2
+        drhs[:, 1, 1] = dh * omega1**2 - dg2 - h * acc1
+        drhs[:, 1, 2] = 2 * h * omega1
+        drhs[:, 1, 3] = -k.damping_wrist
+
+        jacobian = np.zeros((len(states), 4, 4))
+        jacobian[:, 0, 2] = 1.0
+        jacobian[:, 1, 3] = 1.0
+        jacobian[:, 2, :] = inv11[:, None] * drhs[:, 0] + inv12[:, None] * drhs[:, 1]
+        jacobian[:, 3, :] = inv12[:, None] * drhs[:, 0] + inv22[:, None] * drhs[:, 1]
+        return jacobian
+
+    def input_jacobian_batch(self, states: np.ndarray) -> np.ndarray:
+        """Array form of :meth:`input_jacobian` returning an ``(N, 4, 2)`` stack."""
+        states = np.asarray(states, dtype=float)
+        (m11, m12), (m21, m22) = self.mass_matrix_batch(states[:, 1])
+        determinant = m11 * m22 - m12 * m21
+        if np.any(np.abs(determinant) <= MASS_MATRIX_SINGULAR_TOLERANCE):
+            raise ZeroDivisionError(
+                "Mass matrix determinant is too close to zero; "
+                "check pendulum parameters"
+            )
+        jacobian = np.zeros((len(states), 4, 2))
+        jacobian[:, 2, 0] = m22 / determinant
+        jacobian[:, 2, 1] = -m12 / determinant
+        jacobian[:, 3, 0] = -m21 / determinant
+        jacobian[:, 3, 1] = m11 / determinant
+        return jacobian
+
+
+def states_to_array(states: Iterable[DoublePendulumState]) -> np.ndarray:
+    """Stack in-plane state components into an ``(N, 4)`` array."""
+    return np.array(
+        [(s.theta1, s.theta2, s.omega1, s.omega2) for s in states], dtype=float
+    ).reshape(-1, 4)
 
 
 def compile_forcing_functions(shoulder_expression: str, wrist_expression: str) -> tuple[
@@ -0,0 +1,216 @@
+"""
+Generated single-function kernels for the forced double pendulum.
+
+:class:`~double_pendulum_model.physics.double_pendulum.DoublePendulumDynamics`
+evaluates each RK4 stage through forcing callables, helper methods and
+attribute lookups. For expression forcing the whole right-hand side is known
+up front, so this module emits one flat Python function per configuration:
+the validated forcing expressions are spliced in next to the equations of
+motion, ``sin``/``cos`` of the joint angles are computed once and shared with
+the expressions, and all coefficients are bound as closure constants. A second
+generated function performs a complete RK4 step on plain floats.
+
+The generated code performs exactly the floating-point operations of
+``_accelerations`` and ``step_into``, so fused runs are bit-identical to the
+reference integrator.
+"""
+
+from __future__ import annotations
+
+import ast
+import functools
+import typing
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from double_pendulum_model.safe_eval import SafeEvaluator
+
+if typing.TYPE_CHECKING:
+    from double_pendulum_model.physics.double_pendulum import CompiledCoefficients
+
+FUSED_KERNEL_CACHE_SIZE = 64  # Configurations kept by build_fused_kernel
+
+_FORCING_VARIABLES = ("t", "theta1", "theta2", "omega1", "omega2")
+_SHOULDER_PLACEHOLDER = "__shoulder_torque__"
+_WRIST_PLACEHOLDER = "__wrist_torque__"
+
+# Calls in the forcing expressions that match a trigonometric term of the
+# equations of motion are replaced by the kernel's local of the same value.
+_SHARED_TERMS = {
+    "sin(theta1)": "sin_theta1",
+    "sin(theta2)": "sin_theta2",
+    "cos(theta2)": "cos_theta2",
+    "sin(theta1 + theta2)": "sin_theta12",
+}
+
+_KERNEL_TEMPLATE = """
+def __fused_factory__(
+    __float__, __abs__, __singular__, __tolerance__,
+    m11_constant, m12_constant, m22, coupling, negative_coupling,
+    gravity_shoulder, gravity_wrist, damping_shoulder, damping_wrist,
+    {math_names}
+):
+    def accelerations(t, theta1, theta2, omega1, omega2):
+        sin_theta1 = sin(theta1)
+        sin_theta2 = sin(theta2)
+        cos_theta2 = cos(theta2)
+        sin_theta12 = sin(theta1 + theta2)
+        tau1 = {shoulder}
+        tau2 = {wrist}
+        coupling_cos = coupling * cos_theta2
+        m11 = m11_constant + 2 * coupling_cos
+        m12 = m12_constant + coupling_cos
+        determinant = m11 * m22 - m12 * m12
+        if __abs__(determinant) <= __tolerance__:
+            __singular__()
+        h = negative_coupling * sin_theta2
+        g2 = gravity_wrist * sin_theta12
+        g1 = gravity_shoulder * sin_theta1 + g2
+        rhs1 = (
+            tau1
+            - h * (2 * omega1 * omega2 + omega2**2)
+            - g1
+            - damping_shoulder * omega1
+        )
+        rhs2 = tau2 + h * omega1**2 - g2 - damping_wrist * omega2
+        acc1 = (m22 / determinant) * rhs1 + (-m12 / determinant) * rhs2
+        acc2 = (-m12 / determinant) * rhs1 + (m11 / determinant) * rhs2
+        return acc1, acc2
+
+    def step(t, theta1, theta2, omega1, omega2, dt):
+        half_dt = dt / 2.0
+        acc1_k1, acc2_k1 = accelerations(t, theta1, theta2, omega1, omega2)
+        omega1_k2 = omega1 + half_dt * acc1_k1
+        omega2_k2 = omega2 + half_dt * acc2_k1
+        acc1_k2, acc2_k2 = accelerations(
+            t + half_dt,
+            theta1 + half_dt * omega1,
+            theta2 + half_dt * omega2,
+            omega1_k2,
+            omega2_k2,
+        )
+        omega1_k3 = omega1 + half_dt * acc1_k2
+        omega2_k3 = omega2 + half_dt * acc2_k2
+        acc1_k3, acc2_k3 = accelerations(
+            t + half_dt,
+            theta1 + half_dt * omega1_k2,
+            theta2 + half_dt * omega2_k2,
+            omega1_k3,
+            omega2_k3,
+        )
+        omega1_k4 = omega1 + dt * acc1_k3
+        omega2_k4 = omega2 + dt * acc2_k3
+        acc1_k4, acc2_k4 = accelerations(
+            t + dt,
+            theta1 + dt * omega1_k3,
+            theta2 + dt * omega2_k3,
+            omega1_k4,
+            omega2_k4,
+        )
+        sixth_dt = dt / 6.0
+        return (
+            theta1 + sixth_dt * (omega1 + 2 * omega1_k2 + 2 * omega1_k3 + omega1_k4),
+            theta2 + sixth_dt * (omega2 + 2 * omega2_k2 + 2 * omega2_k3 + omega2_k4),
+            omega1 + sixth_dt * (acc1_k1 + 2 * acc1_k2 + 2 * acc1_k3 + acc1_k4),
+            omega2 + sixth_dt * (acc2_k1 + 2 * acc2_k2 + 2 * acc2_k3 + acc2_k4),
+        )
+
+    return accelerations, step
+"""
+
+
+@dataclass(frozen=True)
+class FusedKernel:
+    """Generated functions for one set of coefficients and forcing expressions.
+
+    ``accelerations(t, theta1, theta2, omega1, omega2)`` returns the joint
+    accelerations; ``step(t, theta1, theta2, omega1, omega2, dt)`` returns the
+    state after one RK4 step. ``source`` is the generated code, kept for
+    inspection.
+    """
+
+    accelerations: Callable[[float, float, float, float, float], tuple[float, float]]
+    step: Callable[
+        [float, float, float, float, float, float],
+        tuple[float, float, float, float],
+    ]
+    source: str
+
+
+class _ShareTrigonometricTerms(ast.NodeTransformer):
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        local = _SHARED_TERMS.get(ast.unparse(node))
+        if local is not None:
+            return ast.copy_location(ast.Name(id=local, ctx=ast.Load()), node)
+        return self.generic_visit(node)
+
+
+def _singular() -> None:
+    raise ZeroDivisionError(
+        "Mass matrix determinant is too close to zero; check pendulum parameters"
+    )
+
+
+@functools.lru_cache(maxsize=FUSED_KERNEL_CACHE_SIZE)
+def build_fused_kernel(
+    coefficients: CompiledCoefficients,
+    shoulder_expression: str | None,
+    wrist_expression: str | None,
+    singular_tolerance: float,
+) -> FusedKernel:
+    """Generate the fused kernel; ``None`` expressions mean zero torque.
+
+    Expressions are validated and optimized exactly as
+    :class:`~double_pendulum_model.physics.double_pendulum.ExpressionFunction`
+    does, so the spliced torques match its results bit for bit.
+    """
+    evaluator = SafeEvaluator(allowed_variables=set(_FORCING_VARIABLES))
+    torques: dict[str, ast.expr] = {}
+    for placeholder, expression in (
+        (_SHOULDER_PLACEHOLDER, shoulder_expression),
+        (_WRIST_PLACEHOLDER, wrist_expression),
+    ):
+        if expression is None:
+            torques[placeholder] = ast.Constant(value=0.0)
+            continue
+        tree = _ShareTrigonometricTerms().visit(evaluator.optimized_tree(expression))
+        torques[placeholder] = ast.Call(
+            func=ast.Name(id="__float__", ctx=ast.Load()), args=[tree.body], keywords=[]
+        )
+
+    template = _KERNEL_TEMPLATE.format(
+        math_names=", ".join(evaluator.allowed_names),
+        shoulder=_SHOULDER_PLACEHOLDER,
+        wrist=_WRIST_PLACEHOLDER,
+    )
+    module = ast.parse(template)
+    for node in ast.walk(module):
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Name):
+            replacement = torques.get(node.value.id)
+            if replacement is not None:
+                node.value = replacement
+    module = ast.fix_missing_locations(module)
+    namespace: dict[str, typing.Any] = {"__builtins__": {}}
+    exec(
+        compile(module, "<fused_kernel>", "exec"),
+        namespace,
+    )
+    accelerations, step = namespace["__fused_factory__"](
+        float,
+        abs,
+        _singular,
+        singular_tolerance,
+        coefficients.m11_constant,
+        coefficients.m12_constant,
+        coefficients.m22,
+        coefficients.coupling,
+        -coefficients.coupling,
+        coefficients.gravity_shoulder,
+        coefficients.gravity_wrist,
+        coefficients.damping_shoulder,
+        coefficients.damping_wrist,
+        *evaluator.allowed_names.values(),
+    )
+    return FusedKernel(
+        accelerations=accelerations, step=step, source=ast.unparse(module)
+    )
@@ -0,0 +1,436 @@
+"""
+General-purpose ODE integrators shared by the pendulum models.
+
+The pendulum dynamics classes expose fixed-step RK4 directly. This module holds
+integrators that work on plain ``numpy`` state vectors so they can be reused by
+both the double and triple pendulum models.
+"""
+
+from __future__ import annotations
+
+import math
+import typing
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# Dormand–Prince RK5(4) tableau (Hairer, Nørsett & Wanner, "Solving Ordinary
+# Differential Equations I", Table 5.2)
+_DP_C = np.array([0.0, 1.0 / 5.0, 3.0 / 10.0, 4.0 / 5.0, 8.0 / 9.0, 1.0])
+_DP_A = (
+    np.array([]),
+    np.array([1.0 / 5.0]),
+    np.array([3.0 / 40.0, 9.0 / 40.0]),
+    np.array([44.0 / 45.0, -56.0 / 15.0, 32.0 / 9.0]),
+    np.array([19372.0 / 6561.0, -25360.0 / 2187.0, 64448.0 / 6561.0, -212.0 / 729.0]),
+    np.array(
+        [
+            9017.0 / 3168.0,
+            -355.0 / 33.0,
+            46732.0 / 5247.0,
+            49.0 / 176.0,
+            -5103.0 / 18656.0,
+        ]
+    ),
+)
+_DP_B = np.array(
+    [35.0 / 384.0, 0.0, 500.0 / 1113.0, 125.0 / 192.0, -2187.0 / 6784.0, 11.0 / 84.0]
+)
+# Difference between the 5th and embedded 4th order weights (7 stages, FSAL)
+_DP_E = np.array(
+    [
+        -71.0 / 57600.0,
+        0.0,
+        71.0 / 16695.0,
+        -71.0 / 1920.0,
+        17253.0 / 339200.0,
+        -22.0 / 525.0,
+        1.0 / 40.0,
+    ]
+)
+# Coefficients of the free 4th order continuous extension (Shampine, 1986)
+_DP_DENSE = np.array(
+    [
+        [
+            1.0,
+            -8048581381.0 / 2820520608.0,
+            8663915743.0 / 2820520608.0,
+            -12715105075.0 / 11282082432.0,
+        ],
+        [0.0, 0.0, 0.0, 0.0],
+        [
+            0.0,
+            131558114200.0 / 32700410799.0,
+            -68118460800.0 / 10900136933.0,
+            87487479700.0 / 32700410799.0,
+        ],
+        [
+            0.0,
+            -1754552775.0 / 470086768.0,
+            14199869525.0 / 1410260304.0,
+            -10690763975.0 / 1880347072.0,
+        ],
+        [
+            0.0,
+            127303824393.0 / 49829197408.0,
+            -318862633887.0 / 49829197408.0,
+            701980252875.0 / 199316789632.0,
+        ],
+        [
+            0.0,
+            -282668133.0 / 205662961.0,
+            2019193451.0 / 616988883.0,
+            -1453857185.0 / 822651844.0,
+        ],
+        [
+            0.0,
+            40617522.0 / 29380423.0,
+            -110615467.0 / 29380423.0,
+            69997945.0 / 29380423.0,
+        ],
+    ]
+)
+
+# Step size controller constants (dimensionless)
+STEP_SAFETY_FACTOR = 0.9
+MIN_STEP_FACTOR = 0.2
+MAX_STEP_FACTOR = 10.0
+MAX_ADAPTIVE_STEPS = 1_000_000
+
+# Event root refinement limits
+EVENT_TIME_TOLERANCE = 1e-13  # Relative to the step length
+EVENT_MAX_ITERATIONS = 100
+
+VectorField = Callable[[float, np.ndarray], np.ndarray]
+Interpolant = Callable[[float], np.ndarray]
+
+
+@dataclass(frozen=True)
+class Event:
+    """A zero crossing of ``function(t, state)`` to locate while integrating.
+
+    ``direction`` selects rising (``+1``), falling (``-1``) or any (``0``)
+    crossings. A ``terminal`` event stops the integration at the located time.
+    The type of ``state`` is decided by the caller (a ``numpy`` vector here,
+    a state dataclass in the dynamics classes).
+    """
+
+    function: Callable[[float, typing.Any], float]
+    direction: int = 0
+    terminal: bool = False
+
+
+@dataclass(frozen=True)
+class EventOccurrence:
+    """A located event: which event fired, when, and the interpolated state."""
+
+    index: int
+    t: float
+    y: np.ndarray
+
+
+def has_crossed(event: Event, g_start: float, g_end: float) -> bool:
+    """Whether an event function changed sign in the event's direction."""
+    if g_start == 0.0:
+        return False
+    rising = g_start < 0.0 <= g_end
+    falling = g_start > 0.0 >= g_end
+    if event.direction > 0:
+        return rising
+    if event.direction < 0:
+        return falling
+    return rising or falling
+
+
+def _refine_root(
+    function: Callable[[float], float],
+    t_low: float,
+    t_high: float,
+    g_low: float,
+    g_high: float,
+) -> float:
+    """Illinois (modified regula falsi) refinement of a bracketed sign change."""
+    tolerance = EVENT_TIME_TOLERANCE * max(abs(t_high - t_low), abs(t_high))
+    side = 0
+    t_root = t_high
+    for _ in range(EVENT_MAX_ITERATIONS):
+        if abs(t_high - t_low) <= tolerance:
+            break
+        t_root = (t_low * g_high - t_high * g_low) / (g_high - g_low)
+        g_root = function(t_root)
+        if g_root == 0.0:
+            return t_root
+        if (g_root < 0.0) == (g_low < 0.0):
+            t_low, g_low = t_root, g_root
+            if side == -1:
+                g_high /= 2.0
+            side = -1
+        else:
+            t_high, g_high = t_root, g_root
+            if side == 1:
+                g_low /= 2.0
+            side = 1
+    # Report the bracket end at or past the crossing so the event is not missed
+    return t_high
+
+
+def locate_events(
+    events: Sequence[Event],
+    g_start: Sequence[float],
+    g_end: Sequence[float],
+    t_start: float,
+    t_end: float,
+    interpolant: Interpolant,
+    evaluate: Callable[[Event, float, np.ndarray], float],
+) -> list[EventOccurrence]:
+    """Find events that change sign over ``[t_start, t_end]`` on an interpolant.
+
+    ``evaluate(event, t, y)`` computes an event function on an interpolated
+    vector. Occurrences are returned in time order, truncated after the first
+    terminal event.
+    """
+    found = []
+    for index, event in enumerate(events):
+        if not has_crossed(event, g_start[index], g_end[index]):
+            continue
+        t_root = _refine_root(
+            lambda t, event=event: evaluate(event, t, interpolant(t)),
+            t_start,
+            t_end,
+            g_start[index],
+            g_end[index],
+        )
+        found.append(EventOccurrence(index=index, t=t_root, y=interpolant(t_root)))
+    found.sort(key=lambda occurrence: occurrence.t)
+    for position, occurrence in enumerate(found):
+        if events[occurrence.index].terminal:
+            return found[: position + 1]
+    return found
+
+
+def hermite_interpolant(
+    t_start: float,
+    y_start: np.ndarray,
+    f_start: np.ndarray,
+    t_end: float,
+    y_end: np.ndarray,
+    f_end: np.ndarray,
+) -> Interpolant:
+    """Cubic Hermite interpolant through two states and their derivatives."""
+    h = t_end - t_start
+
+    def interpolate(t: float) -> np.ndarray:
+        theta = (t - t_start) / h
+        theta2 = theta * theta
+        theta3 = theta2 * theta
+        return np.asarray(
+            (2 * theta3 - 3 * theta2 + 1) * y_start
+            + (theta3 - 2 * theta2 + theta) * h * f_start
+            + (-2 * theta3 + 3 * theta2) * y_end
+            + (theta3 - theta2) * h * f_end
+        )
+
+    return interpolate
+
+
+@dataclass
+class AdaptiveSolution:
+    """Accepted steps of an adaptive integration plus a dense interpolant.
+
+    ``t`` holds the accepted step boundaries (starting with ``t0``) and ``y``
+    the state at each of them. ``proposed_steps[i]`` is the controller's step
+    proposal after reaching ``t[i + 1]``; restarting from ``t[i + 1]`` with it
+    as ``first_step`` continues the run exactly. Calling the solution evaluates
+    the continuous extension at arbitrary times inside ``[t[0], t[-1]]``
+    without re-integrating.
+    """
+
+    t: np.ndarray
+    y: np.ndarray
+    nfev: int
+    n_rejected: int
+    next_step: float
+    events: list[EventOccurrence] = field(default_factory=list)
+    proposed_steps: list[float] = field(default_factory=list)
+    _dense: list[np.ndarray] = field(default_factory=list, repr=False)
+    _step_sizes: list[float] = field(default_factory=list, repr=False)
+
+    def __call__(self, t: float | np.ndarray) -> np.ndarray:
+        """Interpolate the trajectory at ``t`` (scalar or 1-D array of times)."""
+        times = np.atleast_1d(np.asarray(t, dtype=float))
+        if times.size and (
+            times.min() < self.t[0] - 1e-12 * max(1.0, abs(self.t[0]))
+            or times.max() > self.t[-1] + 1e-12 * max(1.0, abs(self.t[-1]))
+        ):
+            raise ValueError(
+                f"Requested time outside integrated interval [{self.t[0]}, "
+                f"{self.t[-1]}]"
+            )
+        indices = np.clip(np.searchsorted(self.t, times, side="right") - 1, 0, None)
+        indices = np.minimum(indices, len(self._dense) - 1)
+        result = np.empty((times.size, self.y.shape[1]))
+        for row, (time, index) in enumerate(zip(times, indices, strict=True)):
+            result[row] = _dense_eval(
+                self.t[index],
+                self._step_sizes[index],
+                self.y[index],
+                self._dense[index],
+                time,
+            )
+        return result[0] if np.ndim(t) == 0 else result
+
+
+def _dense_eval(
+    t_start: float, h: float, y_start: np.ndarray, q: np.ndarray, t: float
+) -> np.ndarray:
+    """Evaluate one step's continuous extension; ``q`` is ``h * K.T @ P``."""
+    theta = 0.0 if h == 0.0 else (t - t_start) / h
+    powers = theta ** np.arange(1, q.shape[1] + 1)
+    return np.asarray(y_start + q @ powers)
+
+
+def _error_norm(
+    error: np.ndarray, y: np.ndarray, y_new: np.ndarray, rtol: float, atol: float
+) -> float:
+    scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+    return float(np.sqrt(np.mean((error / scale) ** 2)))
+
+
+def _initial_step(
+    fun: VectorField,
+    t0: float,
+    y0: np.ndarray,
+    f0: np.ndarray,
+    rtol: float,
+    atol: float,
+) -> tuple[float, int]:
+    """Hairer's starting step heuristic; returns the step and extra evaluations."""
+    scale = atol + np.abs(y0) * rtol
+    d0 = float(np.sqrt(np.mean((y0 / scale) ** 2)))
+    d1 = float(np.sqrt(np.mean((f0 / scale) ** 2)))
+    h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+    f1 = fun(t0 + h0, y0 + h0 * f0)
+    d2 = float(np.sqrt(np.mean(((f1 - f0) / scale) ** 2))) / h0
+    if d1 <= 1e-15 and d2 <= 1e-15:
+        h1 = max(1e-6, h0 * 1e-3)
+    else:
+        h1 = (0.01 / max(d1, d2)) ** (1.0 / 5.0)
+    return min(100 * h0, h1), 1
+
+
+def dormand_prince(
+    fun: VectorField,
+    t0: float,
+    y0: np.ndarray,
+    t_end: float,
+    rtol: float = 1e-6,
+    atol: float = 1e-9,
+    first_step: float | None = None,
+    max_step: float = math.inf,
+    events: Sequence[Event] = (),
+) -> AdaptiveSolution:
+    """Integrate ``dy/dt = fun(t, y)`` with the Dormand–Prince RK5(4) pair.
+
+    Steps whose embedded error estimate exceeds ``atol + rtol * |y|`` (RMS
+    norm) are rejected and retried with a smaller step. Every accepted step
+    stores its stages so the returned solution can be sampled anywhere.
+    ``events`` are called as ``function(t, y)`` and located on the dense
+    output of each accepted step; a terminal event ends the integration.
+    """
+    if rtol <= 0.0 or atol <= 0.0:
+        raise ValueError("rtol and atol must be positive")
+    if t_end < t0:
+        raise ValueError("t_end must not be earlier than t0")
+    y = np.array(y0, dtype=float)
+    f = np.asarray(fun(t0, y), dtype=float)
+    nfev = 1
+    if first_step is None:
+        h, extra = _initial_step(fun, t0, y, f, rtol, atol)
+        nfev += extra
+    else:
+        h = abs(first_step)
+    h = min(h, max_step)
+
+    times = [t0]
+    states = [y.copy()]
+    dense: list[np.ndarray] = []
+    step_sizes: list[float] = []
+    proposals: list[float] = []
+    occurrences: list[EventOccurrence] = []
+    g_values = [event.function(t0, y) for event in events]
+    n_rejected = 0
+    stages = np.empty((7, y.size))
+    t = t0
+    while t < t_end:
+        if len(dense) >= MAX_ADAPTIVE_STEPS:
+            raise RuntimeError("Maximum number of adaptive steps exceeded")
+        min_step = 10 * (np.nextafter(t, math.inf) - t)
+        h = max(h, min_step)
+        last = h >= t_end - t
+        step = t_end - t if last else h
+
+        stages[0] = f
+        for i in range(1, 6):
+            stages[i] = fun(t + _DP_C[i] * step, y + step * (_DP_A[i] @ stages[:i]))
+        y_new = y + step * (_DP_B @ stages[:6])
+        t_new = t_end if last else t + step
+        stages[6] = fun(t_new, y_new)
+        nfev += 6
+
+        error = step * (_DP_E @ stages)
+        error_norm = _error_norm(error, y, y_new, rtol, atol)
+        if error_norm <= 1.0:
+            factor = (
+                MAX_STEP_FACTOR
+                if error_norm == 0.0
+                else min(
+                    MAX_STEP_FACTOR, STEP_SAFETY_FACTOR * error_norm ** (-1.0 / 5.0)
+                )
+            )
+            q = step * (stages.T @ _DP_DENSE)
+            dense.append(q)
+            step_sizes.append(step)
+            h = min(step * factor, max_step)
+            proposals.append(h)
+            if events:
+                g_new = [event.function(t_new, y_new) for event in events]
+                found = locate_events(
+                    events,
+                    g_values,
+                    g_new,
+                    t,
+                    t_new,
+                    lambda time, t=t, step=step, y=y, q=q: _dense_eval(
+                        t, step, y, q, time
+                    ),
+                    lambda event, time, state: event.function(time, state),
+                )
+                occurrences.extend(found)
+                g_values = g_new
+                if found and events[found[-1].index].terminal:
+                    times.append(found[-1].t)
+                    states.append(found[-1].y)
+                    break
+            t, y, f = t_new, y_new, stages[6].copy()
+            times.append(t)
+            states.append(y.copy())
+        else:
+            n_rejected += 1
+            if step <= min_step:
+                raise RuntimeError(f"Step size underflow at t={t}")
+            h = step * max(
+                MIN_STEP_FACTOR, STEP_SAFETY_FACTOR * error_norm ** (-1.0 / 5.0)
+            )
+
+    return AdaptiveSolution(
+        t=np.array(times),
+        y=np.array(states),
+        nfev=nfev,
+        n_rejected=n_rejected,
+        next_step=h,
+        events=occurrences,
+        proposed_steps=proposals,
+        _dense=dense,
+        _step_sizes=step_sizes,
+    )
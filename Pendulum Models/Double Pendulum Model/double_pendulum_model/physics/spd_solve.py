@@ -0,0 +1,89 @@
+"""
+Unrolled solves of 3×3 symmetric positive definite systems.
+
+The triple pendulum solves ``M a = rhs`` with a 3×3 mass matrix at every
+dynamics evaluation. For a single system, ``np.linalg.solve`` spends nearly
+all its time on argument conversion and LAPACK dispatch, so these functions
+write out the ``LDLᵀ`` factorization instead: no square roots, three
+divisions, and only the lower triangle is read.
+
+The pivots of ``D`` double as a health check. A mass matrix is positive
+definite exactly when all pivots are positive; a pivot at or below
+:data:`SPD_PIVOT_TOLERANCE` times its diagonal entry means the matrix is
+singular or indefinite (bad parameters or a broken kernel) and raises
+:class:`ZeroDivisionError`, like the double pendulum's determinant check.
+The scalar and batched forms perform the same operations and agree exactly.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+# Smallest admissible LDLᵀ pivot relative to its diagonal entry (dimensionless)
+SPD_PIVOT_TOLERANCE = 1e-12
+
+_NOT_POSITIVE_DEFINITE = (
+    "Mass matrix is not positive definite; check pendulum parameters"
+)
+
+
+def solve_spd3(
+    matrix: Sequence[Sequence[float]], rhs: Sequence[float]
+) -> tuple[float, float, float]:
+    """Solve ``matrix @ x = rhs`` for a symmetric positive definite 3×3 matrix."""
+    (a11, _, _), (a21, a22, _), (a31, a32, a33) = matrix
+    b1, b2, b3 = rhs
+    d1 = a11
+    if not d1 > SPD_PIVOT_TOLERANCE * a11:
+        raise ZeroDivisionError(_NOT_POSITIVE_DEFINITE)
+    l21 = a21 / d1
+    l31 = a31 / d1
+    d2 = a22 - l21 * a21
+    if not d2 > SPD_PIVOT_TOLERANCE * a22:
+        raise ZeroDivisionError(_NOT_POSITIVE_DEFINITE)
+    l32 = (a32 - l31 * a21) / d2
+    d3 = a33 - l31 * a31 - l32 * l32 * d2
+    if not d3 > SPD_PIVOT_TOLERANCE * a33:
+        raise ZeroDivisionError(_NOT_POSITIVE_DEFINITE)
+    y2 = b2 - l21 * b1
+    y3 = b3 - l31 * b1 - l32 * y2
+    x3 = y3 / d3
+    x2 = y2 / d2 - l32 * x3
+    x1 = b1 / d1 - l21 * x2 - l31 * x3
+    return x1, x2, x3
+
+
+def solve_spd3_batch(matrices: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """Batched :func:`solve_spd3` for ``(..., 3, 3)`` matrices and ``(..., 3)``."""
+    a11 = matrices[..., 0, 0]
+    a21 = matrices[..., 1, 0]
+    a22 = matrices[..., 1, 1]
+    a31 = matrices[..., 2, 0]
+    a32 = matrices[..., 2, 1]
+    a33 = matrices[..., 2, 2]
+    b1 = rhs[..., 0]
+    b2 = rhs[..., 1]
+    b3 = rhs[..., 2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = a11
+        l21 = a21 / d1
+        l31 = a31 / d1
+        d2 = a22 - l21 * a21
+        l32 = (a32 - l31 * a21) / d2
+        d3 = a33 - l31 * a31 - l32 * l32 * d2
+        healthy = (
+            (d1 > SPD_PIVOT_TOLERANCE * a11)
+            & (d2 > SPD_PIVOT_TOLERANCE * a22)
+            & (d3 > SPD_PIVOT_TOLERANCE * a33)
+        )
+        if not np.all(healthy):
+            raise ZeroDivisionError(_NOT_POSITIVE_DEFINITE)
+        y2 = b2 - l21 * b1
+        y3 = b3 - l31 * b1 - l32 * y2
+        solution = np.empty(np.broadcast_shapes(a11.shape, b1.shape) + (3,))
+        solution[..., 2] = y3 / d3
+        solution[..., 1] = y2 / d2 - l32 * solution[..., 2]
+        solution[..., 0] = b1 / d1 - l21 * solution[..., 1] - l31 * solution[..., 2]
+    return solution
@@ -0,0 +1,125 @@
+"""
+On-disk cache of the symbolic triple pendulum derivation.
+
+``_derive_triple_dynamics`` takes tens of seconds, and an in-process
+``lru_cache`` does not help new interpreters, test sessions or worker pools.
+:func:`load_triple_dynamics` stores the derived expressions as ``srepr`` text
+in a JSON file and reloads them in a fraction of a second.
+
+Cache files are keyed by the SymPy version and :func:`derivation_hash`, so
+editing the derivation or upgrading SymPy never serves stale expressions. A
+file is written to a temporary name and atomically renamed into place, so
+concurrent readers see either no file or a complete one; concurrent writers
+produce identical content. Unreadable or corrupt files are re-derived and
+overwritten, and an unwritable cache directory only disables caching.
+
+The directory is ``$DOUBLE_PENDULUM_CACHE_DIR`` if set, otherwise
+``double_pendulum_model`` under ``$XDG_CACHE_HOME`` (default ``~/.cache``).
+Cached text is evaluated by :func:`sympy.sympify`, so the directory must be
+as trusted as the installed package.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import typing
+from pathlib import Path
+
+from double_pendulum_model.physics import triple_pendulum
+
+if typing.TYPE_CHECKING:
+    import sympy as sp
+
+CACHE_DIR_ENV = "DOUBLE_PENDULUM_CACHE_DIR"
+CACHE_FORMAT_VERSION = 1
+
+_EXPRESSION_KEYS = ("mass_matrix", "bias", "gravity", "symbols")
+
+TripleExpressions = tuple[
+    "sp.Matrix", "sp.Matrix", "sp.Matrix", tuple["sp.Symbol", ...]
+]
+
+
+def derivation_hash() -> str:
+    """SHA-256 of the derivation source, identifying its derived expressions."""
+    source = inspect.getsource(triple_pendulum._derive_triple_dynamics)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def default_cache_dir() -> Path:
+    """Directory holding cached derivations (see the module docstring)."""
+    configured = os.environ.get(CACHE_DIR_ENV)
+    if configured:
+        return Path(configured)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "double_pendulum_model"
+
+
+def cache_path(cache_dir: Path | None = None) -> Path:
+    """Cache file for the current SymPy version and derivation source."""
+    import sympy as sp
+
+    directory = default_cache_dir() if cache_dir is None else Path(cache_dir)
+    name = f"triple_dynamics-sympy{sp.__version__}-{derivation_hash()}.json"
+    return directory / name
+
+
+def _read(path: Path) -> TripleExpressions | None:
+    import sympy as sp
+
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("format") != CACHE_FORMAT_VERSION:
+            return None
+        mass_matrix, bias, gravity, symbols = (
+            sp.sympify(data[key]) for key in _EXPRESSION_KEYS
+        )
+    except (OSError, ValueError, KeyError, TypeError, AttributeError, sp.SympifyError):
+        return None
+    return mass_matrix, bias, gravity, tuple(symbols)
+
+
+def _write(path: Path, expressions: TripleExpressions) -> None:
+    import sympy as sp
+
+    mass_matrix, bias, gravity, symbols = expressions
+    data = {
+        "format": CACHE_FORMAT_VERSION,
+        "sympy": sp.__version__,
+        "derivation": derivation_hash(),
+        "mass_matrix": sp.srepr(mass_matrix),
+        "bias": sp.srepr(bias),
+        "gravity": sp.srepr(gravity),
+        "symbols": sp.srepr(sp.Tuple(*symbols)),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(data, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temporary)
+        raise
+
+
+def load_triple_dynamics(cache_dir: Path | None = None) -> TripleExpressions:
+    """Return ``_derive_triple_dynamics()``, from the disk cache when possible."""
+    path = cache_path(cache_dir)
+    cached = _read(path)
+    if cached is not None:
+        return cached
+    expressions = triple_pendulum._derive_triple_dynamics()
+    with contextlib.suppress(OSError):
+        _write(path, expressions)
+    return expressions
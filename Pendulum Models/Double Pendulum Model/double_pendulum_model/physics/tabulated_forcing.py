@@ -0,0 +1,178 @@
+"""
+Torque profiles tabulated from recorded data.
+
+Force plates and inverse-dynamics pipelines produce torque histories as
+``(time, torque)`` samples rather than closed-form expressions.
+:class:`TabulatedForcing` turns such a table into a forcing function for
+:class:`~double_pendulum_model.physics.double_pendulum.DoublePendulumDynamics`
+using piecewise-linear interpolation, holding the first and last torque
+outside the recorded interval.
+
+Lookups are O(1) per call: uniformly spaced tables compute the interval index
+directly from the time, and non-uniform tables keep a cursor on the last
+interval used, which integrators advancing in time hit or move by one. Only a
+jump to a distant time falls back to a binary search.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import typing
+from pathlib import Path
+
+import numpy as np
+
+if typing.TYPE_CHECKING:
+    from double_pendulum_model.physics.double_pendulum import DoublePendulumState
+
+# Grids whose spacing varies by less than this fraction of the mean step are
+# treated as uniform (dimensionless)
+UNIFORM_GRID_TOLERANCE = 1e-9
+
+
+class TabulatedForcing:
+    """Piecewise-linear forcing from a ``(time, torque)`` table.
+
+    ``times`` must be finite and strictly increasing with at least two
+    samples. The forcing depends on time only, so ``time_only`` is true and
+    fixed-step runs sample it ahead of time through :meth:`sample`.
+    """
+
+    time_only = True
+
+    def __init__(self, times: np.ndarray, torques: np.ndarray) -> None:
+        """Initialize from matching 1-D arrays of times (s) and torques (N·m)."""
+        times = np.array(times, dtype=np.float64)
+        torques = np.array(torques, dtype=np.float64)
+        if times.ndim != 1 or times.shape != torques.shape:
+            raise ValueError(
+                "times and torques must be 1-D arrays of the same length, "
+                f"got shapes {times.shape} and {torques.shape}"
+            )
+        if len(times) < 2:
+            raise ValueError("A torque table needs at least two samples")
+        if not (np.all(np.isfinite(times)) and np.all(np.isfinite(torques))):
+            raise ValueError("Torque table contains non-finite values")
+        steps = np.diff(times)
+        if np.any(steps <= 0.0):
+            raise ValueError("Torque table times must be strictly increasing")
+
+        self.times = times
+        self.torques = torques
+        self.step = float((times[-1] - times[0]) / (len(times) - 1))
+        self.uniform = bool(
+            np.max(np.abs(steps - self.step)) <= UNIFORM_GRID_TOLERANCE * self.step
+        )
+        self._start = float(times[0])
+        self._end = float(times[-1])
+        self._last = len(times) - 2  # Index of the final interval
+        self._time_list: list[float] = times.tolist()
+        self._torque_list: list[float] = torques.tolist()
+        self._cursor = 0
+
+    @classmethod
+    def from_file(
+        cls, path: str | os.PathLike[str], column: int = 1
+    ) -> TabulatedForcing:
+        """Load a table from a ``.csv`` or ``.npy`` file.
+
+        Rows are samples: column 0 holds the time (s) and ``column`` the
+        torque (N·m), so one file can hold both joints. CSV files are comma
+        separated and may start with a single header line.
+        """
+        path = Path(path)
+        suffix = path.suffix.lower()
+        if suffix == ".npy":
+            table = np.load(path, allow_pickle=False)
+        elif suffix == ".csv":
+            with path.open(encoding="utf-8") as handle:
+                first = handle.readline()
+            try:
+                [float(field) for field in first.split(",")]
+                header_lines = 0
+            except ValueError:
+                header_lines = 1
+            table = np.loadtxt(
+                path, delimiter=",", skiprows=header_lines, ndmin=2, dtype=np.float64
+            )
+        else:
+            raise ValueError(
+                f"Unsupported torque table format '{path.suffix}'; "
+                "expected .csv or .npy"
+            )
+        if table.ndim != 2 or not 0 < column < table.shape[1]:
+            raise ValueError(
+                f"Torque table {path} has shape {table.shape}; "
+                f"expected a time column and torque column {column}"
+            )
+        return cls(table[:, 0], table[:, column])
+
+    def _interval(self, t: float) -> int:
+        """Move the cursor to the interval ``times[i] <= t < times[i + 1]``."""
+        times = self._time_list
+        i = self._cursor
+        if times[i] <= t:
+            if i < self._last and t < times[i + 2]:
+                self._cursor = i + 1
+                return i + 1
+        elif i > 0 and times[i - 1] <= t:
+            self._cursor = i - 1
+            return i - 1
+        i = min(max(bisect.bisect_right(times, t) - 1, 0), self._last)
+        self._cursor = i
+        return i
+
+    def __call__(self, t: float, state: DoublePendulumState) -> float:
+        """Interpolated torque at time ``t``; the state is ignored."""
+        torques = self._torque_list
+        if t <= self._start:
+            return torques[0]
+        if t >= self._end:
+            return torques[-1]
+        if self.uniform:
+            position = (t - self._start) / self.step
+            i = min(int(position), self._last)
+            lower = torques[i]
+            return lower + (position - i) * (torques[i + 1] - lower)
+        times = self._time_list
+        i = self._cursor
+        if not times[i] <= t < times[i + 1]:
+            i = self._interval(t)
+        lower = torques[i]
+        slope = (torques[i + 1] - lower) / (times[i + 1] - times[i])
+        return slope * (t - times[i]) + lower
+
+    def sample(self, times: np.ndarray) -> np.ndarray:
+        """Interpolated torque at every entry of ``times``.
+
+        Performs the same floating-point operations as :meth:`__call__`, so
+        precomputed samples match per-call evaluation exactly.
+        """
+        t = np.asarray(times, dtype=np.float64)
+        if self.uniform:
+            position = np.clip((t - self._start) / self.step, 0.0, self._last + 1)
+            i = np.minimum(position.astype(np.intp), self._last)
+            lower = self.torques[i]
+            values = lower + (position - i) * (self.torques[i + 1] - lower)
+        else:
+            i = np.clip(np.searchsorted(self.times, t, side="right") - 1, 0, self._last)
+            lower = self.torques[i]
+            slope = (self.torques[i + 1] - lower) / (self.times[i + 1] - self.times[i])
+            values = slope * (t - self.times[i]) + lower
+        values = np.where(t <= self._start, self.torques[0], values)
+        return np.where(t >= self._end, self.torques[-1], values)
+
+    def evaluate_array(
+        self,
+        t: float | np.ndarray,
+        theta1: float | np.ndarray,
+        theta2: float | np.ndarray,
+        omega1: float | np.ndarray,
+        omega2: float | np.ndarray,
+    ) -> np.ndarray:
+        """Batch form of :meth:`__call__`, broadcast against the state inputs."""
+        shape = np.broadcast_shapes(
+            *(np.shape(x) for x in (t, theta1, theta2, omega1, omega2))
+        )
+        return np.broadcast_to(self.sample(t), shape).copy()
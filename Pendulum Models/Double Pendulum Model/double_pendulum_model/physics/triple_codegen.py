@@ -0,0 +1,191 @@
+"""
+Ahead-of-time generation of the triple pendulum kernels.
+
+Deriving the triple pendulum equations of motion with SymPy takes tens of
+seconds, which every GUI start and every fresh worker process would otherwise
+pay. This module prints the derived mass matrix, bias vector and gravity
+torques as a plain-NumPy Python module, ``_triple_kernels.py``, which is
+committed next to it. The runtime imports that module and never needs SymPy.
+
+Regenerate after changing ``_derive_triple_dynamics`` (or check that the
+committed module is current, e.g. in CI or at install time)::
+
+    python -m double_pendulum_model.physics.triple_codegen
+    python -m double_pendulum_model.physics.triple_codegen --check
+
+The expressions are printed exactly as :func:`sympy.lambdify` prints them for
+the ``numpy`` module, so the generated kernels reproduce the symbolic
+reference bit for bit. ``mass_matrix_and_bias`` and
+``mass_matrix_and_bias_array`` are the exceptions: they are the kernels behind
+``forward_dynamics`` and its batched form, so they evaluate both terms in one
+pass of :func:`sympy.cse` subexpressions (each sine and cosine once) and agree
+with the reference to rounding. The scalar kernel uses the ``math`` module;
+the array kernel broadcasts over states and parameters alike. The scalar
+kernel returns plain tuples, which the unrolled solver in :mod:`.spd_solve`
+consumes without creating arrays.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import tempfile
+import typing
+from pathlib import Path
+
+from double_pendulum_model.physics.symbolic_cache import (
+    derivation_hash,
+    load_triple_dynamics,
+)
+from double_pendulum_model.physics.triple_pendulum import TRIPLE_KERNEL_ARGUMENTS
+
+GENERATED_MODULE = Path(__file__).with_name("_triple_kernels.py")
+
+_MODULE_TEMPLATE = '''"""
+Triple pendulum kernels generated from the symbolic Lagrangian derivation.
+
+Do not edit by hand; regenerate with
+    python -m double_pendulum_model.physics.triple_codegen
+Arguments follow ``TRIPLE_KERNEL_ARGUMENTS`` in ``triple_pendulum.py``.
+"""
+
+# fmt: off
+# ruff: noqa: E501
+
+import math
+
+import numpy
+
+DERIVATION_HASH = "{derivation_hash}"
+
+
+def mass_matrix({arguments}):
+    return {mass_matrix}
+
+
+def bias_vector({arguments}):
+    return {bias_vector}
+
+
+def gravity_torques({gravity_arguments}):
+    return {gravity_torques}
+
+
+def mass_matrix_and_bias({state_arguments}, params):
+    \"\"\"Mass matrix rows and bias as float tuples; ``params`` packs the rest.\"\"\"
+    {parameter_arguments} = params
+{subexpressions}
+    return (
+        {fused_mass_matrix},
+        {fused_bias},
+    )
+
+
+def mass_matrix_and_bias_array({state_arguments}, params):
+    \"\"\"Broadcast ``mass_matrix_and_bias`` to ``(..., 3, 3)`` and ``(..., 3)``.\"\"\"
+    {parameter_arguments} = params
+{array_subexpressions}
+    shape = numpy.broadcast_shapes({shape_arguments})
+    mass = numpy.empty(shape + (3, 3))
+    bias = numpy.empty(shape + (3,))
+{array_assignments}
+    return mass, bias
+'''
+
+
+def render_module() -> str:
+    """Derive the dynamics symbolically and return the generated module text."""
+    import sympy as sp
+    from sympy.printing.numpy import NumPyPrinter
+    from sympy.printing.pycode import PythonCodePrinter
+
+    mass_matrix, bias, gravity, _ = load_triple_dynamics()
+    printer = NumPyPrinter()
+    scalar_printer = PythonCodePrinter()
+    subexpressions, (fused_mass, fused_bias) = sp.cse([mass_matrix, bias])
+    array_assignments = [
+        f"    mass[..., {row}, {column}] = {printer.doprint(fused_mass[row, column])}"
+        for row in range(3)
+        for column in range(3)
+    ]
+    array_assignments += [
+        f"    bias[..., {row}] = {printer.doprint(fused_bias[row])}" for row in range(3)
+    ]
+    return _MODULE_TEMPLATE.format(
+        derivation_hash=derivation_hash(),
+        arguments=", ".join(TRIPLE_KERNEL_ARGUMENTS),
+        gravity_arguments=", ".join(
+            TRIPLE_KERNEL_ARGUMENTS[:3] + TRIPLE_KERNEL_ARGUMENTS[6:]
+        ),
+        mass_matrix=printer.doprint(mass_matrix),
+        bias_vector=printer.doprint(bias),
+        gravity_torques=printer.doprint(gravity),
+        state_arguments=", ".join(TRIPLE_KERNEL_ARGUMENTS[:6]),
+        parameter_arguments=", ".join(TRIPLE_KERNEL_ARGUMENTS[6:]),
+        subexpressions="\n".join(
+            f"    {symbol} = {scalar_printer.doprint(expression)}"
+            for symbol, expression in subexpressions
+        ),
+        fused_mass_matrix=_tuple_text(fused_mass.tolist(), scalar_printer),
+        fused_bias=_tuple_text(list(fused_bias), scalar_printer),
+        array_subexpressions="\n".join(
+            f"    {symbol} = {printer.doprint(expression)}"
+            for symbol, expression in subexpressions
+        ),
+        shape_arguments=", ".join(
+            f"numpy.shape({name})" for name in TRIPLE_KERNEL_ARGUMENTS
+        ),
+        array_assignments="\n".join(array_assignments),
+    )
+
+
+def _tuple_text(entries: list, printer: typing.Any) -> str:
+    """Print a (nested) list of expressions as a Python tuple literal."""
+    items = [
+        (
+            _tuple_text(entry, printer)
+            if isinstance(entry, list)
+            else printer.doprint(entry)
+        )
+        for entry in entries
+    ]
+    return "(" + ", ".join(items) + ")"
+
+
+def write_module(path: Path = GENERATED_MODULE) -> None:
+    """Atomically replace ``path`` with freshly generated kernels."""
+    text = render_module()
+    fd, temporary = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        os.replace(temporary, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temporary)
+        raise
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="exit with an error if the committed module is out of date",
+    )
+    args = parser.parse_args()
+    if args.check:
+        current = GENERATED_MODULE.read_text(encoding="utf-8")
+        if current != render_module():
+            raise SystemExit(f"{GENERATED_MODULE} is out of date; regenerate it")
+        print(f"{GENERATED_MODULE} is up to date")
+        return
+    write_module()
+    print(f"Wrote {GENERATED_MODULE}")
+
+
+if __name__ == "__main__":
+    main()
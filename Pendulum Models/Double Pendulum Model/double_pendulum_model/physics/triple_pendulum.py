@@ -1,18 +1,37 @@
 from __future__ import annotations
 
 import functools
-from collections.abc import Callable
+import math
+import typing
+from collections.abc import Callable, Iterator, Sequence
 from dataclasses import dataclass
 
 import numpy as np
-import sympy as sp
+
+from double_pendulum_model.physics.integrators import (
+    AdaptiveSolution,
+    Event,
+    dormand_prince,
+)
+from double_pendulum_model.physics.spd_solve import solve_spd3, solve_spd3_batch
+from double_pendulum_model.physics.versioning import Versioned
+
+if typing.TYPE_CHECKING:
+    import sympy as sp
 
 GRAVITATIONAL_ACCELERATION = 9.80665
 DAMPING_DEFAULT = (0.35, 0.3, 0.25)
 
+# Positional arguments of the mass matrix and bias kernels; the gravity kernel
+# takes the same names without the angular velocities
+TRIPLE_KERNEL_ARGUMENTS = (
+    "theta1", "theta2", "theta3", "omega1", "omega2", "omega3",
+    "l1", "l2", "l3", "lc1", "lc2", "lc3", "m1", "m2", "m3", "I1", "I2", "I3", "g",
+)
+
 
 @dataclass
-class TripleSegmentProperties:
+class TripleSegmentProperties(Versioned):
     length_m: float
     mass_kg: float
     center_of_mass_ratio: float
@@ -28,7 +47,7 @@ class TripleSegmentProperties:
 
 
 @dataclass
-class TriplePendulumParameters:
+class TriplePendulumParameters(Versioned):
     segments: tuple[TripleSegmentProperties, TripleSegmentProperties, TripleSegmentProperties]
     damping: tuple[float, float, float] = DAMPING_DEFAULT
     gravity_enabled: bool = True
@@ -60,6 +79,60 @@ class TriplePendulumParameters:
     def gravity(self) -> float:
         return self.gravity_m_s2 if self.gravity_enabled else 0.0
 
+    @property
+    def version(self) -> int:
+        """Change stamp covering these parameters and all three segments."""
+        return max(super().version, *(segment.version for segment in self.segments))
+
+    def kernel_arguments(self) -> tuple[float, ...]:
+        """Model parameters in ``TRIPLE_KERNEL_ARGUMENTS[6:]`` order."""
+        segs = self.segments
+        return (
+            segs[0].length_m,
+            segs[1].length_m,
+            segs[2].length_m,
+            segs[0].center_of_mass_distance,
+            segs[1].center_of_mass_distance,
+            segs[2].center_of_mass_distance,
+            segs[0].mass_kg,
+            segs[1].mass_kg,
+            segs[2].mass_kg,
+            segs[0].inertia_about_com,
+            segs[1].inertia_about_com,
+            segs[2].inertia_about_com,
+            self.gravity,
+        )
+
+
+@dataclass(frozen=True)
+class TripleParameterBatch:
+    """One set of model parameters per row of a batched triple pendulum run.
+
+    ``packed`` holds the 13 kernel parameters of
+    :meth:`TriplePendulumParameters.kernel_arguments` as ``(N,)`` arrays and
+    ``damping`` the ``(N, 3)`` joint damping coefficients.
+    """
+
+    packed: tuple[np.ndarray, ...]
+    damping: np.ndarray
+
+    @classmethod
+    def from_parameters(
+        cls, parameter_sets: Sequence[TriplePendulumParameters]
+    ) -> TripleParameterBatch:
+        """Pack a sequence of parameter sets, one per batch row."""
+        table = np.array(
+            [parameters.kernel_arguments() for parameters in parameter_sets],
+            dtype=np.float64,
+        ).reshape(-1, 13)
+        damping = np.array(
+            [parameters.damping for parameters in parameter_sets], dtype=np.float64
+        ).reshape(-1, 3)
+        return cls(tuple(table.T.copy()), damping)
+
+    def __len__(self) -> int:
+        return len(self.damping)
+
 
 @dataclass
 class TriplePendulumState:
@@ -92,10 +165,17 @@ class PolynomialProfile:
         return float(np.poly1d(derivative)(t))
 
 
-@functools.lru_cache(maxsize=1)
-def _symbolic_triple_functions() -> (
-    tuple[Callable[..., np.ndarray], Callable[..., np.ndarray], Callable[..., np.ndarray]]
+def _derive_triple_dynamics() -> (
+    tuple[sp.Matrix, sp.Matrix, sp.Matrix, tuple[sp.Symbol, ...]]
 ):
+    """Mass matrix, bias vector and gravity torques from the Lagrangian.
+
+    Returns the three SymPy matrices and the symbols in
+    :data:`TRIPLE_KERNEL_ARGUMENTS` order. The gravity torques are the bias
+    at rest and do not depend on the angular velocities.
+    """
+    import sympy as sp
+
     theta1, theta2, theta3 = sp.symbols("theta1 theta2 theta3")
     omega1, omega2, omega3 = sp.symbols("omega1 omega2 omega3")
     alpha1, alpha2, alpha3 = sp.symbols("alpha1 alpha2 alpha3")
@@ -161,7 +241,7 @@ def _symbolic_triple_functions() -> (
         tau.append(time_derivative_term - generalized_coordinate_term)
 
     tau_vec = sp.Matrix(tau)
-    mass_matrix_sym = tau_vec.jacobian(qdd)
+    mass_matrix_sym = tau_vec.jacobian(qdd).applyfunc(sp.trigsimp)
     bias = sp.simplify(tau_vec.subs({alpha1: 0, alpha2: 0, alpha3: 0}))
 
     symbols = (
@@ -186,65 +266,88 @@ def _symbolic_triple_functions() -> (
         g,
     )
 
-    mass_func = sp.lambdify(symbols[:6] + symbols[6:], mass_matrix_sym, "numpy")
-    bias_func = sp.lambdify(symbols[:6] + symbols[6:], bias, "numpy")
-    gravity_func = sp.lambdify(
-        (
-            theta1,
-            theta2,
-            theta3,
-            l1,
-            l2,
-            l3,
-            lc1,
-            lc2,
-            lc3,
-            m1,
-            m2,
-            m3,
-            i1_sym,
-            i2_sym,
-            i3_sym,
-            g,
-        ),
-        bias.subs({omega1: 0, omega2: 0, omega3: 0}),
-        "numpy",
-    )
+    return mass_matrix_sym, bias, bias.subs({omega1: 0, omega2: 0, omega3: 0}), symbols
+
+
+@functools.lru_cache(maxsize=1)
+def _symbolic_triple_functions() -> (
+    tuple[Callable[..., np.ndarray], Callable[..., np.ndarray], Callable[..., np.ndarray]]
+):
+    """Kernels lambdified from :func:`_derive_triple_dynamics` (needs SymPy).
+
+    The runtime uses the generated :mod:`._triple_kernels` module instead;
+    these are the reference its output is verified against. The derivation
+    is read from the on-disk cache of :mod:`.symbolic_cache` when available.
+    """
+    import sympy as sp
+
+    from double_pendulum_model.physics.symbolic_cache import load_triple_dynamics
+
+    mass_matrix_sym, bias, gravity, symbols = load_triple_dynamics()
+    mass_func = sp.lambdify(symbols, mass_matrix_sym, "numpy")
+    bias_func = sp.lambdify(symbols, bias, "numpy")
+    gravity_func = sp.lambdify(symbols[:3] + symbols[6:], gravity, "numpy")
     return mass_func, bias_func, gravity_func
 
 
 class TriplePendulumDynamics:
     def __init__(self, parameters: TriplePendulumParameters | None = None) -> None:
+        # Imported here rather than at module level: triple_codegen imports
+        # this module and must run when the generated kernels are missing.
+        from double_pendulum_model.physics import _triple_kernels
+
         self.parameters = parameters or TriplePendulumParameters.default()
-        self._mass_func, self._bias_func, self._gravity_func = _symbolic_triple_functions()
+        self._mass_func = _triple_kernels.mass_matrix
+        self._bias_func = _triple_kernels.bias_vector
+        self._gravity_func = _triple_kernels.gravity_torques
+        self._fused_func = _triple_kernels.mass_matrix_and_bias
+        self._fused_array_func = _triple_kernels.mass_matrix_and_bias_array
+        self._packed: tuple[float, ...] = ()
+        self._packed_source: TriplePendulumParameters | None = None
+        self._packed_version = -1
 
     def _parameter_vector(self) -> tuple[float, ...]:
-        segs = self.parameters.segments
-        return (
-            segs[0].length_m,
-            segs[1].length_m,
-            segs[2].length_m,
-            segs[0].center_of_mass_distance,
-            segs[1].center_of_mass_distance,
-            segs[2].center_of_mass_distance,
-            segs[0].mass_kg,
-            segs[1].mass_kg,
-            segs[2].mass_kg,
-            segs[0].inertia_about_com,
-            segs[1].inertia_about_com,
-            segs[2].inertia_about_com,
-            self.parameters.gravity,
+        return self.parameters.kernel_arguments()
+
+    def _packed_parameters(self) -> tuple[float, ...]:
+        """:meth:`_parameter_vector`, rebuilt only after the parameters change."""
+        p = self.parameters
+        version = p.version
+        if self._packed_source is not p or self._packed_version != version:
+            self._packed = tuple(float(value) for value in self._parameter_vector())
+            self._packed_source = p
+            self._packed_version = version
+        return self._packed
+
+    def mass_matrix_and_bias(
+        self, state: TriplePendulumState
+    ) -> tuple[np.ndarray, tuple[float, float, float]]:
+        """Mass matrix and bias (including damping) from one fused kernel call."""
+        mass, bias = self._fused_func(
+            state.theta1,
+            state.theta2,
+            state.theta3,
+            state.omega1,
+            state.omega2,
+            state.omega3,
+            self._packed_parameters(),
+        )
+        d1, d2, d3 = self.parameters.damping
+        return np.array(mass), (
+            bias[0] + d1 * state.omega1,
+            bias[1] + d2 * state.omega2,
+            bias[2] + d3 * state.omega3,
         )
 
     def mass_matrix(self, state: TriplePendulumState) -> np.ndarray:
-        params = self._parameter_vector()
+        params = self._packed_parameters()
         theta = (state.theta1, state.theta2, state.theta3)
         omega = (state.omega1, state.omega2, state.omega3)
         mass = self._mass_func(*theta, *omega, *params)
         return np.array(mass, dtype=float)
 
     def bias_vector(self, state: TriplePendulumState) -> np.ndarray:
-        params = self._parameter_vector()
+        params = self._packed_parameters()
         theta = (state.theta1, state.theta2, state.theta3)
         omega = (state.omega1, state.omega2, state.omega3)
         bias = self._bias_func(*theta, *omega, *params)
@@ -254,16 +357,33 @@ class TriplePendulumDynamics:
     def forward_dynamics(
         self, state: TriplePendulumState, control: tuple[float, float, float]
     ) -> tuple[float, float, float]:
-        mass = self.mass_matrix(state)
-        bias = self.bias_vector(state)
-        accelerations = np.linalg.solve(mass, np.array(control, dtype=float) - bias)
-        return tuple(float(a) for a in accelerations)
+        omega1 = state.omega1
+        omega2 = state.omega2
+        omega3 = state.omega3
+        mass, (b1, b2, b3) = self._fused_func(
+            state.theta1,
+            state.theta2,
+            state.theta3,
+            omega1,
+            omega2,
+            omega3,
+            self._packed_parameters(),
+        )
+        d1, d2, d3 = self.parameters.damping
+        c1, c2, c3 = control
+        return solve_spd3(
+            mass,
+            (
+                c1 - (b1 + d1 * omega1),
+                c2 - (b2 + d2 * omega2),
+                c3 - (b3 + d3 * omega3),
+            ),
+        )
 
     def inverse_dynamics(
         self, state: TriplePendulumState, accelerations: tuple[float, float, float]
     ) -> tuple[float, float, float]:
-        mass = self.mass_matrix(state)
-        bias = self.bias_vector(state)
+        mass, bias = self.mass_matrix_and_bias(state)
         torques = mass @ np.array(accelerations, dtype=float) + bias
         return tuple(float(t) for t in torques)
 
@@ -271,7 +391,7 @@ class TriplePendulumDynamics:
         self, state: TriplePendulumState, control: tuple[float, float, float]
     ) -> TripleJointTorques:
         theta = (state.theta1, state.theta2, state.theta3)
-        params = self._parameter_vector()
+        params = self._packed_parameters()
         gravity_components = np.array(self._gravity_func(*theta, *params), dtype=float).flatten()
         damping_components = tuple(
             float(self.parameters.damping[i] * state_component)
@@ -287,6 +407,62 @@ class TriplePendulumDynamics:
             coriolis_centripetal=tuple(float(c) for c in coriolis_bias),
         )
 
+    def vector_field(
+        self, t: float, y: np.ndarray, control: tuple[float, float, float]
+    ) -> np.ndarray:
+        """Right-hand side on a ``(theta1..3, omega1..3)`` vector."""
+        state = TriplePendulumState(*y.tolist())
+        accelerations = self.forward_dynamics(state, control)
+        return np.concatenate((y[3:], accelerations))
+
+    def integrate_adaptive(
+        self,
+        state0: TriplePendulumState,
+        t0: float,
+        t_end: float,
+        control: tuple[float, float, float],
+        rtol: float = 1e-6,
+        atol: float = 1e-9,
+        first_step: float | None = None,
+        max_step: float = math.inf,
+        events: Sequence[Event] = (),
+    ) -> AdaptiveSolution:
+        """Integrate with adaptive Dormand–Prince steps under constant control.
+
+        ``events`` take ``(t, TriplePendulumState)``; see
+        :func:`~double_pendulum_model.physics.integrators.dormand_prince`.
+        """
+        y0 = np.array(
+            (
+                state0.theta1,
+                state0.theta2,
+                state0.theta3,
+                state0.omega1,
+                state0.omega2,
+                state0.omega3,
+            )
+        )
+        return dormand_prince(
+            lambda t, y: self.vector_field(t, y, control),
+            t0,
+            y0,
+            t_end,
+            rtol=rtol,
+            atol=atol,
+            first_step=first_step,
+            max_step=max_step,
+            events=[
+                Event(
+                    lambda t, y, function=event.function: function(
+                        t, TriplePendulumState(*y.tolist())
+                    ),
+                    direction=event.direction,
+                    terminal=event.terminal,
+                )
+                for event in events
+            ],
+        )
+
     def step(
         self,
         t: float,
@@ -343,3 +519,125 @@ class TriplePendulumDynamics:
             omega2=new_omega2,
             omega3=new_omega3,
         )
+
+    def iter_blocks(
+        self,
+        state0: TriplePendulumState,
+        t0: float,
+        dt: float,
+        control: tuple[float, float, float],
+        block_size: int = 4096,
+        n_steps: int | None = None,
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Stream an RK4 run as ``(times, states)`` blocks of up to ``block_size``.
+
+        State columns are ``(theta1, theta2, theta3, omega1, omega2, omega3)``.
+        ``n_steps=None`` streams until the consumer stops iterating.
+        """
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        state = state0
+        t = t0
+        remaining = n_steps
+        while remaining is None or remaining > 0:
+            rows = block_size if remaining is None else min(block_size, remaining)
+            times = np.empty(rows, dtype=np.float64)
+            states = np.empty((rows, 6), dtype=np.float64)
+            for i in range(rows):
+                state = self.step(t, state, dt, control)
+                t += dt
+                times[i] = t
+                states[i] = (
+                    state.theta1,
+                    state.theta2,
+                    state.theta3,
+                    state.omega1,
+                    state.omega2,
+                    state.omega3,
+                )
+            if remaining is not None:
+                remaining -= rows
+            yield times, states
+
+    def mass_matrix_and_bias_batch(
+        self, states: np.ndarray, parameters: TripleParameterBatch | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Array form of :meth:`mass_matrix_and_bias` for ``(N, 6)`` states.
+
+        Returns the ``(N, 3, 3)`` mass matrices and ``(N, 3)`` biases including
+        damping. ``parameters`` gives every row its own model; by default all
+        rows share :attr:`parameters`.
+        """
+        states = np.asarray(states, dtype=np.float64)
+        if states.ndim != 2 or states.shape[1] != 6:
+            raise ValueError(f"states must have shape (N, 6), got {states.shape}")
+        if parameters is None:
+            packed: Sequence[float | np.ndarray] = self._packed_parameters()
+            damping = np.array(self.parameters.damping, dtype=np.float64)
+        else:
+            if len(parameters) != len(states):
+                raise ValueError(
+                    f"{len(parameters)} parameter sets for {len(states)} states"
+                )
+            packed, damping = parameters.packed, parameters.damping
+        mass, bias = self._fused_array_func(*states.T, packed)
+        bias += damping * states[:, 3:]
+        return mass, bias
+
+    def forward_dynamics_batch(
+        self,
+        states: np.ndarray,
+        controls: Sequence[float] | np.ndarray,
+        parameters: TripleParameterBatch | None = None,
+    ) -> np.ndarray:
+        """Angular accelerations ``(N, 3)`` from the unrolled batched solve.
+
+        ``controls`` is a joint torque triple shared by all rows or an
+        ``(N, 3)`` array.
+        """
+        mass, bias = self.mass_matrix_and_bias_batch(states, parameters)
+        return solve_spd3_batch(mass, np.asarray(controls, dtype=np.float64) - bias)
+
+    def step_batch(
+        self,
+        t: float,
+        states: np.ndarray,
+        dt: float,
+        controls: Sequence[float] | np.ndarray,
+        parameters: TripleParameterBatch | None = None,
+    ) -> np.ndarray:
+        """Advance ``(N, 6)`` states by one RK4 step, as :meth:`step` does per row."""
+        states = np.asarray(states, dtype=np.float64)
+
+        def vector_field(current: np.ndarray) -> np.ndarray:
+            accelerations = self.forward_dynamics_batch(current, controls, parameters)
+            return np.concatenate((current[:, 3:], accelerations), axis=1)
+
+        k1 = vector_field(states)
+        k2 = vector_field(states + dt / 2.0 * k1)
+        k3 = vector_field(states + dt / 2.0 * k2)
+        k4 = vector_field(states + dt * k3)
+        return states + dt / 6.0 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+    def simulate_batch(
+        self,
+        states0: np.ndarray,
+        t0: float,
+        dt: float,
+        n_steps: int,
+        controls: Sequence[float] | np.ndarray,
+        parameters: TripleParameterBatch | None = None,
+    ) -> np.ndarray:
+        """RK4 trajectories of ``(N, 6)`` initial states, e.g. for Monte Carlo runs.
+
+        Returns an ``(n_steps, N, 6)`` array whose entry ``i`` holds the states
+        at ``t0 + (i + 1) * dt``.
+        """
+        states = np.asarray(states0, dtype=np.float64)
+        trajectory = np.empty((n_steps, *states.shape), dtype=np.float64)
+        t = t0
+        for i in range(n_steps):
+            states = self.step_batch(t, states, dt, controls, parameters)
+            t += dt
+            trajectory[i] = states
+        return trajectory
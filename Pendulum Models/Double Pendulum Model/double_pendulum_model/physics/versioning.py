@@ -0,0 +1,35 @@
+"""
+Change tracking for mutable parameter dataclasses.
+
+Dynamics objects cache values derived from their parameters. The GUIs mutate
+parameter dataclasses in place (e.g. toggling gravity), so caches cannot rely
+on object identity alone. Classes mixing in :class:`Versioned` receive a fresh,
+process-wide unique version stamp on every attribute assignment that changes a
+value. Re-assigning an equal value (as the GUIs do on every tick) keeps the
+stamp, so derived caches survive.
+"""
+
+from __future__ import annotations
+
+import itertools
+
+_VERSION_COUNTER = itertools.count(1)
+
+
+class Versioned:
+    """Mixin that restamps ``version`` whenever an attribute value changes."""
+
+    def __setattr__(self, name: str, value: object) -> None:
+        unchanged = name in self.__dict__ and self.__dict__[name] == value
+        object.__setattr__(self, name, value)
+        if not unchanged:
+            object.__setattr__(self, "_version", next(_VERSION_COUNTER))
+
+    @property
+    def version(self) -> int:
+        """Stamp of the most recent attribute change on this instance.
+
+        Stamps come from a single monotonically increasing counter, so the
+        maximum over a group of objects changes whenever any member changes.
+        """
+        return int(self.__dict__.get("_version", 0))
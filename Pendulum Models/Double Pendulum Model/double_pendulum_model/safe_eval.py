@@ -4,9 +4,143 @@ Safe evaluation of user-provided mathematical expressions.
 
 import ast
 import math
+import threading
 import typing
+from collections import OrderedDict
+from collections.abc import Callable, Mapping, Sequence
 from types import CodeType
 
+import numpy as np
+
+from double_pendulum_model.expression_builtins import (
+    SCALAR_BUILTINS,
+    TABLE_ARGUMENTS,
+    VECTORIZED_BUILTINS,
+)
+from double_pendulum_model.expression_cost import (
+    EvaluationBudget,
+    check_cost,
+    check_length,
+)
+from double_pendulum_model.expression_derivatives import differentiate
+from double_pendulum_model.expression_optimizer import optimize_expression
+
+_EXPRESSION_NAME = "__safe_eval_expression__"
+_FACTORY_NAME = "__safe_eval_factory__"
+_FUNCTION_NAME = "__safe_eval_function__"
+_RESULT_NAME = "__safe_eval_result__"
+
+EXPRESSION_CACHE_SIZE = 256  # Compiled expressions kept process-wide
+
+
+class ExpressionCacheInfo(typing.NamedTuple):
+    """Hit/miss statistics of the compiled-expression cache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _ExpressionCache:
+    """Thread-safe LRU cache of compiled expressions.
+
+    Keys are ``(expression text, allowed variables, backend)``; the backend
+    identifies the compiled form together with everything else that affects
+    it (positional parameters, optimizer settings).
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[typing.Hashable, typing.Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_compile(
+        self, key: typing.Hashable, build: Callable[[], typing.Any]
+    ) -> typing.Any:
+        with self._lock:
+            if key in self._entries:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self._misses += 1
+        # Compile outside the lock; a concurrent miss on the same key just
+        # compiles twice and keeps one result.
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def info(self) -> ExpressionCacheInfo:
+        with self._lock:
+            return ExpressionCacheInfo(
+                self._hits, self._misses, self.maxsize, len(self._entries)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+_EXPRESSION_CACHE = _ExpressionCache(EXPRESSION_CACHE_SIZE)
+
+
+def expression_cache_info() -> ExpressionCacheInfo:
+    """Return hit/miss counters of the process-wide compiled-expression cache."""
+    return _EXPRESSION_CACHE.info()
+
+
+def clear_expression_cache() -> None:
+    """Drop all cached compiled expressions and reset the counters."""
+    _EXPRESSION_CACHE.clear()
+
+
+def _table_value(node: ast.AST) -> float:
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub | ast.UAdd):
+        value = _table_value(node.operand)
+        return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = float(node.value)
+        if math.isfinite(value):
+            return value
+    raise ValueError("Table entries must be finite number literals")
+
+
+def _literal_tables(call: ast.Call) -> dict[int, tuple[float, ...]]:
+    """Validate the literal list arguments of a table function call."""
+    name = typing.cast("ast.Name", call.func).id
+    positions = TABLE_ARGUMENTS[name]
+    if len(call.args) != max(positions) + 1 or call.keywords:
+        raise ValueError(f"'{name}' takes {max(positions) + 1} positional arguments")
+    tables: dict[int, tuple[float, ...]] = {}
+    for position in positions:
+        argument = call.args[position]
+        if not isinstance(argument, ast.List | ast.Tuple):
+            raise ValueError(f"Argument {position + 1} of '{name}' must be a list")
+        tables[position] = tuple(_table_value(item) for item in argument.elts)
+    knots, *others = tables.values()
+    if len(knots) < 2 or any(len(values) != len(knots) for values in others):
+        raise ValueError(f"'{name}' needs at least two knots and one value per knot")
+    if any(upper <= lower for lower, upper in zip(knots, knots[1:], strict=False)):
+        raise ValueError(f"Knots of '{name}' must be strictly increasing")
+    return tables
+
+
+def _broadcast_result(value: typing.Any, *inputs: typing.Any) -> np.ndarray:
+    """Return ``value`` as a float array with the broadcast shape of ``inputs``."""
+    shape = np.broadcast_shapes(*(np.shape(item) for item in inputs))
+    result = np.asarray(value, dtype=float)
+    if result.shape != shape:
+        result = np.broadcast_to(result, shape).copy()
+    return result
+
 
 class SafeEvaluator:
     """Safe evaluation of user-provided expressions using AST whitelisting."""
@@ -67,29 +201,86 @@ class SafeEvaluator:
             "tau",
             "fabs",
         )
+    } | SCALAR_BUILTINS
+
+    _NUMPY_MATH_NAMES: typing.ClassVar[dict[str, typing.Any]] = {
+        "sin": np.sin,
+        "cos": np.cos,
+        "tan": np.tan,
+        "asin": np.arcsin,
+        "acos": np.arccos,
+        "atan": np.arctan,
+        "atan2": np.arctan2,
+        "sqrt": np.sqrt,
+        "log": np.log,
+        "log10": np.log10,
+        "exp": np.exp,
+        "pi": math.pi,
+        "tau": math.tau,
+        "fabs": np.fabs,
+        **VECTORIZED_BUILTINS,
     }
+    """Element-wise NumPy equivalents of ``_ALLOWED_MATH_NAMES`` (same keys)."""
+
+    def __init__(
+        self,
+        allowed_variables: set[str] | None = None,
+        optimize: bool = True,
+        fast_powers: bool = False,
+    ) -> None:
+        """Initialize the SafeEvaluator with a set of allowed variable names.
 
-    def __init__(self, allowed_variables: set[str] | None = None) -> None:
-        """Initialize the SafeEvaluator with a set of allowed variable names."""
+        ``optimize`` enables constant folding and common subexpression
+        elimination, which never change results. ``fast_powers`` additionally
+        rewrites small integer powers as multiplications, which may differ from
+        ``**`` in the last bit.
+        """
         self.allowed_variables = allowed_variables or set()
         self.allowed_names = {**self._ALLOWED_MATH_NAMES}
+        self.optimize = optimize
+        self.fast_powers = fast_powers
 
     def validate(self, expression: str) -> ast.AST:  # noqa: C901, PLR0912
-        """Parses and validates the expression against the allowlist."""
+        """Parses and validates the expression against the allowlist.
+
+        List literals are only accepted as the tables of ``interp``; they are
+        replaced by constant tuples in the returned tree. Expressions that are
+        too large, too deeply nested or build huge integers are rejected by
+        :func:`~double_pendulum_model.expression_cost.check_cost`.
+        """
+        check_length(expression)
         try:
             parsed = ast.parse(expression.strip(), mode="eval")
         except SyntaxError as e:
             raise ValueError(f"Invalid syntax: {e}") from e
+        except (RecursionError, MemoryError) as e:
+            raise ValueError("Expression is nested too deeply") from e
 
+        table_calls: list[tuple[ast.Call, dict[int, tuple[float, ...]]]] = []
         for node in ast.walk(parsed):
             if isinstance(node, ast.BitXor):
                 raise ValueError("Use '**' for exponentiation instead of '^'")
 
+            if isinstance(node, ast.List | ast.Tuple) and any(
+                node is call.args[position]
+                for call, tables in table_calls
+                for position in tables
+            ):
+                continue
+
             if type(node) not in self._ALLOWED_NODES:
                 raise ValueError(
                     f"Disallowed syntax in expression: {type(node).__name__}"
                 )
 
+            if isinstance(node, ast.Constant) and type(node.value) not in (
+                int,
+                float,
+                complex,
+                bool,
+            ):
+                raise ValueError("Only numeric literals are permitted")
+
             if isinstance(node, ast.Name):
                 if isinstance(node.ctx, ast.Load):
                     if (
@@ -107,20 +298,251 @@ class SafeEvaluator:
                     raise ValueError("Only direct function calls are permitted")
                 if node.func.id not in self.allowed_names:
                     raise ValueError(f"Function '{node.func.id}' is not permitted")
+                if node.func.id in TABLE_ARGUMENTS:
+                    table_calls.append((node, _literal_tables(node)))
 
+        check_cost(parsed)
+        for call, tables in table_calls:
+            for position, table in tables.items():
+                call.args[position] = ast.copy_location(
+                    ast.Constant(value=table), call.args[position]
+                )
         return parsed
 
+    def referenced_variables(self, expression: str) -> frozenset[str]:
+        """Validates the expression and returns the variables it reads.
+
+        Results are cached with the compiled backends.
+        """
+        return typing.cast(
+            "frozenset[str]",
+            self._cached(
+                expression,
+                ("variables",),
+                lambda: frozenset(
+                    node.id
+                    for node in ast.walk(self.validate(expression))
+                    if isinstance(node, ast.Name) and node.id not in self.allowed_names
+                ),
+            ),
+        )
+
+    def _optimized(
+        self, parsed: ast.Expression, names: Mapping[str, typing.Any]
+    ) -> ast.Expression:
+        if not self.optimize:
+            return parsed
+        return optimize_expression(parsed, names, fast_powers=self.fast_powers)
+
+    def _cached(
+        self,
+        expression: str,
+        backend: tuple[typing.Hashable, ...],
+        build: Callable[[], typing.Any],
+    ) -> typing.Any:
+        key = (
+            expression,
+            frozenset(self.allowed_variables),
+            (*backend, self.optimize, self.fast_powers),
+        )
+        return _EXPRESSION_CACHE.get_or_compile(key, build)
+
+    def optimized_tree(self, expression: str) -> ast.Expression:
+        """Validates the expression and returns the tree :meth:`compile` uses.
+
+        Code generators can splice the result into larger functions; math
+        names in it refer to ``allowed_names``.
+        """
+        return self._optimized(
+            typing.cast("ast.Expression", self.validate(expression)),
+            self.allowed_names,
+        )
+
     def compile(self, expression: str) -> CodeType:
-        """Validates and compiles the expression."""
-        parsed = self.validate(expression)
+        """Validates, optimizes and compiles the expression.
+
+        Results are shared through the process-wide LRU cache, so compiling
+        the same text again (e.g. on every UI tick) is a dictionary lookup.
+        """
+        return typing.cast(
+            "CodeType",
+            self._cached(expression, ("code",), lambda: self._compile_code(expression)),
+        )
+
+    def _compile_code(self, expression: str) -> CodeType:
+        parsed = self._optimized(
+            typing.cast("ast.Expression", self.validate(expression)),
+            self.allowed_names,
+        )
         return typing.cast(
             "CodeType", compile(parsed, filename="<SafeEvaluator>", mode="eval")  # type: ignore[call-overload]
         )
 
+    def compile_function(
+        self, expression: str, parameters: Sequence[str]
+    ) -> Callable[..., float]:
+        """Validates the expression and compiles it into a positional function.
+
+        The returned function takes ``parameters`` positionally, in order, and
+        returns a float. Math names used by the expression are bound as
+        closure variables, so a call skips the per-evaluation context dict and
+        global lookups of :meth:`evaluate_code`. Every variable the expression
+        reads must be listed in ``parameters``.
+        """
+        parameters = tuple(parameters)
+        return typing.cast(
+            "Callable[..., float]",
+            self._cached(
+                expression,
+                ("function", parameters),
+                lambda: self._compile_positional(
+                    expression, parameters, self.allowed_names, float, False
+                ),
+            ),
+        )
+
+    def compile_vectorized(
+        self, expression: str, parameters: Sequence[str]
+    ) -> Callable[..., np.ndarray]:
+        """Compiles the expression into a positional function over NumPy arrays.
+
+        Like :meth:`compile_function`, but math functions are replaced by their
+        NumPy ufunc equivalents, so arguments may be arrays (or scalars) that
+        broadcast together. The result is a float array of the broadcast
+        shape, even for expressions that ignore some or all arguments. Domain
+        errors yield ``nan`` with a NumPy warning instead of raising.
+        """
+        parameters = tuple(parameters)
+        return typing.cast(
+            "Callable[..., np.ndarray]",
+            self._cached(
+                expression,
+                ("vectorized", parameters),
+                lambda: self._compile_positional(
+                    expression,
+                    parameters,
+                    self._NUMPY_MATH_NAMES,
+                    _broadcast_result,
+                    True,
+                ),
+            ),
+        )
+
+    def differentiate(
+        self, expression: str, with_respect_to: Sequence[str]
+    ) -> tuple[str, ...]:
+        """Returns the symbolic partial derivatives of the expression as text.
+
+        The validated expression is differentiated with SymPy and printed back
+        using only allowed names; every result is validated again, so a
+        derivative that needs functions outside the allowlist (e.g. ``sign``
+        from ``fabs``) raises ``ValueError``.
+        """
+        for name in with_respect_to:
+            if name not in self.allowed_variables:
+                raise ValueError(f"Variable '{name}' is not an allowed variable")
+        partials = differentiate(
+            self.validate(expression),
+            sorted(self.allowed_variables),
+            tuple(with_respect_to),
+        )
+        for name, partial in zip(with_respect_to, partials, strict=True):
+            try:
+                self.validate(partial)
+            except ValueError as e:
+                raise ValueError(
+                    f"Derivative of '{expression}' with respect to '{name}' "
+                    f"cannot be expressed safely: {e}"
+                ) from e
+        return partials
+
+    def compile_partials(
+        self,
+        expression: str,
+        parameters: Sequence[str],
+        with_respect_to: Sequence[str] | None = None,
+    ) -> tuple[Callable[..., float], ...]:
+        """Compiles exact partial derivatives into positional functions.
+
+        One function per name in ``with_respect_to`` (default: all
+        ``parameters``), each taking ``parameters`` like
+        :meth:`compile_function`. Results are cached with the other backends.
+        """
+        parameters = tuple(parameters)
+        variables = parameters if with_respect_to is None else tuple(with_respect_to)
+        partials = typing.cast(
+            "tuple[str, ...]",
+            self._cached(
+                expression,
+                ("partials", variables),
+                lambda: self.differentiate(expression, variables),
+            ),
+        )
+        return tuple(self.compile_function(partial, parameters) for partial in partials)
+
+    def _compile_positional(
+        self,
+        expression: str,
+        parameters: Sequence[str],
+        names: Mapping[str, typing.Any],
+        result: Callable[..., typing.Any],
+        pass_inputs: bool,
+    ) -> Callable[..., typing.Any]:
+        parsed = typing.cast("ast.Expression", self.validate(expression))
+        parameters = tuple(parameters)
+        for name in parameters:
+            if not name.isidentifier() or name not in self.allowed_variables:
+                raise ValueError(f"Parameter '{name}' is not an allowed variable")
+            if name in self.allowed_names:
+                raise ValueError(f"Parameter '{name}' shadows a math name")
+        if len(set(parameters)) != len(parameters):
+            raise ValueError("Parameter names must be unique")
+
+        used = {node.id for node in ast.walk(parsed) if isinstance(node, ast.Name)}
+        missing = sorted(used - set(parameters) - set(self.allowed_names))
+        if missing:
+            raise ValueError(f"Variable '{missing[0]}' is not a parameter")
+        optimized = self._optimized(parsed, names)
+        bound = sorted(
+            {node.id for node in ast.walk(optimized) if isinstance(node, ast.Name)}
+            & set(self.allowed_names)
+        )
+
+        # The validated (and optimized) expression tree is spliced into a fixed
+        # wrapper; the factory parameters are the sole source of non-local names.
+        inputs = ", ".join(parameters) if pass_inputs else ""
+        wrapper = ast.parse(
+            f"def {_FACTORY_NAME}({', '.join((_RESULT_NAME, *bound))}):\n"
+            f"    def {_FUNCTION_NAME}({', '.join(parameters)}):\n"
+            f"        return {_RESULT_NAME}({_EXPRESSION_NAME}, {inputs})\n"
+            f"    return {_FUNCTION_NAME}\n",
+            mode="exec",
+        )
+        call = next(node for node in ast.walk(wrapper) if isinstance(node, ast.Call))
+        call.args[0] = optimized.body
+        module = compile(
+            ast.fix_missing_locations(wrapper), filename="<SafeEvaluator>", mode="exec"
+        )
+        namespace: dict[str, typing.Any] = {"__builtins__": {}}
+        exec(module, namespace)
+        return typing.cast(
+            "Callable[..., typing.Any]",
+            namespace[_FACTORY_NAME](result, *(names[name] for name in bound)),
+        )
+
     def evaluate_code(
-        self, code: CodeType, context: dict[str, float] | None = None
+        self,
+        code: CodeType,
+        context: dict[str, float] | None = None,
+        budget: EvaluationBudget | None = None,
     ) -> float:
-        """Evaluates compiled code with the given context."""
+        """Evaluates compiled code with the given context.
+
+        Pass a shared ``budget`` when evaluating in a loop to stop the batch
+        with ``EvaluationBudgetExceeded`` once its wall-clock time runs out.
+        """
+        if budget is not None:
+            budget.check()
         # Start with context, but override with allowed math names to prevent shadowing
         # This addresses the risk of context={'sin': malicious_func}
         eval_context: dict[str, typing.Any] = context.copy() if context else {}
@@ -135,8 +557,11 @@ class SafeEvaluator:
         return float(eval(code, eval_context))
 
     def evaluate(
-        self, expression: str, context: dict[str, float] | None = None
+        self,
+        expression: str,
+        context: dict[str, float] | None = None,
+        budget: EvaluationBudget | None = None,
     ) -> float:
         """Evaluates the expression with the given context."""
         code = self.compile(expression)
-        return self.evaluate_code(code, context)
+        return self.evaluate_code(code, context, budget)
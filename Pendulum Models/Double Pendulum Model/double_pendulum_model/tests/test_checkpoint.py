@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from double_pendulum_model.physics.checkpoint import load_checkpoint, save_checkpoint
+from double_pendulum_model.physics.double_pendulum import (
+    DoublePendulumDynamics,
+    DoublePendulumParameters,
+    DoublePendulumState,
+    ExpressionFunction,
+)
+from double_pendulum_model.physics.triple_pendulum import (
+    TriplePendulumDynamics,
+    TriplePendulumState,
+)
+
+
+def _forced_dynamics() -> DoublePendulumDynamics:
+    parameters = DoublePendulumParameters.default()
+    parameters.damping_wrist = 0.137
+    return DoublePendulumDynamics(
+        parameters,
+        forcing_functions=(
+            ExpressionFunction("3*sin(2*t) - 0.5*omega1"),
+            ExpressionFunction("cos(t)*theta2"),
+        ),
+    )
+
+
+def test_fixed_step_restart_is_bit_identical(tmp_path: Path) -> None:
+    """Test that resuming from a checkpoint reproduces an uninterrupted run."""
+    dynamics = _forced_dynamics()
+    state0 = DoublePendulumState(theta1=0.7, theta2=-0.4, omega1=0.1, omega2=0.0)
+    dt = 0.01
+    reference = dynamics.simulate(state0, 0.0, dt, 200)
+
+    first = dynamics.simulate(state0, 0.0, dt, 100)
+    t = 0.0
+    for _ in range(100):
+        t += dt
+    path = tmp_path / "run.npz"
+    save_checkpoint(path, dynamics, DoublePendulumState(*first[-1]), t)
+
+    restored = load_checkpoint(path)
+    assert restored.t == t
+    assert restored.dynamics.parameters == dynamics.parameters
+    second = restored.dynamics.simulate(restored.state, restored.t, dt, 100)
+    np.testing.assert_array_equal(second, reference[100:])
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_adaptive_restart_is_bit_identical(tmp_path: Path) -> None:
+    """Test that the stored step proposal lets an adaptive run resume exactly."""
+    dynamics = _forced_dynamics()
+    state0 = DoublePendulumState(theta1=1.1, theta2=0.2, omega1=0.0, omega2=0.5)
+    reference = dynamics.integrate_adaptive(state0, 0.0, 5.0, rtol=1e-8)
+
+    k = len(reference.t) // 2
+    path = tmp_path / "adaptive.npz"
+    save_checkpoint(
+        path,
+        dynamics,
+        DoublePendulumState(*reference.y[k]),
+        float(reference.t[k]),
+        next_step=reference.proposed_steps[k - 1],
+    )
+    restored = load_checkpoint(path)
+    resumed = restored.dynamics.integrate_adaptive(
+        restored.state, restored.t, 5.0, rtol=1e-8, first_step=restored.next_step
+    )
+    np.testing.assert_array_equal(resumed.t, reference.t[k:])
+    np.testing.assert_array_equal(resumed.y, reference.y[k:])
+
+
+def test_triple_checkpoint_round_trip(tmp_path: Path) -> None:
+    """Test that triple pendulum checkpoints restore parameters and control."""
+    dynamics = TriplePendulumDynamics()
+    state = TriplePendulumState(0.3, -0.2, 0.1, 0.0, 0.4, -0.1)
+    control = (1.5, -0.25, 0.1)
+    path = tmp_path / "triple.npz"
+    save_checkpoint(path, dynamics, state, 1.25, control=control)
+
+    restored = load_checkpoint(path)
+    assert restored.state == state
+    assert restored.control == control
+    assert restored.next_step is None
+    assert restored.dynamics.parameters == dynamics.parameters
+
+
+def test_checkpoint_rejects_opaque_forcing(tmp_path: Path) -> None:
+    """Test that arbitrary callables cannot be silently dropped."""
+    dynamics = DoublePendulumDynamics(
+        forcing_functions=(lambda _t, _state: 1.0, lambda _t, _state: 0.0)
+    )
+    state = DoublePendulumState(theta1=0.0, theta2=0.0, omega1=0.0, omega2=0.0)
+    with pytest.raises(ValueError, match="checkpointed"):
+        save_checkpoint(tmp_path / "bad.npz", dynamics, state, 0.0)
@@ -1,7 +1,9 @@
+import dataclasses
 import math
 import sys
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
@@ -15,7 +17,11 @@ from double_pendulum_model.physics.double_pendulum import (  # noqa: E402
     ExpressionFunction,
     LowerSegmentProperties,
     SegmentProperties,
+    compile_forcing_functions,
+    states_to_array,
+    zero_input,
 )
+from double_pendulum_model.safe_eval import SafeEvaluator  # noqa: E402
 
 
 def test_expression_function_allows_state_variables() -> None:
@@ -49,6 +55,35 @@ def test_control_affine_matches_explicit_dynamics() -> None:
     )
 
 
+def test_unforced_undamped_dynamics_conserve_energy() -> None:
+    """Test that the undamped, unforced vector field leaves T + V constant."""
+    parameters = DoublePendulumParameters.default()
+    parameters.damping_shoulder = 0.0
+    parameters.damping_wrist = 0.0
+    dynamics = DoublePendulumDynamics(parameters)
+    coupling = dynamics.coefficients.coupling
+    rng = np.random.default_rng(5)
+    for theta1, theta2, omega1, omega2 in rng.uniform(-3.0, 3.0, size=(20, 4)):
+        state = DoublePendulumState(theta1, theta2, omega1, omega2)
+        _, _, acc1, acc2 = dynamics.derivatives(0.0, state)
+        (m11, m12), (_, m22) = dynamics.mass_matrix(theta2)
+        g1, g2 = dynamics.gravity_vector(theta1, theta2)
+        # dE/dt = omega·M·acc + ½ omega·(dM/dt)·omega + omega·dV/dtheta
+        mass_power = omega1 * (m11 * acc1 + m12 * acc2) + omega2 * (
+            m12 * acc1 + m22 * acc2
+        )
+        mass_rate_power = (
+            -coupling * math.sin(theta2) * omega2 * (omega1**2 + omega1 * omega2)
+        )
+        gravity_power = g1 * omega1 + g2 * omega2
+        scale = abs(mass_power) + abs(mass_rate_power) + abs(gravity_power)
+        power = mass_power + mass_rate_power + gravity_power
+        assert abs(power) <= 1e-12 * scale
+        c1, c2 = dynamics.coriolis_vector(theta2, omega1, omega2)
+        assert math.isclose(m11 * acc1 + m12 * acc2 + c1 + g1, 0.0, abs_tol=1e-9)
+        assert math.isclose(m12 * acc1 + m22 * acc2 + c2 + g2, 0.0, abs_tol=1e-9)
+
+
 def test_joint_torque_breakdown_reports_components() -> None:
     """Test that joint torque breakdown reports valid components."""
     parameters = DoublePendulumParameters.default()
@@ -91,3 +126,322 @@ def test_singular_mass_matrix_is_detected() -> None:
     state = DoublePendulumState(theta1=0.0, theta2=0.0, omega1=0.0, omega2=0.0)
     with pytest.raises(ZeroDivisionError):
         dynamics.control_affine(state)
+
+
+def test_step_batch_matches_scalar_step() -> None:
+    """Test that the batched RK4 step reproduces the scalar step row by row."""
+    dynamics = DoublePendulumDynamics(
+        forcing_functions=(
+            ExpressionFunction("2.0*sin(t) - 0.5*omega1"),
+            ExpressionFunction("-0.3*theta2"),
+        )
+    )
+    rng = np.random.default_rng(0)
+    states = [
+        DoublePendulumState(*values) for values in rng.uniform(-2.0, 2.0, (16, 4))
+    ]
+    batch = states_to_array(states)
+    t, dt = 0.3, 0.01
+    for _ in range(20):
+        states = [dynamics.step(t, state, dt) for state in states]
+        batch = dynamics.step_batch(t, batch, dt)
+        t += dt
+    np.testing.assert_allclose(batch, states_to_array(states), rtol=0.0, atol=1e-12)
+
+
+def test_applied_torques_batch_vectorizes_over_logged_rows() -> None:
+    """Test that per-row times and states give the scalar torques."""
+    dynamics = DoublePendulumDynamics(
+        forcing_functions=(
+            ExpressionFunction("2.0*sin(3*t) - 0.5*omega1 + sqrt(fabs(theta1))"),
+            lambda t, state: t * state.omega2,
+        )
+    )
+    rng = np.random.default_rng(1)
+    states = rng.uniform(-2.0, 2.0, (50, 4))
+    times = np.linspace(0.0, 5.0, 50)
+    torques = dynamics.applied_torques_batch(times, states)
+    expected = [
+        dynamics.applied_torques(t, DoublePendulumState(*row))
+        for t, row in zip(times, states, strict=True)
+    ]
+    np.testing.assert_allclose(torques, expected, rtol=1e-14, atol=1e-14)
+
+
+def test_compiled_coefficients_match_segment_properties() -> None:
+    """Test that cached coefficients reproduce the textbook mass matrix."""
+    parameters = DoublePendulumParameters.default()
+    dynamics = DoublePendulumDynamics(parameters)
+    upper, lower = parameters.upper_segment, parameters.lower_segment
+    m2, l1 = lower.total_mass, upper.length_m
+    lc1, lc2 = upper.center_of_mass_distance, lower.center_of_mass_distance
+    i1, i2 = upper.inertia_about_proximal_joint, lower.inertia_about_proximal_joint
+    theta2 = 0.7
+    expected_m11 = (
+        i1
+        + i2
+        + upper.mass_kg * lc1**2
+        + m2 * (l1**2 + lc2**2 + 2 * l1 * lc2 * math.cos(theta2))
+    )
+    (m11, m12), (_, m22) = dynamics.mass_matrix(theta2)
+    assert math.isclose(m11, expected_m11, rel_tol=1e-12)
+    assert math.isclose(m12, i2 + m2 * (lc2**2 + l1 * lc2 * math.cos(theta2)))
+    assert math.isclose(m22, i2 + m2 * lc2**2)
+
+
+def test_compiled_coefficients_track_in_place_parameter_changes() -> None:
+    """Test that in-place parameter edits invalidate the compiled coefficients."""
+    parameters = DoublePendulumParameters.default()
+    dynamics = DoublePendulumDynamics(parameters)
+    compiled = dynamics.coefficients
+    assert dynamics.coefficients is compiled
+
+    parameters.gravity_enabled = False
+    assert dynamics.coefficients is not compiled
+    assert dynamics.gravity_vector(0.4, 0.2) == (0.0, 0.0)
+
+    compiled = dynamics.coefficients
+    parameters.lower_segment.clubhead_mass_kg = 0.3
+    assert dynamics.coefficients is not compiled
+    assert dynamics.coefficients.coupling > compiled.coupling
+
+
+def test_reassigning_unchanged_parameters_keeps_coefficients() -> None:
+    """Test that assigning equal values (as the GUIs do per tick) keeps caches."""
+    parameters = DoublePendulumParameters.default()
+    dynamics = DoublePendulumDynamics(parameters)
+    compiled = dynamics.coefficients
+    parameters.gravity_enabled = parameters.gravity_enabled
+    parameters.constrained_to_plane = True
+    parameters.damping_wrist = float(parameters.damping_wrist)
+    assert dynamics.coefficients is compiled
+
+    replacement = dataclasses.replace(parameters.upper_segment)
+    parameters.upper_segment = replacement
+    assert parameters.upper_segment is replacement
+    compiled = dynamics.coefficients
+    replacement.mass_kg += 1.0
+    assert dynamics.coefficients is not compiled
+
+
+def test_simulate_matches_repeated_steps() -> None:
+    """Test that simulate() fills its buffer with the same states as step()."""
+    dynamics = DoublePendulumDynamics(
+        forcing_functions=(
+            ExpressionFunction("1.5*cos(2*t)"),
+            ExpressionFunction("-0.4*omega2"),
+        )
+    )
+    state = DoublePendulumState(
+        theta1=0.4, theta2=-0.9, omega1=0.1, omega2=0.0, phi=0.2, omega_phi=0.0
+    )
+    buffer = np.zeros((50, 6))
+    trajectory = dynamics.simulate(state, 0.0, 0.01, 50, out=buffer)
+    assert trajectory is buffer
+
+    t = 0.0
+    for row in trajectory:
+        state = dynamics.step(t, state, 0.01)
+        t += 0.01
+        assert tuple(row) == (
+            state.theta1,
+            state.theta2,
+            state.omega1,
+            state.omega2,
+            state.phi,
+            state.omega_phi,
+        )
+
+
+def test_step_into_supports_in_place_updates() -> None:
+    """Test that step_into can overwrite its input state."""
+    dynamics = DoublePendulumDynamics()
+    state = DoublePendulumState(theta1=0.5, theta2=0.1, omega1=0.0, omega2=0.0)
+    expected = dynamics.step(0.0, state, 0.01)
+    result = dynamics.step_into(0.0, state, 0.01, state)
+    assert result is state
+    assert state == expected
+
+
+def test_midpoint_energy_error_stays_bounded_where_rk4_drifts() -> None:
+    """Test that the symplectic integrator does not drift in energy."""
+    parameters = DoublePendulumParameters.default()
+    parameters.damping_shoulder = 0.0
+    parameters.damping_wrist = 0.0
+    dynamics = DoublePendulumDynamics(parameters)
+    state = DoublePendulumState(theta1=0.8, theta2=0.3, omega1=0.0, omega2=0.0)
+    initial_energy = dynamics.total_energy(state)
+
+    def energy_errors(method: str) -> np.ndarray:
+        trajectory = dynamics.simulate(state, 0.0, 0.1, 3000, method=method)
+        return np.array(
+            [
+                dynamics.total_energy(DoublePendulumState(*row)) - initial_energy
+                for row in trajectory
+            ]
+        )
+
+    midpoint = np.abs(energy_errors("midpoint"))
+    rk4 = np.abs(energy_errors("rk4"))
+    assert midpoint[-300:].max() < 1.5 * midpoint[:300].max()
+    assert rk4[-300:].max() > 5 * rk4[:300].max()
+    assert midpoint[-300:].max() < rk4[-300:].max()
+
+
+def test_wrist_coriolis_term_conserves_energy() -> None:
+    """Test that the undamped, unforced model conserves energy under fine RK4."""
+    parameters = DoublePendulumParameters.default()
+    parameters.damping_shoulder = 0.0
+    parameters.damping_wrist = 0.0
+    dynamics = DoublePendulumDynamics(parameters)
+    state = DoublePendulumState(theta1=1.0, theta2=0.5, omega1=0.0, omega2=0.0)
+    trajectory = dynamics.simulate(state, 0.0, 1e-3, 2000)
+    final = DoublePendulumState(*trajectory[-1])
+    assert math.isclose(
+        dynamics.total_energy(final), dynamics.total_energy(state), abs_tol=1e-8
+    )
+
+
+def test_sdirk_is_stable_for_stiff_velocity_feedback() -> None:
+    """Test that the implicit integrator handles stiff wrist feedback at dt=0.01."""
+    dynamics = DoublePendulumDynamics(
+        forcing_functions=(zero_input, ExpressionFunction("-200*omega2"))
+    )
+    state = DoublePendulumState(theta1=0.5, theta2=0.5, omega1=0.0, omega2=1.0)
+    with pytest.raises(OverflowError):
+        dynamics.simulate(state, 0.0, 0.01, 200)
+
+    implicit = dynamics.simulate(state, 0.0, 0.01, 200, method="sdirk2")
+    reference = dynamics.simulate(state, 0.0, 1e-4, 20_000)
+    np.testing.assert_allclose(implicit[-1], reference[-1], atol=1e-3)
+
+
+def _finite_difference_jacobians(
+    dynamics: DoublePendulumDynamics,
+    state: DoublePendulumState,
+    control: tuple[float, float],
+) -> tuple[np.ndarray, np.ndarray]:
+    def f(x: np.ndarray, u: np.ndarray) -> np.ndarray:
+        dynamics.forcing_functions = (lambda t, s: u[0], lambda t, s: u[1])
+        return np.array(dynamics.derivatives(0.0, DoublePendulumState(*x)))
+
+    x0 = np.array((state.theta1, state.theta2, state.omega1, state.omega2))
+    u0 = np.array(control)
+    eps = 1e-6
+    state_fd = np.column_stack(
+        [(f(x0 + e, u0) - f(x0 - e, u0)) / (2 * eps) for e in np.eye(4) * eps]
+    )
+    input_fd = np.column_stack(
+        [(f(x0, u0 + e) - f(x0, u0 - e)) / (2 * eps) for e in np.eye(2) * eps]
+    )
+    return state_fd, input_fd
+
+
+def test_analytic_jacobians_match_finite_differences() -> None:
+    """Test the closed-form state and input Jacobians, scalar and batched."""
+    dynamics = DoublePendulumDynamics()
+    rng = np.random.default_rng(3)
+    states = rng.uniform(-2.0, 2.0, (8, 4))
+    controls = rng.uniform(-5.0, 5.0, (8, 2))
+    state_batch = dynamics.state_jacobian_batch(states, controls)
+    input_batch = dynamics.input_jacobian_batch(states)
+    for row, control, state_jac, input_jac in zip(
+        states, controls, state_batch, input_batch, strict=True
+    ):
+        state = DoublePendulumState(*row)
+        state_fd, input_fd = _finite_difference_jacobians(
+            dynamics, state, tuple(control)
+        )
+        scalar_state = dynamics.state_jacobian(state, tuple(control))
+        np.testing.assert_allclose(scalar_state, state_fd, atol=1e-6)
+        np.testing.assert_allclose(dynamics.input_jacobian(state), input_fd, atol=1e-6)
+        np.testing.assert_allclose(state_jac, scalar_state, rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(input_jac, dynamics.input_jacobian(state))
+
+
+def test_closed_loop_jacobian_uses_exact_forcing_derivatives() -> None:
+    """Test the symbolic feedback Jacobian against differencing the full field."""
+    shoulder = ExpressionFunction("-12*theta1 - 3*omega1 + sin(theta2)*omega2**2")
+    wrist = ExpressionFunction("-8*theta2 - 2*omega2 + exp(-t)*atan2(theta1, 1.5)")
+    dynamics = DoublePendulumDynamics(forcing_functions=(shoulder, wrist))
+    state = DoublePendulumState(theta1=0.4, theta2=-0.7, omega1=1.1, omega2=-0.3)
+    t = 0.25
+    assert shoulder.state_gradient(t, state) == pytest.approx(
+        (-12.0, math.cos(-0.7) * 0.09, -3.0, 2 * math.sin(-0.7) * -0.3), rel=1e-14
+    )
+
+    x0 = np.array((state.theta1, state.theta2, state.omega1, state.omega2))
+    eps = 1e-6
+    columns = []
+    for e in np.eye(4) * eps:
+        upper = dynamics.derivatives(t, DoublePendulumState(*(x0 + e)))
+        lower = dynamics.derivatives(t, DoublePendulumState(*(x0 - e)))
+        columns.append((np.array(upper) - np.array(lower)) / (2 * eps))
+    np.testing.assert_allclose(
+        dynamics.closed_loop_jacobian(t, state), np.array(columns).T, atol=1e-6
+    )
+
+
+def test_forcing_jacobian_falls_back_for_non_differentiable_expressions() -> None:
+    """Test that fabs() feedback still gets a finite-difference Jacobian."""
+    forcing = ExpressionFunction("-5*fabs(omega1)")
+    with pytest.raises(ValueError, match="cannot be expressed safely"):
+        forcing.state_gradient(0.0, DoublePendulumState(0.0, 0.0, 1.0, 0.0))
+    dynamics = DoublePendulumDynamics(forcing_functions=(forcing, zero_input))
+    jacobian = dynamics.forcing_jacobian(0.0, DoublePendulumState(0.0, 0.0, 1.0, 0.0))
+    np.testing.assert_allclose(jacobian, [[0.0, 0.0, -5.0, 0.0], [0.0] * 4], atol=1e-8)
+
+
+def test_fused_kernel_matches_reference_rk4_bit_for_bit() -> None:
+    """Test that the generated kernel reproduces step_into exactly."""
+    forcing = (
+        ExpressionFunction("3*sin(2*t)*sin(theta1) - 0.5*omega1"),
+        ExpressionFunction("-2*sin(theta1 + theta2) - 0.1*cos(theta2)*omega2**2"),
+    )
+    dynamics = DoublePendulumDynamics(forcing_functions=forcing)
+    state0 = DoublePendulumState(theta1=0.7, theta2=-0.4, omega1=0.1, omega2=0.3)
+    reference = dynamics.simulate(state0, 0.0, 0.01, 300)
+    fused = dynamics.simulate(state0, 0.0, 0.01, 300, method="rk4_fused")
+    np.testing.assert_array_equal(fused, reference)
+
+    kernel = dynamics.fused_kernel()
+    assert kernel is not None
+    other = DoublePendulumDynamics(
+        forcing_functions=(ExpressionFunction(forcing[0].expression), forcing[1])
+    )
+    assert other.fused_kernel() is kernel
+    dynamics.parameters.damping_wrist = 0.5
+    assert dynamics.fused_kernel() is not kernel
+
+
+def test_fused_step_falls_back_for_opaque_forcing() -> None:
+    """Test that arbitrary callables are stepped by the reference integrator."""
+    dynamics = DoublePendulumDynamics(
+        forcing_functions=(lambda t, _state: math.cos(t), zero_input)
+    )
+    state0 = DoublePendulumState(theta1=0.2, theta2=0.1, omega1=0.0, omega2=0.0)
+    assert dynamics.fused_kernel() is None
+    np.testing.assert_array_equal(
+        dynamics.simulate(state0, 0.0, 0.01, 50, method="rk4_fused"),
+        dynamics.simulate(state0, 0.0, 0.01, 50),
+    )
+
+
+def test_recompiling_forcing_expressions_skips_validation(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a warm expression cache rebuilds forcing without validating."""
+    expressions = ("40*sin(2.5*t) - 0.3*omega1", "12*exp(-t)")
+    first = compile_forcing_functions(*expressions)
+    validate = SafeEvaluator.validate
+    calls: list[str] = []
+
+    def counting_validate(self: SafeEvaluator, expression: str) -> object:
+        calls.append(expression)
+        return validate(self, expression)
+
+    monkeypatch.setattr(SafeEvaluator, "validate", counting_validate)
+    second = compile_forcing_functions(*expressions)
+    assert calls == []
+    assert [f.time_only for f in second] == [f.time_only for f in first]
+    assert [f.time_only for f in second] == [False, True]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import ast
+
+import numpy as np
+import pytest
+
+from double_pendulum_model.expression_optimizer import optimize_expression
+from double_pendulum_model.safe_eval import SafeEvaluator
+
+EXPRESSIONS = (
+    "2*pi*0.5*sin(2*pi*t) + 3*sin(2*pi*t)**2",
+    "sin(t)*cos(t) + sin(t)*cos(t)/x",
+    "exp(-t)*(sqrt(2)*x + sqrt(2)*x**2) - (-2.0)**2*t",
+    "x % 0.7 + (x % 0.7)**2 + atan2(x, t)",
+)
+
+
+def _optimized_source(expression: str) -> str:
+    evaluator = SafeEvaluator(allowed_variables={"t", "x"})
+    return ast.unparse(
+        optimize_expression(evaluator.validate(expression), evaluator.allowed_names)
+    )
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_optimized_expressions_evaluate_identically(expression: str) -> None:
+    """Test that folding and CSE leave results bit-for-bit unchanged."""
+    optimized = SafeEvaluator(allowed_variables={"t", "x"})
+    reference = SafeEvaluator(allowed_variables={"t", "x"}, optimize=False)
+    code = optimized.compile(expression)
+    function = optimized.compile_function(expression, ("t", "x"))
+    expected_function = reference.compile_function(expression, ("t", "x"))
+    rng = np.random.default_rng(2)
+    times, xs = rng.uniform(0.0, 5.0, 200), rng.uniform(0.1, 3.0, 200)
+    for t, x in zip(times.tolist(), xs.tolist(), strict=True):
+        expected = expected_function(t, x)
+        assert function(t, x) == expected
+        assert optimized.evaluate_code(code, {"t": t, "x": x}) == expected
+    np.testing.assert_array_equal(
+        optimized.compile_vectorized(expression, ("t", "x"))(times, xs),
+        reference.compile_vectorized(expression, ("t", "x"))(times, xs),
+    )
+
+
+def test_optimizer_folds_constants_and_hoists_repeats() -> None:
+    """Test the shape of the optimized tree for a typical torque expression."""
+    source = _optimized_source(EXPRESSIONS[0])
+    assert "pi" not in source
+    assert source.count("sin(") == 1
+    assert ":=" in source
+
+
+def test_optimizer_leaves_failing_or_huge_constants_to_runtime() -> None:
+    """Test that folding never raises or materializes enormous integers."""
+    assert _optimized_source("1/0 + t") == "1 / 0 + t"
+    assert _optimized_source("log(-1) + t") == "log(-1) + t"
+    # Validation rejects this; the optimizer must still be safe on its own
+    huge = ast.parse("9**9**9 * 0 + t", mode="eval")
+    assert ast.unparse(optimize_expression(huge, {})) == "9 ** 387420489 * 0 + t"
+
+
+def test_fast_powers_rewrite_small_integer_powers() -> None:
+    """Test that opt-in strength reduction multiplies instead of calling pow."""
+    evaluator = SafeEvaluator(allowed_variables={"t"}, fast_powers=True)
+    function = evaluator.compile_function("sin(t)**3 + t**2", ("t",))
+    assert function(0.5) == pytest.approx(np.sin(0.5) ** 3 + 0.25, rel=1e-15)
+    tree = optimize_expression(
+        evaluator.validate("sin(t)**3 + t**2"), evaluator.allowed_names, True
+    )
+    assert not any(isinstance(node, ast.Pow) for node in ast.walk(tree))
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pytest
+
+from double_pendulum_model.expression_cost import EvaluationBudgetExceeded
+from double_pendulum_model.physics.double_pendulum import (
+    DoublePendulumDynamics,
+    DoublePendulumState,
+    ExpressionFunction,
+)
+from double_pendulum_model.physics.integrators import Event, dormand_prince
+from double_pendulum_model.physics.triple_pendulum import (
+    TriplePendulumDynamics,
+    TriplePendulumState,
+)
+
+
+def test_dormand_prince_dense_output_matches_exact_solution() -> None:
+    """Test error control and dense output on a harmonic oscillator."""
+    solution = dormand_prince(
+        lambda _t, y: np.array((y[1], -y[0])),
+        0.0,
+        np.array((1.0, 0.0)),
+        10.0,
+        rtol=1e-9,
+        atol=1e-12,
+    )
+    samples = np.linspace(0.0, 10.0, 101)
+    np.testing.assert_allclose(solution(samples)[:, 0], np.cos(samples), atol=1e-7)
+    np.testing.assert_allclose(solution.y[-1], (np.cos(10.0), -np.sin(10.0)), atol=1e-8)
+    assert solution.t[-1] == 10.0
+
+
+def test_adaptive_double_pendulum_needs_fewer_evaluations_than_rk4() -> None:
+    """Test that the adaptive path beats fixed-step RK4 at equal accuracy."""
+    dynamics = DoublePendulumDynamics(
+        forcing_functions=(
+            ExpressionFunction("20*sin(4*t)"),
+            ExpressionFunction("5*cos(3*t)"),
+        )
+    )
+    state0 = DoublePendulumState(theta1=-1.0, theta2=-1.5, omega1=0.0, omega2=0.0)
+    reference = dynamics.simulate(state0, 0.0, 1e-4, 10_000)[-1, :4]
+
+    solution = dynamics.integrate_adaptive(state0, 0.0, 1.0, rtol=1e-8, atol=1e-10)
+    adaptive_error = np.max(np.abs(solution.y[-1] - reference))
+    rk4 = dynamics.simulate(state0, 0.0, 0.01, 100)[-1, :4]
+    rk4_error = np.max(np.abs(rk4 - reference))
+
+    assert adaptive_error < rk4_error
+    assert solution.nfev < 4 * 100
+    midpoint = solution(0.5)
+    np.testing.assert_allclose(
+        midpoint, dynamics.simulate(state0, 0.0, 1e-4, 5_000)[-1, :4], atol=1e-6
+    )
+
+
+def test_adaptive_triple_pendulum_matches_rk4() -> None:
+    """Test that the triple pendulum adaptive path agrees with small-step RK4."""
+    dynamics = TriplePendulumDynamics()
+    state = TriplePendulumState(0.3, -0.2, 0.4, 0.0, 0.0, 0.0)
+    control = (1.0, 0.5, 0.0)
+    solution = dynamics.integrate_adaptive(state, 0.0, 0.5, control, rtol=1e-8)
+    t = 0.0
+    for _ in range(500):
+        state = dynamics.step(t, state, 0.001, control)
+        t += 0.001
+    expected = (
+        state.theta1,
+        state.theta2,
+        state.theta3,
+        state.omega1,
+        state.omega2,
+        state.omega3,
+    )
+    np.testing.assert_allclose(solution.y[-1], expected, atol=1e-6)
+
+
+def test_terminal_event_stops_fixed_step_run_between_steps() -> None:
+    """Test that a wrist-angle zero crossing is located inside an RK4 step."""
+    dynamics = DoublePendulumDynamics()
+    state0 = DoublePendulumState(theta1=0.0, theta2=0.6, omega1=0.0, omega2=0.0)
+    wrist_zero = Event(lambda _t, state: state.theta2, direction=-1, terminal=True)
+    result = dynamics.simulate_events(state0, 0.0, 0.01, 1000, [wrist_zero])
+
+    assert len(result.events) == 1
+    event = result.events[0]
+    assert result.times[-1] == event.t
+    assert len(result.trajectory) < 1000
+    assert abs(event.y[1]) < 1e-6
+    assert event.t % 0.01 > 1e-6
+
+    reference = dynamics.integrate_adaptive(
+        state0, 0.0, 2.0, rtol=1e-10, atol=1e-12, events=[wrist_zero]
+    )
+    assert abs(reference.events[0].t - event.t) < 1e-6
+    assert reference.t[-1] == reference.events[0].t
+
+
+def test_non_terminal_events_record_every_crossing() -> None:
+    """Test that non-terminal events are all recorded on the dense output."""
+    solution = dormand_prince(
+        lambda _t, y: np.array((y[1], -y[0])),
+        0.0,
+        np.array((1.0, 0.0)),
+        10.0,
+        rtol=1e-10,
+        atol=1e-12,
+        events=[Event(lambda _t, y: y[0])],
+    )
+    expected = (np.arange(3) + 0.5) * np.pi
+    np.testing.assert_allclose([e.t for e in solution.events], expected, atol=1e-8)
+    assert solution.t[-1] == 10.0
+
+
+def test_iter_blocks_streams_the_same_trajectory_as_simulate() -> None:
+    """Test that block streaming reproduces simulate() exactly."""
+    dynamics = DoublePendulumDynamics(
+        forcing_functions=(ExpressionFunction("3*sin(t)"), ExpressionFunction("0.0"))
+    )
+    state0 = DoublePendulumState(theta1=0.2, theta2=0.4, omega1=0.0, omega2=0.0)
+    blocks = list(dynamics.iter_blocks(state0, 0.0, 0.01, block_size=64, n_steps=150))
+    assert [len(times) for times, _ in blocks] == [64, 64, 22]
+
+    times = np.concatenate([block_times for block_times, _ in blocks])
+    states = np.concatenate([block_states for _, block_states in blocks])
+    np.testing.assert_array_equal(states, dynamics.simulate(state0, 0.0, 0.01, 150))
+    np.testing.assert_allclose(times, 0.01 * np.arange(1, 151))
+
+
+def test_triple_iter_blocks_is_unbounded_until_consumer_stops() -> None:
+    """Test that an open-ended triple pendulum stream yields on demand."""
+    dynamics = TriplePendulumDynamics()
+    stream = dynamics.iter_blocks(
+        TriplePendulumState(0.1, 0.2, 0.3, 0.0, 0.0, 0.0), 0.0, 0.01, (0, 0, 0), 8
+    )
+    first_times, first_states = next(stream)
+    second_times, _ = next(stream)
+    assert first_states.shape == (8, 6)
+    assert second_times[0] > first_times[-1]
+
+
+def test_rk4_runs_sample_time_only_forcing_ahead_of_time(monkeypatch) -> None:
+    """Test that time-only forcing is never evaluated per RK4 stage."""
+    shoulder = ExpressionFunction("50*sin(3*t)")
+    wrist = ExpressionFunction("exp(-t)*20")
+    assert shoulder.time_only and wrist.time_only
+    assert not ExpressionFunction("-2*theta2 + t").time_only
+    dynamics = DoublePendulumDynamics(forcing_functions=(shoulder, wrist))
+    state0 = DoublePendulumState(theta1=0.3, theta2=0.1, omega1=0.0, omega2=0.0)
+
+    expected = []
+    state, t = state0, 0.0
+    for _ in range(300):
+        state = dynamics.step(t, state, 0.01)
+        t += 0.01
+        expected.append((state.theta1, state.theta2, state.omega1, state.omega2))
+
+    def fail(*_args: object) -> float:
+        raise AssertionError("time-only forcing evaluated per stage")
+
+    monkeypatch.setattr(ExpressionFunction, "__call__", fail)
+    trajectory = dynamics.simulate(state0, 0.0, 0.01, 300)
+    np.testing.assert_allclose(trajectory[:, :4], expected, rtol=0.0, atol=1e-12)
+    blocks = dynamics.iter_blocks(state0, 0.0, 0.01, block_size=7, n_steps=300)
+    np.testing.assert_array_equal(np.vstack([rows for _, rows in blocks]), trajectory)
+    assert dynamics.forcing_functions == (shoulder, wrist)
+
+
+def test_sampled_rk4_leaves_forcing_functions_untouched() -> None:
+    """Test that callbacks see the original forcing during a sampled RK4 run."""
+    shoulder = ExpressionFunction("50*sin(3*t)")
+    observed = []
+
+    def wrist(t: float, state: DoublePendulumState) -> float:
+        observed.append(dynamics.forcing_functions == (shoulder, wrist))
+        return -2.0 * state.theta2
+
+    dynamics = DoublePendulumDynamics(forcing_functions=(shoulder, wrist))
+    state0 = DoublePendulumState(theta1=0.3, theta2=0.1, omega1=0.0, omega2=0.0)
+    trajectory = dynamics.simulate(state0, 0.0, 0.01, 50)
+    assert observed and all(observed)
+
+    state, t = state0, 0.0
+    for row in trajectory:
+        state = dynamics.step(t, state, 0.01)
+        t += 0.01
+        np.testing.assert_allclose(
+            row[:4],
+            (state.theta1, state.theta2, state.omega1, state.omega2),
+            rtol=0.0,
+            atol=1e-12,
+        )
+
+
+def test_simulate_stops_when_its_time_budget_is_spent() -> None:
+    """Test that a slow forcing function cannot stall a budgeted run."""
+
+    def slow(_t: float, _state: DoublePendulumState) -> float:
+        time.sleep(0.002)
+        return 0.0
+
+    dynamics = DoublePendulumDynamics(forcing_functions=(slow, slow))
+    state0 = DoublePendulumState(theta1=0.3, theta2=0.1, omega1=0.0, omega2=0.0)
+    start = time.perf_counter()
+    with pytest.raises(EvaluationBudgetExceeded):
+        dynamics.simulate(state0, 0.0, 0.01, 100_000, time_budget=0.05)
+    assert time.perf_counter() - start < 1.0
+    with pytest.raises(EvaluationBudgetExceeded):
+        dynamics.applied_torques_batch(0.0, np.zeros((100_000, 4)), time_budget=0.05)
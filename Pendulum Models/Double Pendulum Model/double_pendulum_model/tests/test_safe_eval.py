@@ -1,8 +1,18 @@
+import dis
 import math
 
+import numpy as np
 import pytest
 
-from double_pendulum_model.safe_eval import SafeEvaluator
+from double_pendulum_model.expression_cost import (
+    EvaluationBudget,
+    EvaluationBudgetExceeded,
+)
+from double_pendulum_model.safe_eval import (
+    SafeEvaluator,
+    clear_expression_cache,
+    expression_cache_info,
+)
 
 
 def test_safe_eval_basic_math() -> None:
@@ -69,3 +79,146 @@ def test_safe_eval_power_operator() -> None:
         ValueError, match="Use '\\*\\*' for exponentiation instead of '\\^'"
     ):
         evaluator.evaluate("2^3")
+
+
+def test_compile_function_matches_evaluate() -> None:
+    """Test that positional compilation agrees with context evaluation."""
+    evaluator = SafeEvaluator(allowed_variables={"x", "y"})
+    expression = "sin(x) * y**2 - atan2(y, x) + pi"
+    function = evaluator.compile_function(expression, ("x", "y"))
+    for x, y in ((0.3, -1.2), (2.0, 0.5), (-4.0, 3.0)):
+        assert function(x, y) == evaluator.evaluate(expression, {"x": x, "y": y})
+    assert evaluator.compile_function("0", ("x", "y"))(1.0, 2.0) == 0.0
+    assert function.__globals__["__builtins__"] == {}
+
+
+def test_compile_function_rejects_invalid_parameters() -> None:
+    """Test that parameters must be allowed variables covering the expression."""
+    evaluator = SafeEvaluator(allowed_variables={"x", "y"})
+    with pytest.raises(ValueError, match="not an allowed variable"):
+        evaluator.compile_function("x", ("x", "__import__"))
+    with pytest.raises(ValueError, match="'y' is not a parameter"):
+        evaluator.compile_function("x + y", ("x",))
+    with pytest.raises(ValueError, match="Disallowed syntax"):
+        evaluator.compile_function("[x for x in y]", ("x", "y"))
+
+
+def test_compile_vectorized_evaluates_arrays() -> None:
+    """Test that vectorized compilation maps math functions to ufuncs."""
+    evaluator = SafeEvaluator(allowed_variables={"x", "y"})
+    expression = "exp(-x) * cos(y) + asin(x / 4) - log10(1 + y**2) % 0.7"
+    function = evaluator.compile_vectorized(expression, ("x", "y"))
+    xs = np.linspace(-3.0, 3.0, 7)
+    ys = np.linspace(0.0, 2.0, 7)
+    expected = [
+        evaluator.evaluate(expression, {"x": x, "y": y})
+        for x, y in zip(xs, ys, strict=True)
+    ]
+    np.testing.assert_allclose(function(xs, ys), expected, rtol=1e-14)
+    constant = evaluator.compile_vectorized("2*pi", ("x", "y"))(xs, 1.0)
+    assert constant.shape == xs.shape
+    assert np.all(constant == 2 * math.pi)
+
+
+def test_compiled_expressions_are_cached_across_evaluators() -> None:
+    """Test that recompiling the same text hits the process-wide LRU cache."""
+    clear_expression_cache()
+    first = SafeEvaluator(allowed_variables={"t"}).compile_function("3*t", ("t",))
+    second = SafeEvaluator(allowed_variables={"t"}).compile_function("3*t", ("t",))
+    assert first is second
+    SafeEvaluator(allowed_variables={"t"}).evaluate("2 + 2")
+    SafeEvaluator(allowed_variables={"t"}).evaluate("2 + 2")
+    SafeEvaluator(allowed_variables={"t", "x"}).evaluate("2 + 2")
+    SafeEvaluator(allowed_variables={"t"}).compile_vectorized("3*t", ("t",))
+    info = expression_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 4, 4)
+
+
+def test_compile_partials_differentiates_symbolically() -> None:
+    """Test exact partial derivatives, including inexact decimal literals."""
+    evaluator = SafeEvaluator(allowed_variables={"x", "y"})
+    d_dx, d_dy = evaluator.compile_partials("0.1*x**3*y + log10(y)", ("x", "y"))
+    assert math.isclose(d_dx(2.0, 5.0), 6.0, rel_tol=1e-15)
+    assert math.isclose(d_dy(2.0, 5.0), 0.8 + 1 / (5.0 * math.log(10)), rel_tol=1e-15)
+    with pytest.raises(ValueError, match="not permitted"):
+        evaluator.differentiate("x % 0.7", ("x",))
+
+
+def test_piecewise_builtins_agree_between_scalar_and_vectorized_forms() -> None:
+    """Test ramp/pulse/smoothstep/clip/interp values in both backends."""
+    evaluator = SafeEvaluator(allowed_variables={"t"})
+    expression = (
+        "40*smoothstep(t, 0.1, 0.3) - 40*ramp(t, 0.5, 0.6) + 5*pulse(t, 0.2, 0.4)"
+        " + clip(20*t - 15, -2, 2) + interp(t, [0, 0.25, 1], [-1, 3, 0.5])"
+    )
+    scalar = evaluator.compile_function(expression, ("t",))
+    vectorized = evaluator.compile_vectorized(expression, ("t",))
+    ts = np.linspace(-0.5, 1.5, 801)
+    np.testing.assert_array_equal(vectorized(ts), [scalar(t) for t in ts.tolist()])
+    assert scalar(0.2) == pytest.approx(20.0 + 5.0 - 2.0 + 2.2)
+    assert scalar(2.0) == pytest.approx(40.0 - 40.0 + 2.0 + 0.5)
+    assert evaluator.evaluate("ramp(t, 1, 1)", {"t": 1.5}) == 1.0
+    assert math.isnan(scalar(math.nan))
+    assert np.isnan(vectorized(math.nan))
+
+    instructions = {op.opname for op in dis.get_instructions(scalar.__code__)}
+    assert not instructions & {"BUILD_LIST", "BUILD_TUPLE", "LIST_EXTEND"}
+
+
+def test_interp_requires_literal_increasing_tables() -> None:
+    """Test that lists are only accepted as well-formed interp tables."""
+    evaluator = SafeEvaluator(allowed_variables={"t"})
+    for expression, message in (
+        ("sin([1, 2])", "Disallowed syntax"),
+        ("interp(t, [0, t], [1, 2])", "finite number literals"),
+        ("interp(t, [0, 1], [1])", "one value per knot"),
+        ("interp(t, [1, 0], [1, 2])", "strictly increasing"),
+        ("interp(t, t, [1, 2])", "must be a list"),
+    ):
+        with pytest.raises(ValueError, match=message):
+            evaluator.validate(expression)
+
+
+def test_cost_guard_rejects_runaway_expressions_at_validation() -> None:
+    """Test that huge integer powers, deep nesting and strings fail fast."""
+    evaluator = SafeEvaluator(allowed_variables={"t"})
+    for expression, message in (
+        ("9**9**9", "integer of more than"),
+        ("clip(9, 0, 9)**clip(9, 0, 9)**9", "integer of more than"),
+        ("'a' * 10**9", "numeric literals"),
+        ("-" * 200 + "1", "nested too deeply"),
+        ("-" * 20000 + "1", "too long"),
+    ):
+        with pytest.raises(ValueError, match=message):
+            evaluator.compile(expression)
+    assert evaluator.evaluate("10**300 % 7") == float(10**300 % 7)
+    with pytest.raises(OverflowError):
+        evaluator.evaluate("2.0**9**9")
+    assert evaluator.evaluate("t**9**2", {"t": 1.0}) == 1.0
+
+
+def test_evaluation_budget_stops_a_batch() -> None:
+    """Test that a spent wall-clock budget raises instead of evaluating."""
+    evaluator = SafeEvaluator(allowed_variables={"t"})
+    budget = EvaluationBudget(0.05)
+    assert evaluator.evaluate("2*t", {"t": 1.0}, budget=budget) == 2.0
+    budget.deadline -= 1.0
+    with pytest.raises(EvaluationBudgetExceeded, match="budget of 0.05 s"):
+        evaluator.evaluate("2*t", {"t": 1.0}, budget=budget)
+
+
+def test_long_flat_series_pass_the_cost_guard() -> None:
+    """Test that a 119-term Fourier series compiles and evaluates exactly."""
+    series = " + ".join(f"0.1*sin({k}*t)" for k in range(1, 120))
+    evaluator = SafeEvaluator(allowed_variables={"t"})
+    expected = sum(0.1 * math.sin(k * 0.7) for k in range(1, 120))
+    assert evaluator.evaluate(series, {"t": 0.7}) == pytest.approx(expected)
+    times = np.linspace(0.0, 1.0, 5)
+    np.testing.assert_allclose(
+        evaluator.compile_vectorized(series, ("t",))(times),
+        [sum(0.1 * math.sin(k * t) for k in range(1, 120)) for t in times],
+    )
+    nested = "sin(" * 140 + "t" + ")" * 140
+    assert evaluator.compile_function(nested, ("t",))(0.5) == pytest.approx(
+        SafeEvaluator(allowed_variables={"t"}).evaluate(nested, {"t": 0.5})
+    )
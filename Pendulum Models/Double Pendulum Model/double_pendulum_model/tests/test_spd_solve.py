@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from double_pendulum_model.physics.spd_solve import solve_spd3, solve_spd3_batch
+from double_pendulum_model.physics.triple_pendulum import (
+    TriplePendulumDynamics,
+    TriplePendulumState,
+)
+
+
+def test_unrolled_solves_match_lapack_and_each_other() -> None:
+    """Test scalar and batched LDLT solves against np.linalg.solve."""
+    rng = np.random.default_rng(8)
+    factors = rng.normal(size=(200, 3, 3))
+    matrices = factors @ factors.transpose(0, 2, 1) + 0.1 * np.eye(3)
+    rhs = rng.normal(size=(200, 3))
+
+    batched = solve_spd3_batch(matrices, rhs)
+    scalar = np.array(
+        [solve_spd3(m.tolist(), b.tolist()) for m, b in zip(matrices, rhs, strict=True)]
+    )
+    np.testing.assert_array_equal(batched, scalar)
+    np.testing.assert_allclose(
+        batched, np.linalg.solve(matrices, rhs[..., np.newaxis])[..., 0], rtol=1e-9
+    )
+
+    indefinite = np.diag([1.0, -1.0, 1.0])
+    with pytest.raises(ZeroDivisionError, match="positive definite"):
+        solve_spd3(indefinite, (1.0, 2.0, 3.0))
+    with pytest.raises(ZeroDivisionError, match="positive definite"):
+        solve_spd3_batch(np.stack((np.eye(3), indefinite)), np.ones((2, 3)))
+    with pytest.raises(ZeroDivisionError):
+        solve_spd3(np.ones((3, 3)), (1.0, 2.0, 3.0))
+
+
+def test_triple_forward_dynamics_scalar_and_batch_agree_exactly() -> None:
+    """Test that forward_dynamics and forward_dynamics_batch agree bit for bit."""
+    dynamics = TriplePendulumDynamics()
+    rng = np.random.default_rng(9)
+    states = np.column_stack(
+        (rng.uniform(-np.pi, np.pi, (20, 3)), rng.normal(0.0, 3.0, (20, 3)))
+    )
+    control = (3.0, -1.5, 0.25)
+    batched = dynamics.forward_dynamics_batch(states, control)
+    for row, state in zip(batched, states.tolist(), strict=True):
+        assert tuple(row) == dynamics.forward_dynamics(
+            TriplePendulumState(*state), control
+        )
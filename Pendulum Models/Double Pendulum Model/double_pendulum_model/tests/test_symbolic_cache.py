@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+import sympy as sp
+
+from double_pendulum_model.physics import symbolic_cache, triple_pendulum
+
+CALLS: list[int] = []
+
+
+def _small_derivation() -> (
+    tuple[sp.Matrix, sp.Matrix, sp.Matrix, tuple[sp.Symbol, ...]]
+):
+    CALLS.append(1)
+    theta, omega, g = sp.symbols("theta omega g", real=True)
+    mass = sp.Matrix([[1 + sp.cos(theta) ** 2]])
+    bias = sp.Matrix([[omega**2 * sp.sin(theta) - g * sp.sin(theta)]])
+    return mass, bias, bias.subs({omega: 0}), (theta, omega, g)
+
+
+def test_cache_round_trips_and_recovers_from_corruption(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that cached derivations reload equal and corrupt files are rebuilt."""
+    monkeypatch.setattr(triple_pendulum, "_derive_triple_dynamics", _small_derivation)
+    CALLS.clear()
+    derived = symbolic_cache.load_triple_dynamics(tmp_path)
+    path = symbolic_cache.cache_path(tmp_path)
+    assert path.exists()
+    assert sp.__version__ in path.name
+    assert symbolic_cache.derivation_hash() in path.name
+
+    cached = symbolic_cache.load_triple_dynamics(tmp_path)
+    assert len(CALLS) == 1
+    assert cached == derived
+    assert cached[3][0].is_real
+
+    path.write_text('{"format": 1, "mass_matrix": "Matrix(', encoding="utf-8")
+    assert symbolic_cache.load_triple_dynamics(tmp_path) == derived
+    assert len(CALLS) == 2
+    assert symbolic_cache.load_triple_dynamics(tmp_path) == derived
+    assert len(CALLS) == 2
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+    monkeypatch.setenv(symbolic_cache.CACHE_DIR_ENV, str(tmp_path / "env"))
+    assert symbolic_cache.cache_path().parent == tmp_path / "env"
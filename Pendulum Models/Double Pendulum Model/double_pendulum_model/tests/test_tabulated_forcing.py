@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from double_pendulum_model.physics.double_pendulum import (
+    DoublePendulumDynamics,
+    DoublePendulumState,
+)
+from double_pendulum_model.physics.tabulated_forcing import TabulatedForcing
+
+STATE = DoublePendulumState(theta1=0.0, theta2=0.0, omega1=0.0, omega2=0.0)
+
+
+def _tables() -> tuple[TabulatedForcing, TabulatedForcing]:
+    rng = np.random.default_rng(3)
+    uniform = np.linspace(0.0, 2.0, 801)
+    irregular = np.cumsum(rng.uniform(0.001, 0.004, 801))
+    return (
+        TabulatedForcing(uniform, np.sin(4.0 * uniform)),
+        TabulatedForcing(irregular, np.cos(3.0 * irregular)),
+    )
+
+
+def test_scalar_and_vectorized_lookups_agree_with_linear_interpolation() -> None:
+    """Test both grid kinds against np.interp, including out-of-range holds."""
+    rng = np.random.default_rng(4)
+    for table in _tables():
+        queries = np.concatenate(
+            (
+                rng.uniform(table.times[0] - 0.5, table.times[-1] + 0.5, 500),
+                table.times,
+                np.sort(rng.uniform(table.times[0], table.times[-1], 500)),
+            )
+        )
+        sampled = table.sample(queries)
+        scalar = np.array([table(t, STATE) for t in queries.tolist()])
+        np.testing.assert_array_equal(sampled, scalar)
+        np.testing.assert_allclose(
+            sampled, np.interp(queries, table.times, table.torques), atol=1e-14
+        )
+    assert [table.uniform for table in _tables()] == [True, False]
+
+
+def test_csv_and_npy_tables_load_the_same_profile(tmp_path: Path) -> None:
+    """Test that headed CSV files and NPY arrays select the torque column."""
+    table = np.column_stack((np.linspace(0.0, 1.0, 11), np.arange(11.0), -np.ones(11)))
+    csv_path = tmp_path / "torques.csv"
+    np.savetxt(csv_path, table, delimiter=",", header="t,shoulder,wrist", comments="")
+    np.save(tmp_path / "torques.npy", table)
+
+    shoulder = TabulatedForcing.from_file(csv_path)
+    wrist = TabulatedForcing.from_file(tmp_path / "torques.npy", column=2)
+    assert shoulder(0.25, STATE) == pytest.approx(2.5)
+    assert wrist(0.25, STATE) == -1.0
+    with pytest.raises(ValueError, match="torque column 3"):
+        TabulatedForcing.from_file(csv_path, column=3)
+    with pytest.raises(ValueError, match="strictly increasing"):
+        TabulatedForcing(np.array([0.0, 1.0, 1.0]), np.zeros(3))
+
+
+def test_tabulated_forcing_drives_fixed_step_and_batch_paths() -> None:
+    """Test that sampled RK4 runs and batch torques match per-call evaluation."""
+    shoulder, wrist = _tables()
+    dynamics = DoublePendulumDynamics(forcing_functions=(shoulder, wrist))
+    state0 = DoublePendulumState(theta1=0.5, theta2=-0.2, omega1=0.0, omega2=0.1)
+    trajectory = dynamics.simulate(state0, 0.0, 0.005, 400)
+
+    state = DoublePendulumState(theta1=0.5, theta2=-0.2, omega1=0.0, omega2=0.1)
+    t = 0.0
+    for row in trajectory:
+        dynamics.step_into(t, state, 0.005, state)
+        t += 0.005
+        np.testing.assert_array_equal(
+            row[:4], (state.theta1, state.theta2, state.omega1, state.omega2)
+        )
+
+    times = np.linspace(-0.1, 2.5, 50)
+    batch = dynamics.applied_torques_batch(times, np.zeros((50, 4)))
+    np.testing.assert_array_equal(batch[:, 0], shoulder.sample(times))
+    np.testing.assert_array_equal(batch[:, 1], wrist.sample(times))
+    assert not dynamics.forcing_jacobian(0.3, state).any()
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import subprocess
+import sys
+from pathlib import Path
+
 import numpy as np
+import pytest
 
+from double_pendulum_model.physics import _triple_kernels
+from double_pendulum_model.physics.symbolic_cache import CACHE_DIR_ENV, derivation_hash
 from double_pendulum_model.physics.triple_pendulum import (
+    TripleParameterBatch,
     TriplePendulumDynamics,
+    TriplePendulumParameters,
     TriplePendulumState,
+    _symbolic_triple_functions,
 )
 
 
@@ -29,3 +39,145 @@ def test_inverse_matches_forward() -> None:
     torques = dynamics.inverse_dynamics(state, desired_acc)
     computed_acc = dynamics.forward_dynamics(state, torques)
     assert np.allclose(computed_acc, desired_acc, atol=1e-6)
+
+
+def test_generated_kernels_match_symbolic_reference(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the committed kernels are current and equal the lambdified ones."""
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path))
+    _symbolic_triple_functions.cache_clear()
+    mass_func, bias_func, gravity_func = _symbolic_triple_functions()
+    _symbolic_triple_functions.cache_clear()
+    assert _triple_kernels.DERIVATION_HASH == derivation_hash()
+    params = TriplePendulumDynamics()._parameter_vector()
+    rng = np.random.default_rng(5)
+    for theta, omega in zip(
+        rng.uniform(-np.pi, np.pi, (5, 3)), rng.normal(0.0, 2.0, (5, 3)), strict=True
+    ):
+        np.testing.assert_array_equal(
+            _triple_kernels.mass_matrix(*theta, *omega, *params),
+            mass_func(*theta, *omega, *params),
+        )
+        np.testing.assert_array_equal(
+            _triple_kernels.bias_vector(*theta, *omega, *params),
+            bias_func(*theta, *omega, *params),
+        )
+        np.testing.assert_array_equal(
+            _triple_kernels.gravity_torques(*theta, *params),
+            gravity_func(*theta, *params),
+        )
+
+
+def test_runtime_does_not_import_sympy() -> None:
+    """Test that building and stepping the triple model leaves SymPy unimported."""
+    script = (
+        "import sys\n"
+        "from double_pendulum_model.physics.triple_pendulum import (\n"
+        "    TriplePendulumDynamics, TriplePendulumState)\n"
+        "state = TriplePendulumState(0.1, 0.2, 0.3, 0.0, 0.0, 0.0)\n"
+        "TriplePendulumDynamics().step(0.0, state, 0.01, (0.0, 0.0, 0.0))\n"
+        "print('sympy' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[2],
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_codegen_imports_without_generated_kernels() -> None:
+    """Test that the generator loads when the generated module cannot import."""
+    script = (
+        "import sys\n"
+        "sys.modules['double_pendulum_model.physics._triple_kernels'] = None\n"
+        "from double_pendulum_model.physics import triple_codegen\n"
+        "print(triple_codegen.GENERATED_MODULE.name)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[2],
+    )
+    assert result.stdout.strip() == "_triple_kernels.py"
+
+
+def test_fused_kernel_matches_separate_kernels_after_parameter_changes() -> None:
+    """Test that the CSE kernel matches the per-term kernels as parameters change."""
+    dynamics = TriplePendulumDynamics()
+    rng = np.random.default_rng(6)
+    for step in range(6):
+        if step == 2:
+            dynamics.parameters.segments[1].mass_kg = 3.0
+        if step == 4:
+            dynamics.parameters.gravity_enabled = False
+        assert dynamics._packed_parameters() == tuple(
+            float(value) for value in dynamics._parameter_vector()
+        )
+        state = TriplePendulumState(
+            *rng.uniform(-np.pi, np.pi, 3), *rng.normal(0.0, 2.0, 3)
+        )
+        mass, bias = dynamics.mass_matrix_and_bias(state)
+        np.testing.assert_allclose(mass, dynamics.mass_matrix(state), rtol=1e-13)
+        np.testing.assert_allclose(
+            bias, dynamics.bias_vector(state), rtol=1e-12, atol=1e-12
+        )
+        control = (1.0, -2.0, 0.5)
+        expected = np.linalg.solve(
+            dynamics.mass_matrix(state), np.array(control) - dynamics.bias_vector(state)
+        )
+        np.testing.assert_allclose(
+            dynamics.forward_dynamics(state, control), expected, rtol=1e-10, atol=1e-10
+        )
+
+
+def test_batched_rk4_matches_scalar_steps_with_per_row_parameters() -> None:
+    """Test that step_batch and simulate_batch reproduce per-row scalar steps."""
+    rng = np.random.default_rng(7)
+    states0 = np.column_stack(
+        (rng.uniform(-1.0, 1.0, (8, 3)), rng.normal(0.0, 1.0, (8, 3)))
+    )
+    parameter_sets = [TriplePendulumParameters.default() for _ in range(8)]
+    for i, parameters in enumerate(parameter_sets):
+        parameters.segments[2].mass_kg = 0.3 + 0.05 * i
+        parameters.damping = (0.1 * i, 0.2, 0.0)
+    batch = TripleParameterBatch.from_parameters(parameter_sets)
+    control = (2.0, -1.0, 0.5)
+
+    trajectory = TriplePendulumDynamics().simulate_batch(
+        states0, 0.0, 0.002, 25, control, batch
+    )
+    assert trajectory.shape == (25, 8, 6)
+    for row, parameters in enumerate(parameter_sets):
+        dynamics = TriplePendulumDynamics(parameters)
+        state = TriplePendulumState(*states0[row])
+        for i in range(25):
+            state = dynamics.step(0.0, state, 0.002, control)
+            np.testing.assert_allclose(
+                trajectory[i, row],
+                (
+                    state.theta1,
+                    state.theta2,
+                    state.theta3,
+                    state.omega1,
+                    state.omega2,
+                    state.omega3,
+                ),
+                rtol=1e-12,
+                atol=1e-12,
+            )
+
+    shared = TriplePendulumDynamics()
+    np.testing.assert_array_equal(
+        shared.step_batch(0.0, states0, 0.002, control),
+        shared.step_batch(0.0, states0, 0.002, np.tile(control, (8, 1))),
+    )
+    with pytest.raises(ValueError, match="parameter sets"):
+        shared.forward_dynamics_batch(states0[:3], control, batch)
+    with pytest.raises(ValueError, match="shape"):
+        shared.forward_dynamics_batch(states0[:, :4], control)
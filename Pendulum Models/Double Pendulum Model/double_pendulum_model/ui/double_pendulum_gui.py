@@ -726,7 +726,7 @@ class DoublePendulumApp:
 
         # For now, phi doesn't affect dynamics (2D model), but we preserve it
         # In a full 3D model, phi would have its own dynamics
-        self.state = self.dynamics.step(self.time, self.state, TIME_STEP)
+        self.dynamics.step_fused_into(self.time, self.state, TIME_STEP, self.state)
         self.time += TIME_STEP
 
         self._draw_pendulum_3d()
@@ -80,6 +80,9 @@ class PendulumController(QtWidgets.QWidget):
         self.triple_params = TriplePendulumParameters.default()
         self.double_dynamics = DoublePendulumDynamics(self.double_params)
         self.triple_dynamics = TriplePendulumDynamics(self.triple_params)
+        self._forcing_expressions: tuple[str, str] | None = None
+        # For immediate evaluation in UI, we don't allow variables
+        self._constant_evaluator = SafeEvaluator(allowed_variables=set())
 
         self.time = 0.0
         self._build_layout()
@@ -196,12 +199,17 @@ class PendulumController(QtWidgets.QWidget):
 
         if config.model == "Double":
             if config.forward_mode:
-                forcing = compile_forcing_functions(
-                    config.torque_expressions[0], config.torque_expressions[1]
+                expressions = (
+                    config.torque_expressions[0],
+                    config.torque_expressions[1],
                 )
-                self.double_dynamics.forcing_functions = forcing
-                self.state_double = self.double_dynamics.step(
-                    self.time, self.state_double, TIME_STEP
+                if expressions != self._forcing_expressions:
+                    self.double_dynamics.forcing_functions = compile_forcing_functions(
+                        *expressions
+                    )
+                    self._forcing_expressions = expressions
+                self.double_dynamics.step_fused_into(
+                    self.time, self.state_double, TIME_STEP, self.state_double
                 )
             else:
                 profiles = self._polynomial_profiles(config.velocity_polynomials[:2])
@@ -229,9 +237,8 @@ class PendulumController(QtWidgets.QWidget):
     def _safe_eval(self, expression: str) -> float:
         """Safely evaluate a mathematical expression, returning 0.0 on error."""
         try:
-            # For immediate evaluation in UI, we don't allow variables
-            evaluator = SafeEvaluator(allowed_variables=set())
-            return evaluator.evaluate(expression)
+            # Compiled code comes from the shared expression cache
+            return self._constant_evaluator.evaluate(expression)
         except Exception:
             return 0.0
 
@@ -276,6 +283,7 @@ class PendulumController(QtWidgets.QWidget):
             lambda _t, _s: torques[0],
             lambda _t, _s: torques[1],
         )
+        self._forcing_expressions = None
         return self.double_dynamics.step(self.time, state_with_profile, TIME_STEP)
 
     def _apply_inverse_profile_triple(